@@ -1,133 +1,493 @@
-import heapq
+import bisect
+import functools
+import itertools
 import time
 
+try:
+    from .budget import SearchBudget
+    from .hda_star import parallel_search
+    from .open_list import BucketQueue, HeapQueue
+    from .pattern_database import PatternDatabase, patterns_on_disk
+    from .state import SOLVED, NOT_FOUND, STOPPED, UNSUPPORTED, check_puzzle, board_of
+    from .walking_distance import MAX_SIZE as WALKING_MAX_SIZE, WalkingDistance
+except ImportError:  # Running from inside backend/Algorithms
+    from budget import SearchBudget
+    from hda_star import parallel_search
+    from open_list import BucketQueue, HeapQueue
+    from pattern_database import PatternDatabase, patterns_on_disk
+    from state import SOLVED, NOT_FOUND, STOPPED, UNSUPPORTED, check_puzzle, board_of
+    from walking_distance import MAX_SIZE as WALKING_MAX_SIZE, WalkingDistance
+
+# Heuristics backed by their own tables, which also generate the neighbours with their values
+ESTIMATORS = {
+    'WalkingDistance': WalkingDistance,
+    'PatternDatabase': PatternDatabase,
+}
+
+
+@functools.lru_cache(maxsize=32)
+def heuristic_table(goal_state, heuristic):
+    """
+    Precomputes the distance of every tile from its goal cell, for every cell.
+
+    A move changes the position of a single tile, so with this table the
+    heuristic of a neighbour is the parent's value minus the moved tile's old
+    distance plus its new one.
+
+    Args:
+        goal_state (str): The goal state of the puzzle.
+        heuristic (str): 'Manhattan' or 'Euclidean'.
+
+    Returns:
+        tuple: table[tile][cell] is the distance of tile at cell from its goal cell (0 for the blank).
+    """
+    size = board_of(goal_state).size
+    goal_cells = {int(tile, 36): i for i, tile in enumerate(goal_state)}
+    table = []
+    for tile in range(len(goal_state)):
+        x_goal, y_goal = divmod(goal_cells[tile], size)  # Get the goal position
+        row = []
+        for i in range(len(goal_state)):
+            x, y = divmod(i, size)  # Get the current position (i)
+            if tile == 0:  # The blank tile does not count
+                row.append(0)
+            elif heuristic == 'Manhattan':
+                row.append(abs(x - x_goal) + abs(y - y_goal))
+            else:
+                row.append(((x - x_goal)**2 + (y - y_goal)**2)**0.5)
+        table.append(tuple(row))
+    return tuple(table)
+
+
+def line_penalty(positions):
+    """
+    Computes the linear conflict penalty of one row or column.
+
+    positions lists, in cell order, the goal position within the line of every
+    tile that belongs to the line. Tiles out of goal order must step out of the
+    line to let each other pass, two moves the Manhattan distance does not
+    count. The fewest tiles that must step out are those outside a longest
+    increasing run of positions.
+
+    Args:
+        positions (list): Goal positions within the line, in the order the tiles appear.
+
+    Returns:
+        int: 2 moves for each tile that must leave the line.
+    """
+    longest = []  # longest[k] is the smallest last position of an increasing run of length k + 1
+    for position in positions:
+        k = bisect.bisect_left(longest, position)
+        if k == len(longest):
+            longest.append(position)
+        else:
+            longest[k] = position
+    return 2 * (len(positions) - len(longest))
+
+
+@functools.lru_cache(maxsize=32)
+def conflict_tables(goal_state):
+    """
+    Precomputes the tables of the linear conflict heuristic.
+
+    Rows are lines 0 .. size - 1 and columns lines size .. 2 * size - 1. The
+    tile at position p of a line adds weights[line][p][tile] to the line's
+    code: (its goal position in the line + 1) * (size + 1) ** p, or nothing if
+    its goal is in another line. penalties[code] is the line's penalty (see
+    line_penalty()), so a line costs size lookups instead of a sort.
+
+    Args:
+        goal_state (str): The goal state of the puzzle.
+
+    Returns:
+        tuple: (weights, penalties, shifts, lines), where shifts[line] holds the bit
+        offsets of the line's cells and lines[cell] is ((row, position), (column, position)).
+    """
+    board = board_of(goal_state)
+    size = board.size
+    goal_cells = {int(tile, 36): i for i, tile in enumerate(goal_state)}
+    weights = []
+    shifts = []
+    for line in range(2 * size):
+        cells = [line * size + p for p in range(size)] if line < size else [p * size + line - size for p in range(size)]
+        shifts.append(tuple(board.tile_bits * cell for cell in cells))
+        line_weights = []
+        for p in range(size):
+            row = []
+            for tile in range(board.cells):
+                goal_row, goal_column = divmod(goal_cells[tile], size)
+                if tile == 0:  # The blank is never in conflict
+                    row.append(0)
+                elif line < size and goal_row == line:
+                    row.append((goal_column + 1) * (size + 1) ** p)
+                elif line >= size and goal_column == line - size:
+                    row.append((goal_row + 1) * (size + 1) ** p)
+                else:
+                    row.append(0)
+            line_weights.append(tuple(row))
+        weights.append(tuple(line_weights))
+
+    penalties = []
+    for digits in itertools.product(range(size + 1), repeat=size):  # Every code, last position first
+        penalties.append(line_penalty([digit for digit in reversed(digits) if digit]))
+    lines = tuple(((cell // size, cell % size), (size + cell % size, cell // size)) for cell in range(board.cells))
+    return tuple(weights), bytes(penalties), tuple(shifts), lines
+
+
 class AStar:
-    def __init__(self, start_state, goal_state='012345678', heuristic='Manhattan'):
+    def __init__(self, start_state, goal_state='012345678', heuristic='Manhattan', tie_breaking='max-g',
+                 open_list='auto', workers=1, path_format='states', budget=None, metrics=None):
         """
         Initializes the A* search algorithm.
 
         Args:
             start_state (str): The initial state of the puzzle.
             goal_state (str): The goal state of the puzzle (default is '012345678').
-            heuristic (str): The heuristic function to use (default is 'Manhattan').
+            heuristic (str): The heuristic function to use: 'Manhattan', 'Euclidean',
+                'LinearConflict' (Manhattan plus linear conflicts), 'WalkingDistance' (up to 4x4)
+                or 'PatternDatabase' (additive pattern databases, 3x3 and 4x4 goals whose tables are on
+                disk, see pattern_database.py) (default is 'Manhattan').
+            tie_breaking (str): How to order nodes with equal f: 'max-g' prefers the deeper node,
+                'lifo' prefers the most recently generated one (default is 'max-g').
+            open_list (str): The priority queue of the frontier: 'buckets' (one stack per f and g,
+                integer heuristics only), 'heap' (binary heap) or 'auto', buckets unless the
+                heuristic is 'Euclidean' (default is 'auto'). See open_list.py.
+            workers (int): Worker processes; more than 1 runs hash-distributed A* (HDA*, see
+                hda_star.py), which spreads one search over several cores (default is 1).
+            path_format (str): Return the path as puzzle strings ('states') or as a move string
+                such as 'RDLU' ('moves', see state.format_path()) (default is 'states').
+            budget (SearchBudget): Node, time and frontier limits and a cancel token (see budget.py).
+            metrics (SearchMetrics): Counters to fill in during the search (see instrumentation.py);
+                None collects nothing.
         """
+        if tie_breaking not in ('max-g', 'lifo'):
+            raise ValueError(f'Unknown tie breaking rule: {tie_breaking}')
+        if open_list not in ('auto', 'buckets', 'heap'):
+            raise ValueError(f'Unknown open list: {open_list}')
+        if open_list == 'buckets' and heuristic == 'Euclidean':
+            raise ValueError('The Euclidean heuristic needs the heap open list, its f values are not integers')
+        if not isinstance(workers, int) or workers < 1:
+            raise ValueError(f'workers must be a positive integer, not {workers!r}')
         self.start_state = start_state
         self.goal_state = goal_state
+        self.goal = None  # Packed goal state, set by run()
+        self.board = board_of(goal_state)  # Geometry and move tables of the board size
         self.heuristic = heuristic
+        self.tie_breaking = tie_breaking
+        self.open_list = open_list
+        self.workers = workers
+        self.stored_states = 0  # States with a known cost when the search ended, over all workers
+        self.messages = 0  # Batches of states sent between HDA* workers
+        self.path_format = path_format  # 'states' or 'moves', see state.format_path()
+        self.distances = None  # Per-tile distance table of the heuristic, set by run()
+        self.conflicts = None  # Linear conflict tables, set by run() for the 'LinearConflict' heuristic
+        self.estimator = None  # Table-backed heuristic (see ESTIMATORS), set by run()
         self.explored_nodes = 0  # Track the number of explored nodes
         self.search_depth = 0  # Track the maximum search depth reached
         self.total_time = 0  # Track the total execution time
-        self.cost=0 # Computed cost
+        self.status = None  # Outcome of the last run (see state.py)
+        self.budget = budget or SearchBudget()  # Limits of every run, unlimited by default
+        self.stop_reason = None  # Limit that stopped the last run (see budget.py)
+        self.metrics = metrics  # Optional counters of the search (see instrumentation.py)
+        self.cost=0 # Number of moves in the returned path
 
     def run(self):
         """
         Runs the A* search algorithm.
 
+        Nodes are expanded in order of f = g + h, where g is the number of
+        moves from the start. Every heuristic is consistent (a move changes it
+        by at most one, see pattern_database.py for the pattern databases), so
+        a state never needs to be expanded twice: expanded states go into a closed set, and
+        open list entries left behind by a cheaper path to the same state are
+        skipped when popped. The first time the goal is expanded, its path is
+        optimal.
+
         Returns:
             A tuple containing the path to the goal state and the total cost.
         """
-        start_time = time.time()  # Start timing the algorithm
-        frontier = []  # Priority queue for nodes to explore
-        heapq.heappush(frontier, (0, self.start_state, 0))  # Push the initial state with a cost of 0
+        self.status = check_puzzle(self.start_state, self.goal_state)
+        if self.status:  # Invalid or unsolvable input, there is nothing to search
+            return None, float('inf')
+        if not self.supports_board():  # The heuristic has no tables for this board or goal
+            self.status = UNSUPPORTED
+            return None, float('inf')
+
+        metrics = self.metrics
+        if metrics is not None:
+            metrics.start()
+        start = self.board.encode(self.start_state)  # Packed start state
+        goal = self.load_tables()  # Packed goal state
+        start_time = time.perf_counter_ns()  # Start timing the algorithm
+        exhausted = self.budget.exhausted
+        self.budget.start()
+        self.stop_reason = None
+        if self.workers > 1:  # Spread the search over worker processes
+            return self.run_parallel(start, goal, start_time)
+        heuristic = self.get_cost(start)
+        frontier = self.get_open_list()  # Priority queue for nodes to explore, see open_list.py
+        push, pop = frontier.push, frontier.pop
+        push(heuristic, 0, start, heuristic)
         came_from = {}  # Dictionary to store the path to reach each node
-        cost_so_far = {self.start_state: 0}  # Dictionary to store the cost to reach each state
+        cost_so_far = {start: 0}  # Dictionary to store the cost to reach each state
+        closed = set()  # States that have already been expanded
+        if metrics is not None:
+            metrics.heuristic_evaluations += 1  # The start state
+            metrics.mark('setup')
 
         while frontier:  # Loop while there are nodes in the frontier
-            _, current, path_length = heapq.heappop(frontier)  # Get the node with the lowest cost
+            current, path_length, heuristic = pop()  # Get the node with the lowest f
+            if current in closed:  # Stale entry, the state was expanded through a cheaper path
+                continue
+            self.stop_reason = exhausted(self.explored_nodes, len(frontier), len(cost_so_far))
+            if self.stop_reason:  # Out of budget, report what was searched so far
+                self.total_time = (time.perf_counter_ns() - start_time) / 1e9
+                self.status = STOPPED
+                return None, float('inf')
+            closed.add(current)
             self.explored_nodes += 1  # Increment the number of explored nodes
             self.search_depth = max(self.search_depth, path_length)  # Update the maximum search depth
 
-            if current == self.goal_state:  # If the current node is the goal state
-                self.total_time = time.time() - start_time  # Calculate total time
-                self.cost= cost_so_far[current]
-                return self.get_path(came_from, current), cost_so_far[current]  # Return the path and cost
+            if current == goal:  # If the current node is the goal state
+                self.total_time = (time.perf_counter_ns() - start_time) / 1e9  # Calculate total time
+                self.status = SOLVED
+                self.cost = path_length
+                return self.get_path(came_from, current), self.cost  # Return the path and cost
 
             # Loop through the neighbors of the current state
-            for next_state, cost in self.get_neighbors(current):
-                new_cost = cost_so_far[current] + cost  # Calculate the new cost to reach the neighbor
+            new_cost = path_length + 1  # Every move costs 1
+            neighbors = self.get_neighbors(current, heuristic)
+            frontier_size = len(frontier)
+            for next_state, cost in neighbors:
+                if next_state in closed:
+                    continue
                 # If the neighbor is unvisited or the new cost is lower than a previous visit
-                if next_state not in cost_so_far or new_cost < cost_so_far[next_state]:
+                if new_cost < cost_so_far.get(next_state, new_cost + 1):
                     cost_so_far[next_state] = new_cost  # Update the cost to reach the neighbor
-                    heapq.heappush(frontier, (new_cost, next_state, path_length+1))  # Add the neighbor to the frontier
                     came_from[next_state] = current  # Record the current state as the predecessor
+                    push(new_cost + cost, new_cost, next_state, cost)  # Add the neighbor to the frontier
+            if metrics is not None:
+                metrics.heuristic_evaluations += len(neighbors)
+                metrics.expand(len(neighbors), len(frontier) - frontier_size, len(frontier), len(cost_so_far))
 
         # If no solution is found, return None and infinite cost
-        self.total_time = time.time() - start_time  # Calculate total time
+        self.total_time = (time.perf_counter_ns() - start_time) / 1e9  # Calculate total time
+        self.status = NOT_FOUND
         return None, float('inf')
 
-    def get_neighbors(self, state):
+    def run_parallel(self, start, goal, start_time):
+        """
+        Runs the search as HDA* on self.workers processes (see hda_star.py).
+
+        Each worker owns the states that hash to it and runs A* on them. The
+        path is optimal, but states may be expanded more than once, so more
+        nodes are explored than by a single A*. The budget is checked by this
+        process while it waits, so the limits, the node limit included, may
+        overshoot by the nodes the workers expand in a poll interval. With
+        metrics, only the phases are timed.
+
+        Args:
+            start (int): The packed start state.
+            goal (int): The packed goal state.
+            start_time (int): perf_counter_ns() when run() started the search.
+
+        Returns:
+            A tuple containing the path to the goal state and the total cost.
+        """
+        def progress(explored, depth):  # Visible to observers such as /jobs while the workers run
+            self.explored_nodes, self.search_depth = explored, depth
+
+        if self.metrics is not None:
+            self.metrics.mark('setup')
+        path, stats, self.stop_reason = parallel_search(self, start, goal, progress)
+        self.explored_nodes = stats['explored']
+        self.search_depth = stats['depth']
+        self.stored_states = stats['stored']
+        self.messages = stats['messages']
+        self.total_time = (time.perf_counter_ns() - start_time) / 1e9
+        if self.stop_reason:
+            self.status = STOPPED
+            return None, float('inf')
+        if path is None:
+            self.status = NOT_FOUND
+            return None, float('inf')
+        self.status = SOLVED
+        self.cost = len(path) - 1
+        if self.metrics is not None:
+            self.metrics.mark('search')
+        path = self.board.format_path(path, self.path_format)
+        if self.metrics is not None:
+            self.metrics.mark('path')
+        return path, self.cost
+
+    def get_neighbors(self, state, cost=None):
         """
         Finds the neighboring states by moving the blank tile ('0') up, down, left, or right.
 
+        The heuristic cost of each neighbor is updated from the cost of the
+        current state, since only the moved tile changes its distance.
+
         Args:
-            state (str): The current state of the puzzle.
+            state (int): The current packed state of the puzzle.
+            cost (float): The heuristic cost of state, computed from scratch if not given.
 
         Returns:
             A list of tuples where each tuple contains the neighbor state and the associated move cost.
         """
-        i = state.index('0')  # Find the index of the blank space (0)
-        y, x = divmod(i, 3)
-        # print(i,x,y)
+        if self.estimator is not None:  # The heuristic's own tables give the neighbours' values
+            return self.estimator.get_neighbors(state)
+        if cost is None:
+            cost = self.get_cost(state)
+        distances = self.distances
+        conflicts = self.conflicts
+        board = self.board
+        mask = board.tile_mask
+        blank = state >> board.blank_shift
         neighbors = []
-
-        # Move the blank tile up (if possible)
-        if y > 0:
-            # print("up")
-            up = self.swap(state, i, i - 3)  # Swap the blank tile with the tile above
-            neighbors.append((up, self.get_cost(up)))
-
-        # Move the blank tile right (if possible)
-        if x < 2:  
-            # print("right")
-            right = self.swap(state, i, i + 1)  # Swap the blank tile with the tile on the right
-            neighbors.append((right, self.get_cost(right)))
-
-        # Move the blank tile left (if possible)
-        if x > 0:
-            # print("left")
-            left = self.swap(state, i, i - 1)  # Swap the blank tile with the tile on the left
-            neighbors.append((left, self.get_cost(left)))
-
-        # Move the blank tile down (if possible)
-        if y < 2:
-            # print("down")
-            down = self.swap(state, i, i + 3)  # Swap the blank tile with the tile below
-            neighbors.append((down, self.get_cost(down)))
-
+        for target, shift, factor, delta in board.moves[blank]:
+            tile = (state >> shift) & mask  # The tile that slides into the blank
+            row = distances[tile]
+            next_cost = cost - row[target] + row[blank]
+            if conflicts is not None:
+                next_cost += self.conflict_change(state, tile, blank, target)
+            neighbors.append((state + tile * factor + delta, next_cost))
         return neighbors
 
-    def swap(self, state, i, j):
+    def conflict_change(self, state, tile, blank, target):
         """
-        Swaps two characters in a string.
+        Computes how one move changes the linear conflict penalty.
+
+        The moved tile leaves one line and enters another: columns for a
+        horizontal move, rows for a vertical one. The lines it moves along keep
+        their tiles in the same order. Only a line the tile belongs to can
+        change, so at most one line is looked up.
 
         Args:
-            state (str): The current state of the puzzle.
-            i (int): The index of the first character.
-            j (int): The index of the second character.
+            state (int): The packed state before the move.
+            tile (int): The tile that slides from cell target into cell blank.
+            blank (int): The position of the blank before the move.
+            target (int): The cell the blank moves to.
 
         Returns:
-            A new string with the characters at indices i and j swapped.
+            int: The penalty after the move minus the penalty before it.
+        """
+        weights, penalties, _, lines = self.conflicts
+        kind = 1 if abs(target - blank) == 1 else 0  # Horizontal moves change the tile's column
+        line, position = lines[target][kind]
+        weight = weights[line][position][tile]
+        if weight:  # The tile leaves its goal line
+            code = self.line_code(state, line)
+            return penalties[code - weight] - penalties[code]
+        line, position = lines[blank][kind]
+        weight = weights[line][position][tile]
+        if weight:  # The tile enters its goal line, where the blank adds nothing to the code
+            code = self.line_code(state, line)
+            return penalties[code + weight] - penalties[code]
+        return 0
+
+    def line_code(self, state, line):
+        """
+        Returns the index into the penalty table of one row or column (see conflict_tables()).
+        """
+        weights, _, shifts, _ = self.conflicts
+        mask = self.board.tile_mask
+        line_weights = weights[line]
+        return sum(line_weights[p][(state >> shift) & mask] for p, shift in enumerate(shifts[line]))
+
+    def load_tables(self):
+        """
+        Loads the tables of the heuristic for the goal state.
+
+        Returns:
+            int: The packed goal state, also stored in self.goal.
+        """
+        self.goal = self.board.encode(self.goal_state)
+        self.distances = self.get_distance_table()
+        self.conflicts = self.get_conflict_tables()
+        self.estimator = self.get_estimator()
+        return self.goal
+
+    def get_open_list(self):
+        """
+        Builds an empty open list for run().
+
+        Returns:
+            BucketQueue for integer heuristics (every one but 'Euclidean') unless
+            open_list is 'heap', HeapQueue otherwise.
+        """
+        prefer_deep = self.tie_breaking == 'max-g'
+        if self.open_list == 'heap' or (self.open_list == 'auto' and self.heuristic == 'Euclidean'):
+            return HeapQueue(prefer_deep)
+        return BucketQueue(prefer_deep)
+
+    def get_distance_table(self):
         """
-        state = list(state)  # Convert the string to a list for mutability
-        state[i], state[j] = state[j], state[i]  # Swap the characters
-        return ''.join(state)  # Convert the list back to a string
+        Returns the per-tile distance table of the chosen heuristic.
+
+        Returns:
+            tuple: table[tile][cell], see heuristic_table().
+        """
+        return heuristic_table(self.goal_state, 'Euclidean' if self.heuristic == 'Euclidean' else 'Manhattan')
+
+    def get_conflict_tables(self):
+        """
+        Returns the linear conflict tables if the heuristic uses them.
+
+        Returns:
+            tuple: See conflict_tables(), or None.
+        """
+        return conflict_tables(self.goal_state) if self.heuristic == 'LinearConflict' else None
+
+    def get_estimator(self):
+        """
+        Builds the table-backed heuristic if one was chosen.
+
+        Returns:
+            WalkingDistance or PatternDatabase, or None for the heuristics computed here.
+        """
+        estimator_class = ESTIMATORS.get(self.heuristic)
+        return None if estimator_class is None else estimator_class(self.goal_state)
+
+    def supports_board(self):
+        """
+        Checks that the heuristic has tables for the board size and goal.
+
+        Pattern databases are never built during a search: without complete
+        tables of the goal on disk (only 3x3 and 4x4 boards have groups), the
+        board is unsupported, even if the start is already the goal.
+        """
+        if self.heuristic == 'WalkingDistance':
+            return self.board.size <= WALKING_MAX_SIZE
+        if self.heuristic == 'PatternDatabase':
+            return patterns_on_disk(self.goal_state)
+        return True
 
     def get_cost(self, state):
         """
         Calculates the heuristic cost to reach the goal state.
 
         Args:
-            state (str): The current state of the puzzle.
+            state (int): The current packed state of the puzzle.
 
         Returns:
             The heuristic cost based on the chosen heuristic function.
         """
-        if state == self.goal_state:  # If the state is the goal, return a cost of 0
+        if state == self.goal:  # If the state is the goal, return a cost of 0
             return 0
        
         # Use the Manhattan distance as the heuristic cost
         if self.heuristic == 'Manhattan':
             return self.manhattan_distance(state) 
+
+        # Add two moves for every tile that must leave its row or column to let another pass
+        if self.heuristic == 'LinearConflict':
+            return self.manhattan_distance(state) + self.linear_conflict(state)
+
+        # Look the state up in the walking distance or pattern database tables
+        if self.heuristic in ESTIMATORS:
+            if self.estimator is None:  # Called before run()
+                self.estimator = self.get_estimator()
+            return self.estimator.evaluate(state)
         
         # Otherwise, use the Euclidean distance as the heuristic cost
         return self.euclidean_distance(state)
@@ -137,53 +497,62 @@ class AStar:
         Calculates the Manhattan distance for the current state.
 
         Args:
-            state (str): The current state of the puzzle.
+            state (int): The current packed state of the puzzle.
 
         Returns:
             The Manhattan distance from the current state to the goal state.
         """
-        distance = 0
-        for i in range(9):
-            if state[i] != '0':  # Skip the blank tile
-                x, y = divmod(i, 3)  # Get the current position (i)
-                x_goal, y_goal = divmod(int(state[i]), 3)  # Get the goal position
-                distance += abs(x - x_goal) + abs(y - y_goal)  # Calculate Manhattan distance
-        return distance
+        table = heuristic_table(self.goal_state, 'Manhattan')
+        tile_at = self.board.tile_at
+        return sum(table[tile_at(state, i)][i] for i in range(self.board.cells))
 
     def euclidean_distance(self, state):
         """
         Calculates the Euclidean distance for the current state.
 
         Args:
-            state (str): The current state of the puzzle.
+            state (int): The current packed state of the puzzle.
 
         Returns:
             The Euclidean distance from the current state to the goal state.
         """
+        table = heuristic_table(self.goal_state, 'Euclidean')
         distance = 0
-        for i in range(9):
-            if state[i] != '0':  # Skip the blank tile
-                x, y = divmod(i, 3)  # Get the current position (i)
-                x_goal, y_goal = divmod(int(state[i]), 3)  # Get the goal position
-                distance += ((x - x_goal)**2 + (y - y_goal)**2)**0.5  # Calculate Euclidean distance
+        for i in range(self.board.cells):
+            distance += table[self.board.tile_at(state, i)][i]  # Add the distance of the tile at cell i
         return distance
 
+    def linear_conflict(self, state):
+        """
+        Calculates the linear conflict penalty of every row and column.
+
+        Args:
+            state (int): The current packed state of the puzzle.
+
+        Returns:
+            The moves the Manhattan distance misses because tiles block each other in their goal lines.
+        """
+        if self.conflicts is None:  # Called before run()
+            self.conflicts = conflict_tables(self.goal_state)
+        penalties = self.conflicts[1]
+        return sum(penalties[self.line_code(state, line)] for line in range(2 * self.board.size))
+
     def get_path(self, came_from, current):
         """
         Reconstructs the path from the start state to the goal state.
 
         Args:
-            came_from (dict): A dictionary mapping each state to its predecessor.
-            current (str): The current state (goal state).
+            came_from (dict): A dictionary mapping each packed state to its predecessor.
+            current (int): The current packed state (goal state).
 
         Returns:
-            A list representing the path from the start state to the goal state.
+            The path from the start state to the goal state, in self.path_format.
         """
-        path = []
-        while current in came_from:  # Trace back from the goal state to the start state
-            path.append(current)  # Add the current state to the path
-            current = came_from[current]  # Move to the predecessor state
-        path.reverse()  # Reverse the path to get it from start to goal
+        if self.metrics is not None:
+            self.metrics.mark('search')
+        path = self.board.get_path(came_from, current, self.path_format)
+        if self.metrics is not None:
+            self.metrics.mark('path')
         return path
 
     def get_info(self):
@@ -194,9 +563,16 @@ class AStar:
             A dictionary containing the number of explored nodes, total execution time, and search depth.
         """
 
-        return {
+        info = {
             'explored nodes': self.explored_nodes,  # Number of nodes explored
-            'total time': round(self.total_time,3),  # Total time taken for the search
+            'total time': round(self.total_time, 6),  # Total time taken for the search
             'max search depth': self.search_depth,  # Maximum search depth reached
             'cost':round(self.cost,3)
         }
+        if self.workers > 1:  # HDA* counters, see run_parallel()
+            info['workers'] = self.workers
+            info['stored states'] = self.stored_states
+            info['messages'] = self.messages
+        if self.metrics is not None:  # Counters of the instrumented search
+            info.update(self.metrics.get_info())
+        return info
@@ -0,0 +1,267 @@
+"""
+Anytime repairing A* (ARA*, Likhachev, Gordon and Thrun 2003).
+
+Weighted A* orders nodes by g + w * h. With w > 1 it reaches the goal after
+far fewer expansions, and the path costs at most w times the optimum. ARA*
+starts with a large w and, while time is left, lowers it and searches again
+without starting over: states already expanded whose cost improved are kept
+aside (INCONS) and put back on the open list, and the open list is re-sorted
+for the new w. Each search only expands what changed.
+
+After each search the suboptimality bound is min(w, cost / lower bound),
+where the lower bound is the smallest g + h on the open list and INCONS; the
+path is optimal once it reaches 1. A run cut short by the deadline or the
+budget still ends with the status SOLVED if it has a path, so get_info()
+reports 'optimal' to tell a proven optimum from an anytime answer.
+"""
+
+import heapq
+import time
+
+try:
+    from .Astar import AStar
+    from .state import SOLVED, NOT_FOUND, STOPPED, UNSUPPORTED, check_puzzle
+except ImportError:  # Running from inside backend/Algorithms
+    from Astar import AStar
+    from state import SOLVED, NOT_FOUND, STOPPED, UNSUPPORTED, check_puzzle
+
+# Seconds the interactive solvers of dispatch.py ('ara-star', 'ara-starlc') spend improving the path. The first
+# path on a 15-puzzle board takes a few milliseconds, and 50 ms keeps a /start answer interactive while leaving
+# time for a few lower weights; the path returned at the deadline may be above the optimum (see get_info()).
+DEFAULT_DEADLINE = 0.05
+DEADLINE_CHECK_INTERVAL = 64  # Expansions between two readings of the clock
+INFINITY = float('inf')
+
+
+class ARAStar(AStar):
+    def __init__(self, start_state, goal_state='012345678', heuristic='Manhattan', weight=2.5, weight_step=0.5,
+                 deadline=None, path_format='states', budget=None, metrics=None):
+        """
+        Initializes the ARA* search algorithm.
+
+        Args:
+            start_state (str): The initial state of the puzzle.
+            goal_state (str): The goal state of the puzzle (default is '012345678').
+            heuristic (str): The heuristic function to use, see AStar (default is 'Manhattan').
+            weight (float): The inflation factor of the heuristic in the first search, at least 1
+                (default is 2.5).
+            weight_step (float): How much the weight is lowered before each new search (default is 0.5).
+            deadline (float): Seconds after which the best path so far is returned. The first search
+                always runs until it finds a path; None searches until the path is optimal.
+            path_format (str): Return the path as puzzle strings ('states') or as a move string
+                such as 'RDLU' ('moves', see state.format_path()) (default is 'states').
+            budget (SearchBudget): Node, time and memory limits and a cancel token (see budget.py).
+                If it runs out after a path was found, that path is returned.
+            metrics (SearchMetrics): Counters to fill in during the search (see instrumentation.py);
+                None collects nothing.
+        """
+        if weight < 1:
+            raise ValueError(f'The weight must be at least 1, not {weight}')
+        if weight_step <= 0:
+            raise ValueError(f'The weight step must be positive, not {weight_step}')
+        super().__init__(start_state, goal_state, heuristic, open_list='heap', path_format=path_format,
+                         budget=budget, metrics=metrics)
+        self.initial_weight = weight
+        self.weight_step = weight_step
+        self.deadline = deadline  # Seconds, None for no deadline
+        self.deadline_ns = None  # perf_counter_ns() at which the deadline passes, set by run()
+        self.weight = None  # Weight of the current search
+        self.path_weight = None  # Weight of the search that found the returned path
+        self.bound = None  # Suboptimality bound of the returned path
+        self.solutions = 0  # Searches that ended with a path
+        self.first_solution_time = None  # Seconds until the first path was found
+        self.first_solution_cost = None
+
+    def run(self):
+        """
+        Runs ARA*: weighted A* searches with decreasing weights until the path
+        is optimal, the deadline passes or the budget runs out.
+
+        The status is SOLVED whenever a path was found, even if the deadline or
+        the budget stopped the search before the path was proven optimal; the
+        'optimal' and 'suboptimality bound' entries of get_info() tell them apart.
+
+        Returns:
+            A tuple containing the best path to the goal state and its cost.
+        """
+        self.status = check_puzzle(self.start_state, self.goal_state)
+        if self.status:  # Invalid or unsolvable input, there is nothing to search
+            return None, INFINITY
+        if not self.supports_board():  # The heuristic has no tables for this board or goal
+            self.status = UNSUPPORTED
+            return None, INFINITY
+
+        metrics = self.metrics
+        if metrics is not None:
+            metrics.start()
+        start = self.board.encode(self.start_state)  # Packed start state
+        goal = self.load_tables()  # Packed goal state
+        start_time = time.perf_counter_ns()  # Start timing the algorithm
+        self.deadline_ns = None if self.deadline is None else start_time + int(self.deadline * 1e9)
+        self.budget.start()
+        self.stop_reason = None
+        self.solutions = 0
+        self.first_solution_time = self.first_solution_cost = None
+        heuristic = self.get_cost(start)
+        self.cost_so_far = {start: 0}  # Best known cost of each state
+        self.came_from = {}  # Predecessor of each state on its best known path
+        self.open = {start: heuristic}  # Heuristic value of each state to expand
+        self.closed = set()  # States expanded in the current search
+        self.incons = {}  # Expanded states whose cost improved since, with their heuristic value
+        self.order = 0  # Counter of pushed entries, the latest first among equals
+        self.weight = self.initial_weight
+        best_path = None  # Packed states of the best path so far
+        if metrics is not None:
+            metrics.heuristic_evaluations += 1  # The start state
+            metrics.mark('setup')
+
+        while True:
+            self.heap = []  # (g + weight * h, -g, order, state, g) entries of the open states
+            for state, heuristic in self.open.items():
+                self.push(state, self.cost_so_far[state], heuristic)
+            finished = self.improve_path(goal)
+            if finished:  # The search ended, its path is within weight of the optimum
+                best_path = self.trace_path(goal)
+                self.bound = self.get_bound(len(best_path) - 1)
+                self.path_weight = self.weight
+                self.solutions += 1
+                if self.first_solution_time is None:
+                    self.first_solution_time = (time.perf_counter_ns() - start_time) / 1e9
+                    self.first_solution_cost = len(best_path) - 1
+            if not finished or self.bound <= 1 or self.deadline_passed():
+                break
+            # Search again with a lower weight, from the states left by the last search
+            self.weight = max(1.0, self.weight - self.weight_step)
+            self.open.update(self.incons)
+            self.incons = {}
+            self.closed = set()
+
+        self.total_time = (time.perf_counter_ns() - start_time) / 1e9  # Calculate total time
+        if best_path is None:
+            self.status = STOPPED if self.stop_reason else NOT_FOUND
+            return None, INFINITY
+        self.status = SOLVED  # Even if the budget ran out, the path is valid and within its bound
+        self.cost = len(best_path) - 1
+        if metrics is not None:
+            metrics.mark('search')
+        path = self.board.format_path(best_path, self.path_format)
+        if metrics is not None:
+            metrics.mark('path')
+        return path, self.cost
+
+    def improve_path(self, goal):
+        """
+        Runs one weighted A* search, until no open state has a lower priority
+        than the goal's cost.
+
+        A state reached through a cheaper path after it was expanded goes to
+        INCONS instead of the open list, so it is expanded at most once per search.
+
+        Args:
+            goal (int): The packed goal state.
+
+        Returns:
+            bool: True if the search ended with a path to the goal, False if it found none
+            or was interrupted (self.stop_reason is set if the budget ran out).
+        """
+        exhausted = self.budget.exhausted
+        metrics = self.metrics
+        cost_so_far, came_from, open_states, closed, incons = (self.cost_so_far, self.came_from, self.open,
+                                                               self.closed, self.incons)
+        heap = self.heap
+        while heap:
+            priority, _, _, current, path_length = heap[0]
+            if cost_so_far.get(goal, INFINITY) <= priority:  # Nothing left can improve the path
+                return True
+            heapq.heappop(heap)
+            if current not in open_states or path_length != cost_so_far[current]:  # Stale entry
+                continue
+            self.stop_reason = exhausted(self.explored_nodes, len(open_states), len(cost_so_far))
+            if self.stop_reason:  # Out of budget, run() returns the best path so far
+                return False
+            if self.solutions and self.explored_nodes % DEADLINE_CHECK_INTERVAL == 0 and self.deadline_passed():
+                return False
+            heuristic = open_states.pop(current)
+            closed.add(current)
+            self.explored_nodes += 1  # Increment the number of explored nodes
+            self.search_depth = max(self.search_depth, path_length)  # Update the maximum search depth
+
+            new_cost = path_length + 1  # Every move costs 1
+            neighbors = self.get_neighbors(current, heuristic)
+            generated = 0
+            for next_state, cost in neighbors:
+                if new_cost < cost_so_far.get(next_state, INFINITY):
+                    cost_so_far[next_state] = new_cost
+                    came_from[next_state] = current
+                    if next_state in closed:  # Expanded in this search, wait for the next one
+                        incons[next_state] = cost
+                    else:
+                        open_states[next_state] = cost
+                        self.push(next_state, new_cost, cost)
+                        generated += 1
+            if metrics is not None:
+                metrics.heuristic_evaluations += len(neighbors)
+                metrics.expand(len(neighbors), generated, len(open_states), len(cost_so_far))
+        return goal in cost_so_far
+
+    def push(self, state, path_length, heuristic):
+        """
+        Adds an open state to the heap with its inflated priority g + weight * h.
+        """
+        self.order -= 1
+        heapq.heappush(self.heap, (path_length + self.weight * heuristic, -path_length, self.order, state,
+                                   path_length))
+
+    def get_bound(self, cost):
+        """
+        Returns the suboptimality bound of a path found by the last search.
+
+        Every cheaper path goes through a state on the open list or in INCONS,
+        so the smallest g + h among them is a lower bound on the optimal cost.
+
+        Args:
+            cost (int): The cost of the path.
+
+        Returns:
+            float: At least 1; the path costs at most this many times the optimum.
+        """
+        cost_so_far = self.cost_so_far
+        lower = min((cost_so_far[state] + heuristic for states in (self.open, self.incons)
+                     for state, heuristic in states.items()), default=cost)
+        if lower >= cost:  # Nothing left can lead to a cheaper path
+            return 1.0
+        return min(self.weight, cost / lower)
+
+    def deadline_passed(self):
+        """
+        Checks whether the deadline given to the solver has passed.
+        """
+        return self.deadline_ns is not None and time.perf_counter_ns() >= self.deadline_ns
+
+    def trace_path(self, goal):
+        """
+        Returns the packed states from the start to the goal along the predecessors.
+        """
+        path = [goal]
+        while path[-1] in self.came_from:
+            path.append(self.came_from[path[-1]])
+        return path[::-1]
+
+    def get_info(self):
+        """
+        Returns information about the search process.
+
+        Returns:
+            A dictionary containing the number of explored nodes, total execution time, search depth,
+            cost, the weight and suboptimality bound of the search that found the returned path, and
+            whether that path is proven optimal.
+        """
+        info = super().get_info()
+        info['weight'] = self.path_weight  # Inflation factor of the search that found the path
+        info['suboptimality bound'] = None if self.bound is None else round(self.bound, 3)  # Cost / optimum <= bound
+        info['optimal'] = self.bound is not None and self.bound <= 1  # False if stopped before the bound reached 1
+        info['solutions'] = self.solutions  # Searches that ended with a path
+        if self.first_solution_time is not None:
+            info['first solution time'] = round(self.first_solution_time, 6)
+            info['first solution cost'] = self.first_solution_cost
+        return info
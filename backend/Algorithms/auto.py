@@ -0,0 +1,295 @@
+"""
+Automatic algorithm selection: the 'auto' and 'auto-race' algorithms.
+
+The choice is made from what can be checked in well under a millisecond:
+the board size, the tables already on disk for the goal and the linear
+conflict estimate of the start. With race=True, the candidates of a hard
+board run side by side in worker processes; the first one to solve it wins
+and the others are terminated.
+
+dispatch.py registers AutoSolver and builds the chosen solvers, so this
+module imports it lazily.
+"""
+
+import queue
+import time
+
+try:
+    from .Astar import AStar
+    from .budget import CANCELLED, MEMORY_LIMIT, SearchBudget
+    from .distance_table import table_on_disk
+    from .pattern_database import patterns_on_disk
+    from .processes import get_context, search_slot
+    from .state import SOLVED, STOPPED, PATH_MOVES, board_of, check_puzzle
+except ImportError:  # Running from inside backend/Algorithms
+    from Astar import AStar
+    from budget import CANCELLED, MEMORY_LIMIT, SearchBudget
+    from distance_table import table_on_disk
+    from pattern_database import patterns_on_disk
+    from processes import get_context, search_slot
+    from state import SOLVED, STOPPED, PATH_MOVES, board_of, check_puzzle
+
+SHALLOW_ESTIMATE = 40  # Largest 15-puzzle estimate A* solves in well under a second without pattern databases
+RACE_POLL_INTERVAL = 0.05  # Seconds between two checks of the cancel token while a race runs
+WORKER_FAILED = 'worker failed'  # Stop reason of a race worker that raised, or of a race no worker answered
+
+
+def select_algorithms(start_state, goal_state):
+    """
+    Picks the algorithms to solve a board with, cheapest first.
+
+    Args:
+        start_state (str): The initial state of the puzzle.
+        goal_state (str): The goal state of the puzzle.
+
+    Returns:
+        tuple: (candidates, reason, estimate): the algorithm names of dispatch.ALGORITHMS, best
+        first (the others are only run by a race, on boards that may take seconds), why the first
+        was chosen, and the linear conflict estimate of the start (None if it was not needed).
+    """
+    size = board_of(goal_state).size
+    patterns = patterns_on_disk(goal_state)
+    if size == 2:
+        return ['bfs'], 'a 2x2 board has 12 reachable states, breadth-first search is instant', None
+    if size == 3:
+        if table_on_disk(goal_state):
+            return ['table'], 'the distance table of the goal is on disk, the path is read from it', None
+        if patterns:
+            return ['a-starpdb'], 'the pattern databases of the goal are on disk', None
+        return ['a-starlc'], 'an 8-puzzle takes at most 31 moves, A* with linear conflicts is fast', None
+
+    solver = AStar(start_state, goal_state, 'LinearConflict')
+    solver.load_tables()
+    estimate = solver.get_cost(solver.board.encode(start_state))
+    if size > 4:
+        return (['ara-starlc'], f'no optimal solver is practical on {size}x{size} boards, ARA* returns a path '
+                                'with a suboptimality bound', estimate)
+    if patterns:
+        return (['ida-starpdb', 'a-starpdb'], 'the pattern databases of the goal are on disk, IDA* needs no '
+                                              'memory beyond the path', estimate)
+    if estimate <= SHALLOW_ESTIMATE:
+        return (['a-starlc'], f'an estimate of {estimate} moves is shallow enough for A* '
+                                            'with linear conflicts', estimate)
+    return (['ida-starlc', 'a-starlc'], f'an estimate of {estimate} moves is deep, IDA* keeps only the path '
+                                        'in memory', estimate)  # A* is often faster but may run out of memory
+
+
+def race_worker(algorithm_name, start_state, goal_state, budget, results):
+    """
+    Solves a board in a worker process of a race and sends back the result of dispatch.solve().
+
+    A solver that raises, e.g. a MemoryError of A* on a hard board, still sends a result: STOPPED,
+    with the 'memory limit' or WORKER_FAILED stop reason and the error in 'info'.
+    """
+    try:
+        from .dispatch import solve
+    except ImportError:  # Running from inside backend/Algorithms
+        from dispatch import solve
+    try:
+        result = solve(start_state, goal_state, algorithm_name, PATH_MOVES, budget)
+    except Exception as error:  # The race waits for every worker, so report the failure
+        result = {
+            'start_state': start_state,
+            'goal_state': goal_state,
+            'algorithm': algorithm_name,
+            'path_format': PATH_MOVES,
+            'status': STOPPED,
+            'path': None,
+            'info': {'error': f'{type(error).__name__}: {error}'},
+            'stop_reason': MEMORY_LIMIT if isinstance(error, MemoryError) else WORKER_FAILED,
+        }
+    results.put(result)
+
+
+class AutoSolver:
+    def __init__(self, start_state, goal_state='012345678', race=False, path_format='states', budget=None,
+                 metrics=None):
+        """
+        Initializes a solver that picks the algorithm for the board.
+
+        Args:
+            start_state (str): The initial state of the puzzle.
+            goal_state (str): The goal state of the puzzle (default is '012345678').
+            race (bool): Run the candidates of a hard board in parallel worker processes and keep the
+                first to solve it (default is False).
+            path_format (str): Return the path as puzzle strings ('states') or as a move string
+                such as 'RDLU' ('moves', see state.format_path()) (default is 'states').
+            budget (SearchBudget): Limits of the search (see budget.py), passed to the chosen solver.
+                In a race, each worker gets its own copy and the cancel token is watched here.
+            metrics (SearchMetrics): Counters for the chosen solver (see instrumentation.py); not
+                collected in a race.
+        """
+        self.start_state = start_state
+        self.goal_state = goal_state
+        self.race = race
+        self.path_format = path_format  # 'states' or 'moves', see state.format_path()
+        self.budget = budget or SearchBudget()  # Limits of every run, unlimited by default
+        self.metrics = metrics
+        self.solver = None  # The chosen solver, once it runs in this process
+        self.selected = None  # Name of the algorithm whose result is returned
+        self.reason = None  # Why it was selected
+        self.estimate = None  # Linear conflict estimate of the start, if it was computed
+        self.raced = None  # Algorithms run in the race, if there was one
+        self.result = None  # dispatch.solve() result of the race winner
+        self.status = None  # Outcome of the last run (see state.py)
+        self.stop_reason = None  # Limit that stopped the last run (see budget.py)
+        self.total_time = 0  # Total time taken, including the selection
+
+    @property
+    def explored_nodes(self):
+        """
+        Nodes explored by the chosen solver, read by /jobs while it runs.
+        """
+        if self.result is not None:
+            return self.result['info'].get('explored nodes', 0)
+        return 0 if self.solver is None else self.solver.explored_nodes
+
+    @property
+    def search_depth(self):
+        """
+        Maximum search depth of the chosen solver.
+        """
+        if self.result is not None:
+            return self.result['info'].get('max search depth', 0)
+        return 0 if self.solver is None else self.solver.search_depth
+
+    def run(self):
+        """
+        Selects the algorithm and solves the board with it, or races the candidates.
+
+        Returns:
+            The path from the start to the goal state in self.path_format, or None.
+        """
+        self.status = check_puzzle(self.start_state, self.goal_state)
+        if self.status:  # Invalid or unsolvable input, there is nothing to search
+            return None
+        self.stop_reason = None
+        start_time = time.perf_counter_ns()
+        try:
+            candidates, self.reason, self.estimate = select_algorithms(self.start_state, self.goal_state)
+            if self.race and len(candidates) > 1:
+                return self.run_race(candidates)
+            try:
+                from .dispatch import create_solver
+            except ImportError:  # Running from inside backend/Algorithms
+                from dispatch import create_solver
+            self.selected = candidates[0]
+            self.solver = create_solver(self.selected, self.start_state, self.goal_state, self.path_format,
+                                        self.budget, self.metrics)
+            path = self.solver.run()
+            if isinstance(path, tuple):  # A* style solvers also return the cost
+                path = path[0]
+            self.status = self.solver.status
+            self.stop_reason = self.solver.stop_reason
+            return path
+        finally:  # Whichever way the run ended, cancelled or failed races included
+            self.total_time = (time.perf_counter_ns() - start_time) / 1e9
+
+    def run_race(self, candidates):
+        """
+        Runs every candidate in its own process and keeps the first solution.
+
+        The race waits for a slot of the parallel searches (see processes.py)
+        and its workers are started from the forkserver. Processes that are
+        still running when a candidate solves the board, or when the cancel
+        token is set, are terminated, and every one is joined.
+
+        Args:
+            candidates (list): Algorithm names of dispatch.ALGORITHMS.
+
+        If no worker sent a result (e.g. they were killed), the status is
+        STOPPED with the WORKER_FAILED stop reason.
+
+        Returns:
+            The path of the winner in self.path_format, or None.
+        """
+        budget = self.budget
+        budget.start()  # Waiting for a slot counts towards the time limit
+        self.raced = list(candidates)
+        with search_slot(budget) as stop_reason:
+            if stop_reason:  # Cancelled or out of time before a slot was free
+                self.status, self.stop_reason = STOPPED, stop_reason
+                return None
+            result, losers = self.run_candidates(candidates)
+        if result is None and self.stop_reason == CANCELLED:
+            return None
+        if result is None:  # No candidate solved it, report the outcome of the preferred one
+            if not losers:  # Every worker died without a result
+                self.status, self.stop_reason = STOPPED, WORKER_FAILED
+                return None
+            result = min(losers, key=lambda loser: candidates.index(loser['algorithm']))
+
+        self.result = result
+        self.selected = result['algorithm']
+        self.status = result['status']
+        self.stop_reason = result['stop_reason']
+        moves = result['path']
+        if moves is None or self.path_format == PATH_MOVES:
+            return moves
+        return board_of(self.goal_state).apply_moves(self.start_state, moves)
+
+    def run_candidates(self, candidates):
+        """
+        Starts a worker process per candidate and waits for the first solution.
+
+        Returns:
+            tuple: (result, losers): the dispatch.solve() result of the winner (None if no
+            candidate solved the board or the race was cancelled, which sets self.status and
+            self.stop_reason) and those of the candidates that did not solve it.
+        """
+        budget = self.budget
+        limits = SearchBudget(budget.max_nodes, budget.time_limit, budget.max_frontier,
+                              max_memory=budget.max_memory)  # The cancel token stays in this process
+        context = get_context()
+        results = context.Queue()
+        processes = [context.Process(target=race_worker, daemon=True,
+                                     args=(name, self.start_state, self.goal_state, limits, results))
+                     for name in candidates]
+        for process in processes:
+            process.start()
+        result = None
+        losers = []  # Results of candidates that did not solve the board
+        try:
+            while len(losers) < len(processes):
+                if budget.cancel_token is not None and budget.cancel_token.is_set():
+                    self.status, self.stop_reason = STOPPED, CANCELLED
+                    break
+                try:
+                    outcome = results.get(timeout=RACE_POLL_INTERVAL)
+                except queue.Empty:
+                    if all(process.exitcode is not None for process in processes) and results.empty():
+                        break  # Every worker ended, some without a result
+                    continue
+                if outcome['status'] == SOLVED:
+                    result = outcome
+                    break
+                losers.append(outcome)
+        finally:
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+            for process in processes:  # Reap them, terminated or not, so none is left as a zombie
+                process.join()
+        return result, losers
+
+    def get_info(self):
+        """
+        Returns information about the search process.
+
+        Returns:
+            The info of the chosen solver, with the selected algorithm and the reason for the choice.
+        """
+        if self.result is not None:
+            info = dict(self.result['info'])
+        elif self.solver is not None:
+            info = self.solver.get_info()
+        else:
+            info = {}
+        info['selected algorithm'] = self.selected
+        info['selection reason'] = self.reason
+        if self.estimate is not None:
+            info['difficulty estimate'] = self.estimate  # Linear conflict value of the start
+        if self.raced is not None:
+            info['raced algorithms'] = self.raced
+            info['total time'] = round(self.total_time, 6)  # Wall time of the race, start-up included
+        return info
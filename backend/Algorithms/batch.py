@@ -0,0 +1,85 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+try:
+    from .dispatch import solve
+    from .state import SIZE, PATH_STATES, board_size, default_goal
+except ImportError:  # Running from inside backend/Algorithms
+    from dispatch import solve
+    from state import SIZE, PATH_STATES, board_size, default_goal
+
+_executor = None  # Shared worker pool, created on first use
+
+
+def get_executor():
+    """
+    Returns the shared process pool, with one worker per core.
+
+    Starting worker processes is expensive, so callers that solve many
+    batches (such as the server) reuse this pool rather than creating one
+    per batch.
+    """
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=os.cpu_count())
+    return _executor
+
+
+def solve_job(index, job, path_format=PATH_STATES, budget=None):
+    """
+    Solves one job of a batch inside a worker process.
+
+    Args:
+        index (int): The position of the job in the batch.
+        job (tuple): (start_state, goal_state, algorithm_name); the goal and algorithm are optional.
+            The default goal is the one of the start state's board size (see state.default_goal()).
+        path_format (str): 'states' or 'moves' (see state.format_path()).
+        budget (SearchBudget): Limits of the search (see budget.py), unlimited if None.
+
+    Returns:
+        dict: The result of dispatch.solve() with the job's 'index' added.
+    """
+    start_state, goal_state, algorithm_name = (tuple(job) + (None, None))[:3]
+    goal_state = goal_state or default_goal(board_size(start_state) or SIZE)
+    result = solve(start_state, goal_state, algorithm_name or 'bfs', path_format, budget)
+    result['index'] = index
+    return result
+
+
+def solve_batch(jobs, ordered=True, executor=None, path_format=PATH_STATES, budget=None):
+    """
+    Solves many boards in parallel worker processes.
+
+    Args:
+        jobs (iterable): (start_state, goal_state, algorithm_name) tuples.
+        ordered (bool): Yield results in job order; otherwise yield each one as soon as it finishes.
+        executor (Executor): The pool to run on (default is the shared pool from get_executor()).
+        path_format (str): 'states' or 'moves'. Move strings are much smaller to send back
+            from the workers (see state.format_path()).
+        budget (SearchBudget): Limits applied to each job separately. It is copied to the
+            workers, so it cannot hold a cancel token.
+
+    Yields:
+        dict: One result per job, see solve_job().
+    """
+    executor = executor or get_executor()
+    futures = [executor.submit(solve_job, index, job, path_format, budget) for index, job in enumerate(jobs)]
+    if ordered:
+        for future in futures:
+            yield future.result()
+    else:
+        for future in as_completed(futures):
+            yield future.result()
+
+
+if __name__ == '__main__':
+    # Offline evaluation: python batch.py jobs.txt, one "start [goal] [algorithm]" job per line.
+    # Prints one JSON result per line, in the order the jobs finish.
+    import json
+    import sys
+
+    with open(sys.argv[1]) if len(sys.argv) > 1 else sys.stdin as file:
+        jobs = [line.split() for line in file if line.strip()]
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as pool:
+        for result in solve_batch(jobs, ordered=False, executor=pool):
+            print(json.dumps(result))
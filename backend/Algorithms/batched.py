@@ -0,0 +1,339 @@
+"""
+Batched IDA* over many boards at once, vectorized with NumPy.
+
+Boards are rows of an (N, cells) uint8 array of tiles. Every IDA* iteration
+expands the nodes of all the boards level by level: the successors of a
+whole level are built with a few array operations from precomputed move
+tables, scored with vectorized Manhattan and linear conflict lookups, and
+those whose f exceeds their board's bound are pruned. For offline dataset
+generation this replaces thousands of per-board Python loops.
+
+    python batched.py boards.txt
+
+NumPy is an optional dependency (``pip install numpy``); the per-board
+solvers in dispatch.py do not need it.
+"""
+
+import math
+import time
+
+try:
+    import numpy as np
+except ImportError:  # Optional, only BatchedIDAStar needs it
+    np = None
+
+try:
+    from .Astar import conflict_tables, heuristic_table
+    from .budget import SearchBudget
+    from .state import GOAL_STATE, SOLVED, NOT_FOUND, STOPPED, PATH_STATES, PATH_MOVES, board_of, check_puzzle
+except ImportError:  # Running from inside backend/Algorithms
+    from Astar import conflict_tables, heuristic_table
+    from budget import SearchBudget
+    from state import GOAL_STATE, SOLVED, NOT_FOUND, STOPPED, PATH_STATES, PATH_MOVES, board_of, check_puzzle
+
+HEURISTICS = ('Manhattan', 'LinearConflict')
+BATCH_SIZE = 1024  # Boards searched together; the nodes of a whole iteration are kept for the paths
+
+
+def encode_boards(states):
+    """
+    Packs puzzle strings into an (N, cells) uint8 array of tiles.
+
+    Args:
+        states (list): Puzzle strings of the same size.
+
+    Returns:
+        numpy.ndarray: boards[n, cell] is the tile at cell of the n-th board.
+    """
+    return np.array([[int(tile, 36) for tile in state] for state in states], dtype=np.uint8).reshape(len(states), -1)
+
+
+class BatchedHeuristic:
+    def __init__(self, goal_state=GOAL_STATE, heuristic='Manhattan'):
+        """
+        Precomputes the array versions of the heuristic and move tables of a goal.
+
+        Args:
+            goal_state (str): The goal state of the puzzle.
+            heuristic (str): 'Manhattan' or 'LinearConflict'.
+
+        Raises:
+            ImportError: If NumPy is not installed.
+            ValueError: If the heuristic is not one of HEURISTICS.
+        """
+        if np is None:
+            raise ImportError('Batched solving needs NumPy (pip install numpy)')
+        if heuristic not in HEURISTICS:
+            raise ValueError(f'Batched solving supports {", ".join(HEURISTICS)}, not {heuristic}')
+        board = self.board = board_of(goal_state)
+        self.heuristic = heuristic
+        self.distances = np.array(heuristic_table(goal_state, 'Manhattan'), dtype=np.int16)  # [tile, cell]
+        # targets[blank] lists the cells the blank can move to, padded with -1
+        self.targets = np.full((board.cells, 4), -1, dtype=np.int16)
+        for blank, cells in enumerate(board.neighbors_of):
+            self.targets[blank, :len(cells)] = cells
+        self.conflicts = None
+        if heuristic == 'LinearConflict':
+            weights, penalties, _, _ = conflict_tables(goal_state)
+            size = board.size
+            self.line_cells = np.array([[line * size + p for p in range(size)] for line in range(size)]
+                                       + [[p * size + line for p in range(size)] for line in range(size)])
+            self.conflicts = (np.array(weights, dtype=np.int32), np.frombuffer(penalties, dtype=np.uint8))
+
+    def manhattan(self, boards):
+        """
+        Returns the Manhattan distance of every board, as an int16 array.
+        """
+        return self.distances[boards, np.arange(boards.shape[1])].sum(axis=1, dtype=np.int16)
+
+    def linear_conflict(self, boards):
+        """
+        Returns the linear conflict penalty of every board (see Astar.conflict_tables()).
+        """
+        weights, penalties = self.conflicts
+        lines = np.arange(len(self.line_cells))[:, None]
+        positions = np.arange(self.board.size)
+        codes = weights[lines, positions, boards[:, self.line_cells]].sum(axis=2)  # (N, lines)
+        return penalties[codes].sum(axis=1, dtype=np.int16)
+
+    def evaluate(self, boards):
+        """
+        Returns the heuristic value of every board.
+
+        Args:
+            boards (numpy.ndarray): An (N, cells) array of tiles, see encode_boards().
+
+        Returns:
+            numpy.ndarray: The N values, as int16.
+        """
+        values = self.manhattan(boards)
+        if self.conflicts is not None:
+            values += self.linear_conflict(boards)
+        return values
+
+    def successors(self, boards, blanks, previous):
+        """
+        Generates the successors of many boards at once.
+
+        Moves that put the blank back where it came from are left out.
+
+        Args:
+            boards (numpy.ndarray): An (N, cells) array of tiles.
+            blanks (numpy.ndarray): The cell of the blank of every board.
+            previous (numpy.ndarray): The cell the blank left in the last move, or -1.
+
+        Returns:
+            tuple: (parents, children, targets, tiles): the row of the board each successor comes
+            from, the (M, cells) successors, the blank's new cell and the tile that moved.
+        """
+        targets = self.targets[blanks]  # (N, 4)
+        valid = (targets >= 0) & (targets != previous[:, None])
+        parents, slots = np.nonzero(valid)
+        targets = targets[parents, slots]
+        children = boards[parents]  # Fancy indexing copies the rows
+        rows = np.arange(len(parents))
+        tiles = children[rows, targets]
+        children[rows, blanks[parents]] = tiles
+        children[rows, targets] = 0
+        return parents, children, targets, tiles
+
+
+class BatchedIDAStar:
+    def __init__(self, start_states, goal_state=GOAL_STATE, heuristic='Manhattan', batch_size=BATCH_SIZE,
+                 max_bound=500, path_format=PATH_STATES, budget=None):
+        """
+        Initializes a batched IDA* search over many boards with the same goal.
+
+        Args:
+            start_states (list): The puzzle strings to solve.
+            goal_state (str): The goal state of every board (default is GOAL_STATE).
+            heuristic (str): 'Manhattan' or 'LinearConflict' (default is 'Manhattan').
+            batch_size (int): Boards searched together (default is BATCH_SIZE).
+            max_bound (int): The largest f bound to try before giving up.
+            path_format (str): Return the paths as puzzle strings ('states') or as move strings
+                such as 'RDLU' ('moves', see state.format_path()) (default is 'states').
+            budget (SearchBudget): Node and time limits and a cancel token (see budget.py), shared by
+                the whole batch.
+
+        Raises:
+            ImportError: If NumPy is not installed.
+        """
+        self.start_states = list(start_states)
+        self.goal_state = goal_state
+        self.estimator = BatchedHeuristic(goal_state, heuristic)
+        self.board = self.estimator.board
+        self.batch_size = batch_size
+        self.max_bound = max_bound
+        self.path_format = path_format  # 'states' or 'moves', see state.format_path()
+        self.budget = budget or SearchBudget()  # Limits of every run, unlimited by default
+        self.statuses = []  # Outcome of every board (see state.py)
+        self.costs = []  # Number of moves of every path, inf if there is none
+        self.explored_nodes = 0  # Nodes expanded over all boards
+        self.total_time = 0  # Total time taken to complete the search
+        self.stop_reason = None  # Limit that stopped the last run (see budget.py)
+
+    def run(self):
+        """
+        Solves every board.
+
+        Invalid and unsolvable boards are reported as such and not searched.
+        The boards are searched batch_size at a time; within a batch, every
+        board runs its own IDA* iterations with its own bound, in lock step.
+
+        Returns:
+            list: The path of every board in self.path_format (None if it has none). Statuses
+            and costs are in self.statuses and self.costs.
+        """
+        start_time = time.perf_counter_ns()  # Start timing the search
+        self.budget.start()
+        self.stop_reason = None
+        self.explored_nodes = 0
+        self.statuses = [check_puzzle(state, self.goal_state) for state in self.start_states]
+        self.costs = [math.inf] * len(self.start_states)
+        paths = [None] * len(self.start_states)
+        pending = [index for index, status in enumerate(self.statuses) if not status]
+        for first in range(0, len(pending), self.batch_size):
+            indices = pending[first:first + self.batch_size]
+            if self.stop_reason:  # Out of budget, the remaining boards are not searched
+                for index in indices:
+                    self.statuses[index] = STOPPED
+                continue
+            for index, moves in zip(indices, self.search_batch(indices)):
+                if moves is None:
+                    continue
+                self.costs[index] = len(moves)
+                paths[index] = moves if self.path_format == PATH_MOVES else \
+                    self.board.apply_moves(self.start_states[index], moves)
+        self.total_time = (time.perf_counter_ns() - start_time) / 1e9
+        return paths
+
+    def search_batch(self, indices):
+        """
+        Runs IDA* on a batch of boards, one level of every iteration at a time.
+
+        Each iteration keeps, for every level, the parent row and the blank
+        cell of its nodes, so the moves of a board are rebuilt from its goal
+        node. A board is solved at the first level where one of its nodes has
+        h = 0; as in IDA*, that path is optimal.
+
+        Unlike IDA*, memory grows with the nodes of an iteration rather than
+        with the depth, which suits the 8-puzzle and easy 15-puzzle boards.
+        The budget's max_frontier bounds a level and max_memory the nodes kept.
+
+        Args:
+            indices (list): Indices into self.start_states of boards to search.
+
+        Returns:
+            list: The move string of every board, or None. Statuses are set in self.statuses.
+        """
+        estimator = self.estimator
+        starts = encode_boards([self.start_states[index] for index in indices])
+        start_blanks = np.argmin(starts, axis=1)  # The blank is the only 0
+        start_values = estimator.evaluate(starts)
+        bounds = start_values.astype(np.int32)
+        active = np.ones(len(indices), dtype=bool)  # Boards still searched
+        moves = [None] * len(indices)
+        exhausted = self.budget.exhausted
+
+        while active.any():
+            roots = np.flatnonzero(active)
+            boards, owners, blanks, values = starts[roots], roots, start_blanks[roots], start_values[roots]
+            previous = np.full(len(roots), -1, dtype=np.int16)
+            parents = np.full(len(roots), -1)
+            next_bounds = np.full(len(indices), np.iinfo(np.int32).max, dtype=np.int32)
+            levels = []  # (parent rows, blank cells) of every level of this iteration
+            stored = 0  # Nodes in levels
+            depth = 0
+            while len(boards):
+                solved = values == 0
+                if solved.any():  # Goals found at this depth, which is their bound
+                    for row in np.flatnonzero(solved):
+                        owner = owners[row]
+                        if active[owner]:
+                            active[owner] = False
+                            moves[owner] = self.get_moves(levels, parents[row], blanks[row])
+                            self.statuses[indices[owner]] = SOLVED
+                    keep = active[owners]
+                    boards, owners, blanks, values = boards[keep], owners[keep], blanks[keep], values[keep]
+                    previous, parents = previous[keep], parents[keep]
+                levels.append((parents, blanks))
+                stored += len(boards)
+                self.explored_nodes += len(boards)
+                self.stop_reason = exhausted(self.explored_nodes, len(boards), stored)
+                if self.stop_reason:  # Out of budget, report the boards solved so far
+                    for owner in np.flatnonzero(active):
+                        self.statuses[indices[owner]] = STOPPED
+                    return moves
+
+                rows, children, targets, tiles = estimator.successors(boards, blanks, previous)
+                if estimator.conflicts is None:  # Only the moved tile changes the Manhattan distance
+                    distances = estimator.distances
+                    child_values = values[rows] - distances[tiles, targets] + distances[tiles, blanks[rows]]
+                else:
+                    child_values = estimator.evaluate(children)
+                child_owners = owners[rows]
+                f = depth + 1 + child_values
+                within = f <= bounds[child_owners]
+                np.minimum.at(next_bounds, child_owners[~within], f[~within])  # Smallest f beyond each bound
+                boards, owners, values = children[within], child_owners[within], child_values[within]
+                previous, blanks, parents = blanks[rows][within], targets[within], rows[within]
+                depth += 1
+
+            # The iteration is over for every board still active: raise its bound
+            exceeded = active & (next_bounds > self.max_bound)  # Nothing pruned, or past max_bound
+            for owner in np.flatnonzero(exceeded):
+                self.statuses[indices[owner]] = NOT_FOUND
+            active &= ~exceeded
+            bounds = np.where(active, next_bounds, bounds)
+        return moves
+
+    def get_moves(self, levels, parent, blank):
+        """
+        Rebuilds the moves of a goal node from the levels of its iteration.
+
+        Args:
+            levels (list): (parent rows, blank cells) of the levels above the goal node.
+            parent (int): The row of the goal node's parent in the last level.
+            blank (int): The cell of the blank in the goal node.
+
+        Returns:
+            str: The moves from the start to the goal, e.g. 'RDLU'.
+        """
+        blanks = [int(blank)]
+        for parents, level_blanks in reversed(levels):
+            blanks.append(int(level_blanks[parent]))
+            parent = parents[parent]
+        blanks.reverse()
+        names = self.board.move_names
+        return ''.join(names[current - previous] for previous, current in zip(blanks, blanks[1:]))
+
+    def get_info(self):
+        """
+        Returns information about the search process.
+
+        Returns:
+            A dictionary with the number of explored nodes, the total execution time and the
+            number of boards of each status.
+        """
+        info = {
+            'explored nodes': self.explored_nodes,  # Nodes expanded over all boards
+            'total time': round(self.total_time, 6),  # Total time taken for the search
+            'boards': len(self.start_states),
+        }
+        for status in self.statuses:
+            info[status] = info.get(status, 0) + 1
+        return info
+
+
+if __name__ == '__main__':
+    # Offline dataset generation: python batched.py boards.txt, one board per line.
+    # Prints "board moves" per line, with "-" for boards without a path.
+    import sys
+
+    with open(sys.argv[1]) if len(sys.argv) > 1 else sys.stdin as file:
+        boards = [line.strip() for line in file if line.strip()]
+    solver = BatchedIDAStar(boards, goal_state=board_of(boards[0]).goal_state if boards else GOAL_STATE,
+                            heuristic='LinearConflict', path_format=PATH_MOVES)
+    for board, moves in zip(boards, solver.run()):
+        print(board, '-' if moves is None else moves)
+    print(solver.get_info(), file=sys.stderr)
@@ -0,0 +1,259 @@
+"""
+Benchmark of the solvers over a fixed corpus of boards at every optimal depth.
+
+The corpus is drawn from the distance table, so every board's optimal path
+length is known exactly: per_depth boards for each depth from 0 to 31 (fewer
+where fewer boards exist), chosen with a seeded random generator so every
+run and every commit sees the same boards.
+
+    python benchmark.py --output results.json
+    python benchmark.py --algorithms a-starm ida-star --compare results.json
+
+Results are written as JSON: the corpus, one record per run and a summary per
+algorithm with nodes/sec, latency percentiles, peak memory and optimality.
+Each summary also gives the node reduction against a baseline (A* with the
+Manhattan distance by default), which is how the heuristics are compared.
+"""
+
+import argparse
+import json
+import platform
+import random
+import subprocess
+import time
+import tracemalloc
+
+try:
+    from .budget import SearchBudget
+    from .dispatch import solve
+    from .distance_table import load_table
+    from .state import GOAL_STATE, PATH_MOVES, SOLVED, decode, unrank
+except ImportError:  # Running from inside backend/Algorithms
+    from budget import SearchBudget
+    from dispatch import solve
+    from distance_table import load_table
+    from state import GOAL_STATE, PATH_MOVES, SOLVED, decode, unrank
+
+DEFAULT_ALGORITHMS = ('a-starm', 'a-stare', 'a-starlc', 'a-starwd', 'a-starpdb', 'bfs', 'dfs', 'dls')
+DEFAULT_BASELINE = 'a-starm'  # Node reductions are measured against this algorithm
+MAX_DEPTH = 31  # The hardest 8-puzzle boards need 31 moves
+
+
+def build_corpus(per_depth=2, max_depth=MAX_DEPTH, goal_state=GOAL_STATE, seed=0):
+    """
+    Picks boards stratified by their optimal distance to the goal.
+
+    Args:
+        per_depth (int): Boards to pick at each depth.
+        max_depth (int): The deepest optimal distance to include.
+        goal_state (str): The goal state of the puzzle.
+        seed (int): Seed of the random choice, the same seed gives the same corpus.
+
+    Returns:
+        list: (optimal depth, board) pairs, shallowest first.
+    """
+    table = load_table(goal_state)
+    by_depth = [[] for _ in range(max_depth + 1)]
+    for index, distance in enumerate(table[:]):  # Slicing the mmap gives bytes, which iterate as ints
+        if distance <= max_depth:
+            by_depth[distance].append(index)
+
+    generator = random.Random(seed)
+    corpus = []
+    for depth, indices in enumerate(by_depth):
+        for index in generator.sample(indices, min(per_depth, len(indices))):
+            corpus.append((depth, decode(unrank(index))))
+    return corpus
+
+
+def percentile(values, q):
+    """
+    Returns the q-th percentile of values (nearest rank), or None if there are none.
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, min(len(ordered) - 1, round(q / 100 * len(ordered)) - 1))]
+
+
+def run_one(board, goal_state, algorithm_name, time_limit=None, measure_memory=True):
+    """
+    Solves one board and measures it.
+
+    The latency is measured on a plain run. Peak memory needs tracemalloc,
+    which slows Python down, so it is measured on a second run.
+
+    Returns:
+        dict: The status, path length, explored nodes, latency (seconds) and peak memory (bytes).
+    """
+    start_time = time.perf_counter()
+    result = solve(board, goal_state, algorithm_name, PATH_MOVES, SearchBudget(time_limit=time_limit))
+    latency = time.perf_counter() - start_time
+
+    peak_memory = None
+    if measure_memory:
+        tracemalloc.start()
+        solve(board, goal_state, algorithm_name, PATH_MOVES, SearchBudget(time_limit=time_limit))
+        peak_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    return {
+        'status': result['status'],
+        'path length': None if result['path'] is None else len(result['path']),
+        'explored nodes': result['info'].get('explored nodes', 0),
+        'latency': latency,
+        'peak memory': peak_memory,
+    }
+
+
+def summarize(runs):
+    """
+    Aggregates the runs of one algorithm.
+
+    Returns:
+        dict: Counts of solved and optimal runs, nodes/sec, latency percentiles
+        (milliseconds) and peak memory (bytes).
+    """
+    solved = [run for run in runs if run['status'] == SOLVED]
+    latencies = [run['latency'] for run in runs]
+    memory = [run['peak memory'] for run in runs if run['peak memory'] is not None]
+    total_time = sum(latencies)
+    return {
+        'runs': len(runs),
+        'solved': len(solved),
+        'optimal': sum(run['path length'] == run['depth'] for run in solved),
+        'nodes': sum(run['explored nodes'] for run in runs),
+        'nodes/sec': round(sum(run['explored nodes'] for run in runs) / total_time) if total_time else None,
+        'p50 ms': round(percentile(latencies, 50) * 1000, 3),
+        'p95 ms': round(percentile(latencies, 95) * 1000, 3),
+        'p99 ms': round(percentile(latencies, 99) * 1000, 3),
+        'peak memory': max(memory) if memory else None,
+        'median peak memory': percentile(memory, 50),
+    }
+
+
+def add_reductions(summary, baseline=DEFAULT_BASELINE):
+    """
+    Adds to every summary how many times fewer nodes it expanded than the baseline.
+
+    Args:
+        summary (dict): Summaries by algorithm, see summarize(). Updated in place.
+        baseline (str): The algorithm to compare with; nothing is added if it did not run.
+    """
+    if baseline not in summary:
+        return
+    baseline_nodes = summary[baseline]['nodes']
+    for algorithm_summary in summary.values():
+        nodes = algorithm_summary['nodes']
+        algorithm_summary['node reduction'] = round(baseline_nodes / nodes, 2) if nodes else None
+
+
+def run_benchmark(corpus, algorithms=DEFAULT_ALGORITHMS, goal_state=GOAL_STATE, time_limit=None,
+                  measure_memory=True, progress=None, baseline=DEFAULT_BASELINE):
+    """
+    Runs every algorithm on every board of the corpus.
+
+    Args:
+        corpus (list): (optimal depth, board) pairs, see build_corpus().
+        algorithms (iterable): Algorithm names (see dispatch.ALGORITHMS).
+        goal_state (str): The goal state of the puzzle.
+        time_limit (float): Seconds each run may take before it is stopped.
+        measure_memory (bool): Also measure peak memory.
+        progress (callable): Called with each finished run record.
+        baseline (str): The algorithm node reductions are measured against (see add_reductions()).
+
+    Returns:
+        dict: 'runs', one record per (algorithm, board), and a 'summary' per algorithm.
+    """
+    runs = []
+    summary = {}
+    for algorithm_name in algorithms:
+        algorithm_runs = []
+        for depth, board in corpus:
+            record = {'algorithm': algorithm_name, 'board': board, 'depth': depth}
+            record.update(run_one(board, goal_state, algorithm_name, time_limit, measure_memory))
+            algorithm_runs.append(record)
+            if progress is not None:
+                progress(record)
+        runs.extend(algorithm_runs)
+        summary[algorithm_name] = summarize(algorithm_runs)
+    add_reductions(summary, baseline)
+    return {'runs': runs, 'summary': summary}
+
+
+def get_environment():
+    """
+    Describes where the benchmark ran, so results from different commits can be told apart.
+    """
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+
+
+def compare(summary, baseline):
+    """
+    Prints how each algorithm changed against the summary of an earlier run.
+    """
+    print(f'\n{"algorithm":<10} {"p50 ms":>21} {"nodes":>25} {"peak memory":>25}')
+    for algorithm_name, current in summary.items():
+        before = baseline.get(algorithm_name)
+        if before is None:
+            continue
+        columns = []
+        for key in ('p50 ms', 'nodes', 'peak memory'):
+            old, new = before.get(key), current.get(key)
+            ratio = f'{new / old:.2f}x' if old and new is not None else '-'
+            columns.append(f'{old} -> {new} ({ratio})')
+        print(f'{algorithm_name:<10} {columns[0]:>21} {columns[1]:>25} {columns[2]:>25}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmarks the solvers on boards of every optimal depth.')
+    parser.add_argument('--algorithms', nargs='+', default=DEFAULT_ALGORITHMS)
+    parser.add_argument('--per-depth', type=int, default=2, help='boards per optimal depth')
+    parser.add_argument('--max-depth', type=int, default=MAX_DEPTH)
+    parser.add_argument('--goal', default=GOAL_STATE)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--time-limit', type=float, default=60, help='seconds before a run is stopped')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='algorithm node reductions are measured against')
+    parser.add_argument('--no-memory', action='store_true', help='skip the (slow) peak memory runs')
+    parser.add_argument('--output', help='write the results to this JSON file')
+    parser.add_argument('--compare', help='JSON results of an earlier run to compare against')
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.per_depth, args.max_depth, args.goal, args.seed)
+    print(f'{len(corpus)} boards, depths 0-{args.max_depth}, seed {args.seed}')
+    results = run_benchmark(corpus, args.algorithms, args.goal, args.time_limit, not args.no_memory,
+                            baseline=args.baseline,
+                            progress=lambda run: print(f'{run["algorithm"]:<10} {run["board"]} depth {run["depth"]:>2}: '
+                                                       f'{run["status"]}, {run["latency"] * 1000:.1f} ms'))
+
+    print(f'\n{"algorithm":<10} {"solved":>7} {"optimal":>8} {"nodes":>10} {"reduction":>10} {"nodes/sec":>10} '
+          f'{"p50 ms":>9} {"p95 ms":>9} {"p99 ms":>9} {"peak KB":>9}')
+    for algorithm_name, summary in results['summary'].items():
+        peak = '-' if summary['peak memory'] is None else summary['peak memory'] // 1024
+        reduction = summary.get('node reduction')
+        reduction = '-' if reduction is None else f'{reduction}x'
+        print(f'{algorithm_name:<10} {summary["solved"]:>7} {summary["optimal"]:>8} {summary["nodes"]:>10} '
+              f'{reduction:>10} {summary["nodes/sec"]:>10} {summary["p50 ms"]:>9} {summary["p95 ms"]:>9} '
+              f'{summary["p99 ms"]:>9} {peak:>9}')
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump({
+                'environment': get_environment(),
+                'settings': {key: value for key, value in vars(args).items() if key not in ('output', 'compare')},
+                'corpus': corpus,
+                **results,
+            }, file, indent=1)
+    if args.compare:
+        with open(args.compare) as file:
+            compare(results['summary'], json.load(file)['summary'])
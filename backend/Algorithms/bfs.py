@@ -1,53 +1,121 @@
-import queue
+import math
 import time
 
+try:
+    from .budget import SearchBudget
+    from .state import SOLVED, NOT_FOUND, STOPPED, CELLS, check_puzzle, board_of, rank
+except ImportError:  # Running from inside backend/Algorithms
+    from budget import SearchBudget
+    from state import SOLVED, NOT_FOUND, STOPPED, CELLS, check_puzzle, board_of, rank
+
+UNVISITED = 255  # Parent table entry of a state that has not been reached
+START = 254  # Parent table entry of the start state
+
+
+class ParentDict(dict):
+    """
+    Parent table of boards with too many permutations for a flat table (4x4 and up).
+    Keyed by packed state; states that were never stored read as UNVISITED.
+    """
+
+    def __missing__(self, state):
+        return UNVISITED
+
+
 class BFS:
-    def __init__(self, start_state, goal_state='012345678'):
+    def __init__(self, start_state, goal_state='012345678', path_format='states', budget=None, metrics=None):
         """
         Initializes the BFS search algorithm.
 
         Args:
             start_state (str): The initial state of the puzzle.
             goal_state (str): The goal state of the puzzle (default is '012345678').
-            heuristic (str): The heuristic function to use (not used in BFS but present for consistency).
+            path_format (str): Return the path as puzzle strings ('states') or as a move string
+                such as 'RDLU' ('moves', see state.format_path()) (default is 'states').
+            budget (SearchBudget): Node, time, frontier and memory limits and a cancel token (see budget.py).
+            metrics (SearchMetrics): Counters to fill in during the search (see instrumentation.py);
+                None collects nothing.
         """
         self.start_state = start_state
         self.goal_state = goal_state
+        self.board = board_of(goal_state)  # Geometry and move tables of the board size
+        self.path_format = path_format  # 'states' or 'moves', see state.format_path()
         self.explored_nodes = 0  # Count of how many nodes have been explored
         self.search_depth = 0  # Maximum depth reached during the search
         self.total_time = 0  # Time taken to complete the search
+        self.status = None  # Outcome of the last run (see state.py)
+        self.budget = budget or SearchBudget()  # Limits of every run, unlimited by default
+        self.stop_reason = None  # Limit that stopped the last run (see budget.py)
+        self.metrics = metrics  # Optional counters of the search (see instrumentation.py)
 
     def run(self):
         """
         Executes the BFS algorithm.
 
         Returns:
-            A tuple of the path to the goal state and the total cost (which is not used in BFS).
+            A list representing the path to the goal state, or None if no path is found.
         """
-        start_time = time.time()  # Start timing the execution
-        frontier = queue.Queue()  # FIFO queue for nodes to explore
-        frontier.put([self.start_state,0])  # Add the start state to the frontier
-        came_from = {}  # Tracks the path to each node
-        visited = {self.start_state: 0}  # Tracks visited states
-
-        while not frontier.empty():  # Loop while the frontier is not empty
-            current,path_length = frontier.get()  # Dequeue the next state to explore
-            self.explored_nodes += 1  # Increment the explored node count
-            self.search_depth = max(self.search_depth, path_length)  # Update the maximum search depth
-
-
-            if current == self.goal_state:  # Check if the goal state is reached
-                self.total_time = time.time() - start_time  # Calculate total time
-                return self.get_path(came_from, current)  # Return the path
-
-            # Explore neighbors of the current state
-            for next_state in self.get_neighbors(current):
-                if next_state not in visited:  # Process only unvisited states
-                    visited[next_state] = 0  # Mark the state as visited
-                    frontier.put([next_state,path_length+1])  # Add the neighbor to the frontier
-                    came_from[next_state] = current  # Record where we came from
-
-        self.total_time = time.time() - start_time  # If no solution, compute total time
+        self.status = check_puzzle(self.start_state, self.goal_state)
+        if self.status:  # Invalid or unsolvable input, there is nothing to search
+            return None
+
+        metrics = self.metrics
+        if metrics is not None:
+            metrics.start()
+        board = self.board
+        start = board.encode(self.start_state)  # Packed start state
+        goal = board.encode(self.goal_state)  # Packed goal state
+        start_time = time.perf_counter_ns()  # Start timing the execution
+        exhausted = self.budget.exhausted
+        self.budget.start()
+        self.stop_reason = None
+        # One byte per board, indexed by permutation rank: the blank position before the
+        # move that first reached the board. It doubles as the visited set. Larger boards
+        # have too many permutations for that and use a dict keyed by state instead.
+        index_of = self.get_index()
+        parents = bytearray([UNVISITED]) * math.factorial(CELLS) if index_of is rank else ParentDict()
+        parents[index_of(start)] = START
+        moves, blank_shift, mask = board.moves, board.blank_shift, board.tile_mask
+        layer = [start]  # All states at the current depth
+        depth = 0
+        visited_count = 1  # States reached so far, the parent table entries in use
+        if metrics is not None:
+            metrics.mark('setup')
+
+        while layer:  # Expand the search one layer at a time
+            self.search_depth = depth  # Update the maximum search depth
+            next_layer = []
+            for current in layer:
+                self.stop_reason = exhausted(self.explored_nodes, len(layer) + len(next_layer), visited_count)
+                if self.stop_reason:  # Out of budget, report what was searched so far
+                    self.total_time = (time.perf_counter_ns() - start_time) / 1e9
+                    self.status = STOPPED
+                    return None
+                self.explored_nodes += 1  # Increment the explored node count
+
+                if current == goal:  # Check if the goal state is reached
+                    self.total_time = (time.perf_counter_ns() - start_time) / 1e9  # Calculate total time
+                    self.status = SOLVED
+                    return self.get_path(parents, current)  # Return the path
+
+                # Explore neighbors of the current state
+                blank = current >> blank_shift
+                frontier_size = len(next_layer)
+                for _, shift, factor, delta in moves[blank]:
+                    next_state = current + ((current >> shift) & mask) * factor + delta
+                    index = index_of(next_state)
+                    if parents[index] == UNVISITED:  # Process only unvisited states
+                        parents[index] = blank  # Record the move that reached it
+                        next_layer.append(next_state)
+                added = len(next_layer) - frontier_size
+                visited_count += added
+                if metrics is not None:
+                    metrics.expand(len(moves[blank]), added, len(layer) + len(next_layer), visited_count)
+            layer = next_layer
+            depth += 1
+
+        self.total_time = (time.perf_counter_ns() - start_time) / 1e9  # If no solution, compute total time
+        self.status = NOT_FOUND
         return None  # Return no solution
 
     def get_neighbors(self, state):
@@ -55,78 +123,47 @@ class BFS:
         Finds the neighboring states by moving the blank tile ('0') up, down, left, or right.
 
         Args:
-            state (str): The current state of the puzzle.
+            state (int): The current packed state of the puzzle.
 
         Returns:
-            A list of tuples where each tuple contains the neighbor state and the associated move cost.
+            list: The neighboring packed states.
         """
-        i = state.index('0')  # Find the index of the blank space (0)
-        y, x = divmod(i, 3)
-        # print(i,x,y)
-        neighbors = []
-
-        # Move the blank tile up (if possible)
-        if y > 0:
-            # print("up")
-            up = self.swap(state, i, i - 3)  # Swap the blank tile with the tile above
-            neighbors.append(up)
-
-        # Move the blank tile right (if possible)
-        if x < 2:  
-            # print("right")
-            right = self.swap(state, i, i + 1)  # Swap the blank tile with the tile on the right
-            neighbors.append(right)
-
-        # Move the blank tile left (if possible)
-        if x > 0:
-            # print("left")
-            left = self.swap(state, i, i - 1)  # Swap the blank tile with the tile on the left
-            neighbors.append(left)
-
-        # Move the blank tile down (if possible)
-        if y < 2:
-            # print("down")
-            down = self.swap(state, i, i + 3)  # Swap the blank tile with the tile below
-            neighbors.append(down)
-
-        return neighbors
-
-
-    def swap(self, state, i, j):
-        """
-        Swaps two characters in the puzzle state string.
-
-        Args:
-            state (str): The current state of the puzzle.
-            i (int): Index of the first character.
-            j (int): Index of the second character.
+        return self.board.neighbors(state)
 
-        Returns:
-            str: A new state with the characters swapped.
+    def get_index(self):
+        """
+        Returns the function that gives the parent table entry of a packed state:
+        its permutation rank on the 3x3 board, the state itself on larger boards.
         """
-        state = list(state)  # Convert the state to a list for mutability
-        state[i], state[j] = state[j], state[i]  # Swap the tiles
-        return ''.join(state)  # Return the modified state as a string
+        return rank if self.board.cells == CELLS else int
 
-    def get_path(self, came_from, current):
+    def get_path(self, parents, current):
         """
         Reconstructs the path from the start state to the goal state.
 
         Args:
-            came_from (dict): Tracks the predecessor of each state.
-            current (str): The current state (goal state).
+            parents (bytearray): The blank position before the move that reached each state, by rank
+                (a ParentDict keyed by state on larger boards).
+            current (int): The current packed state (goal state).
 
         Returns:
-            list: The path from the start to the goal state.
+            The path from the start to the goal state, in self.path_format.
         """
-        path = []
-        while current in came_from:  # Trace back from the goal to the start
-            path.append(current)  # Add each state to the path
-            current = came_from[current]  # Move to the predecessor state
+        if self.metrics is not None:
+            self.metrics.mark('search')
+        index_of = self.get_index()
+        path = [current]
+        previous_blank = parents[index_of(current)]
+        while previous_blank != START:  # Undo the moves back to the start
+            current = self.board.move(current, previous_blank)
+            path.append(current)
+            previous_blank = parents[index_of(current)]
         path.reverse()  # Reverse the path to start with the initial state
+        path = self.board.format_path(path, self.path_format)
+        if self.metrics is not None:
+            self.metrics.mark('path')
         return path
 
-
     def get_info(self):
         """
         Returns information about the search process.
@@ -135,8 +172,11 @@ class BFS:
             A dictionary containing the number of explored nodes, total execution time, and search depth.
         """
 
-        return {
+        info = {
             'explored nodes': self.explored_nodes,  # Number of nodes explored
-            'total time': round(self.total_time,3),  # Total time taken for the search
+            'total time': round(self.total_time, 6),  # Total time taken for the search
             'max search depth': self.search_depth,  # Maximum search depth reached
-        }
\ No newline at end of file
+        }
+        if self.metrics is not None:  # Counters of the instrumented search
+            info.update(self.metrics.get_info())
+        return info
\ No newline at end of file
@@ -0,0 +1,182 @@
+import time
+
+try:
+    from .budget import SearchBudget
+    from .state import SOLVED, NOT_FOUND, STOPPED, check_puzzle, board_of
+except ImportError:  # Running from inside backend/Algorithms
+    from budget import SearchBudget
+    from state import SOLVED, NOT_FOUND, STOPPED, check_puzzle, board_of
+
+class BidirectionalBFS:
+    def __init__(self, start_state, goal_state='012345678', path_format='states', budget=None, metrics=None):
+        """
+        Initializes the bidirectional BFS search algorithm.
+
+        Args:
+            start_state (str): The initial state of the puzzle.
+            goal_state (str): The goal state of the puzzle (default is '012345678').
+            path_format (str): Return the path as puzzle strings ('states') or as a move string
+                such as 'RDLU' ('moves', see state.format_path()) (default is 'states').
+            budget (SearchBudget): Node, time and frontier limits and a cancel token (see budget.py).
+            metrics (SearchMetrics): Counters to fill in during the search (see instrumentation.py);
+                None collects nothing.
+        """
+        self.start_state = start_state
+        self.goal_state = goal_state
+        self.board = board_of(goal_state)  # Geometry and move tables of the board size
+        self.path_format = path_format  # 'states' or 'moves', see state.format_path()
+        self.explored_nodes = 0  # Count of how many nodes have been explored
+        self.search_depth = 0  # Sum of the depths reached by both searches
+        self.total_time = 0  # Time taken to complete the search
+        self.status = None  # Outcome of the last run (see state.py)
+        self.budget = budget or SearchBudget()  # Limits of every run, unlimited by default
+        self.stop_reason = None  # Limit that stopped the last run (see budget.py)
+        self.metrics = metrics  # Optional counters of the search (see instrumentation.py)
+
+    def run(self):
+        """
+        Executes the bidirectional BFS algorithm.
+
+        One breadth-first search starts from the start state and another from
+        the goal state (moves are reversible, so both use the same neighbours).
+        Each step expands a whole layer of the smaller frontier. Once a layer
+        reaches a state the other side has already visited, the shortest
+        meeting point of that layer gives an optimal path.
+
+        Returns:
+            A list representing the path to the goal state, or None if no path is found.
+        """
+        self.status = check_puzzle(self.start_state, self.goal_state)
+        if self.status:  # Invalid or unsolvable input, there is nothing to search
+            return None
+
+        if self.metrics is not None:
+            self.metrics.start()
+        start = self.board.encode(self.start_state)  # Packed start state
+        goal = self.board.encode(self.goal_state)  # Packed goal state
+        start_time = time.perf_counter_ns()  # Start timing the execution
+        self.budget.start()
+        self.stop_reason = None
+        if start == goal:
+            self.total_time = (time.perf_counter_ns() - start_time) / 1e9
+            self.status = SOLVED
+            return self.board.format_path([start], self.path_format)
+
+        # Each side maps visited states to (predecessor on its side, depth)
+        forward = {start: (None, 0)}
+        backward = {goal: (None, 0)}
+        forward_layer, backward_layer = [start], [goal]
+        forward_depth = backward_depth = 0
+        if self.metrics is not None:
+            self.metrics.mark('setup')
+
+        while forward_layer and backward_layer:
+            if len(forward_layer) <= len(backward_layer):  # Grow the cheaper side
+                forward_layer, meeting = self.expand_layer(forward_layer, forward, backward, forward_depth)
+                forward_depth += 1
+            else:
+                backward_layer, meeting = self.expand_layer(backward_layer, backward, forward, backward_depth)
+                backward_depth += 1
+            self.search_depth = forward_depth + backward_depth
+
+            if meeting is not None:  # The frontiers met
+                self.total_time = (time.perf_counter_ns() - start_time) / 1e9  # Calculate total time
+                self.status = SOLVED
+                return self.get_path(forward, backward, meeting)
+            if self.stop_reason:  # Out of budget, report what was searched so far
+                self.total_time = (time.perf_counter_ns() - start_time) / 1e9
+                self.status = STOPPED
+                return None
+
+        self.total_time = (time.perf_counter_ns() - start_time) / 1e9  # If no solution, compute total time
+        self.status = NOT_FOUND
+        return None  # Return no solution
+
+    def expand_layer(self, layer, visited, other, depth):
+        """
+        Expands every state of one side's current layer.
+
+        Args:
+            layer (list): The packed states at the current depth of this side.
+            visited (dict): This side's visited states, updated in place.
+            other (dict): The other side's visited states.
+            depth (int): The depth of layer.
+
+        Returns:
+            A tuple of the next layer and the best meeting state found (or None). If the
+            budget runs out, the layer is left unfinished and self.stop_reason is set.
+        """
+        exhausted = self.budget.exhausted
+        metrics = self.metrics
+        next_layer = []
+        meeting = None
+        best = None  # Length of the shortest path through a meeting state so far
+        for current in layer:
+            self.stop_reason = exhausted(self.explored_nodes, len(layer) + len(next_layer),
+                                         len(visited) + len(other))  # Both sides count towards max_memory
+            if self.stop_reason:  # Out of budget, run() reports it
+                return next_layer, None
+            self.explored_nodes += 1  # Increment the explored node count
+            children = self.board.neighbors(current)
+            frontier_size = len(next_layer)
+            for next_state in children:
+                if next_state in visited:
+                    continue
+                visited[next_state] = (current, depth + 1)  # Record where we came from
+                next_layer.append(next_state)
+                if next_state in other:  # Both searches reached this state
+                    length = depth + 1 + other[next_state][1]
+                    if best is None or length < best:
+                        best, meeting = length, next_state
+            if metrics is not None:  # The frontier is this side's, the visited states are both sides'
+                metrics.expand(len(children), len(next_layer) - frontier_size,
+                               len(layer) + len(next_layer), len(visited) + len(other))
+        return next_layer, meeting
+
+    def get_path(self, forward, backward, meeting):
+        """
+        Stitches the two halves of the path together at the meeting state.
+
+        Args:
+            forward (dict): Predecessors towards the start state.
+            backward (dict): Predecessors towards the goal state.
+            meeting (int): The packed state where the searches met.
+
+        Returns:
+            The path from the start to the goal state, excluding the start state, in self.path_format.
+        """
+        if self.metrics is not None:
+            self.metrics.mark('search')
+        first_half = []
+        current = meeting
+        while current is not None:  # Trace back from the meeting state to the start
+            first_half.append(current)
+            current = forward[current][0]
+        first_half.reverse()
+
+        second_half = []
+        current = backward[meeting][0]
+        while current is not None:  # Follow the backward search to the goal
+            second_half.append(current)
+            current = backward[current][0]
+        path = self.board.format_path(first_half + second_half, self.path_format)
+        if self.metrics is not None:
+            self.metrics.mark('path')
+        return path
+
+    def get_info(self):
+        """
+        Returns information about the search process.
+
+        Returns:
+            A dictionary containing the number of explored nodes, total execution time, and search depth.
+        """
+
+        info = {
+            'explored nodes': self.explored_nodes,  # Number of nodes explored
+            'total time': round(self.total_time, 6),  # Total time taken for the search
+            'max search depth': self.search_depth,  # Combined depth of both searches
+        }
+        if self.metrics is not None:  # Counters of the instrumented search
+            info.update(self.metrics.get_info())
+        return info
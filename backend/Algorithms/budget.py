@@ -0,0 +1,96 @@
+"""
+Search budgets: limits that stop a solver before it exhausts the state space.
+
+A solver given a SearchBudget calls exhausted() once per expanded node. When a
+limit is hit the solver stops, sets its status to STOPPED (see state.py),
+records the limit in its ``stop_reason`` attribute and returns no path, while
+get_info() still reports the work done so far.
+
+max_memory caps the states a search keeps. The memory-bounded solvers (SMA*,
+DFS with a path-only cycle check) stay within it; the others are stopped with
+MEMORY_LIMIT when they would go over.
+"""
+
+import time
+
+# Reasons a search was stopped, stored by the solvers in their ``stop_reason`` attribute
+NODE_LIMIT = 'node limit'
+TIME_LIMIT = 'time limit'
+FRONTIER_LIMIT = 'frontier limit'
+MEMORY_LIMIT = 'memory limit'
+CANCELLED = 'cancelled'
+
+CHECK_INTERVAL = 1024  # Nodes expanded between checks of the clock, frontier and cancel token
+
+
+class SearchBudget:
+    def __init__(self, max_nodes=None, time_limit=None, max_frontier=None, cancel_token=None, max_memory=None):
+        """
+        Initializes a search budget. Every limit is optional.
+
+        Args:
+            max_nodes (int): Maximum number of nodes to expand.
+            time_limit (float): Wall-clock seconds the search may run.
+            max_frontier (int): Maximum number of states waiting to be expanded.
+            cancel_token: Any object with an is_set() method, such as a threading.Event.
+                The search stops soon after it is set.
+            max_memory (int): Maximum number of states kept in memory (visited, frontier or path).
+        """
+        self.max_nodes = max_nodes
+        self.time_limit = time_limit
+        self.max_frontier = max_frontier
+        self.cancel_token = cancel_token
+        self.max_memory = max_memory
+        self.deadline = None  # Time at which the running search must stop, set by start()
+        self.next_check = None  # Node count at which exhausted() next does any work
+
+    def start(self):
+        """
+        Starts the clock. Solvers call this at the start of run(), so a budget
+        can be reused for several searches, one at a time.
+        """
+        self.deadline = None if self.time_limit is None else time.time() + self.time_limit
+        self.next_check = 0
+
+    def get_memory_limit(self, limit=None):
+        """
+        Returns the memory a memory-bounded solver may use: the smaller of its
+        own limit and max_memory, or None if neither is set.
+        """
+        if limit is None or self.max_memory is None:
+            return self.max_memory if limit is None else limit
+        return min(limit, self.max_memory)
+
+    def exhausted(self, nodes, frontier_size=0, stored=0):
+        """
+        Checks the budget. Cheap enough to call for every expanded node: the
+        clock, the frontier size, the stored states and the cancel token are
+        only looked at every CHECK_INTERVAL nodes, so the frontier, memory and
+        time limits may overshoot slightly. The node limit is exact, except
+        in HDA* (see hda_star.py).
+
+        Args:
+            nodes (int): The number of nodes expanded so far.
+            frontier_size (int): The number of states waiting to be expanded.
+            stored (int): The number of states kept in memory.
+
+        Returns:
+            str: The limit that was hit (NODE_LIMIT, TIME_LIMIT, FRONTIER_LIMIT, MEMORY_LIMIT or
+            CANCELLED), or None if the search may continue.
+        """
+        if nodes < self.next_check:
+            return None
+        self.next_check = nodes + CHECK_INTERVAL
+        if self.max_nodes is not None:
+            if nodes >= self.max_nodes:
+                return NODE_LIMIT
+            self.next_check = min(self.next_check, self.max_nodes)
+        if self.cancel_token is not None and self.cancel_token.is_set():
+            return CANCELLED
+        if self.deadline is not None and time.time() >= self.deadline:
+            return TIME_LIMIT
+        if self.max_frontier is not None and frontier_size > self.max_frontier:
+            return FRONTIER_LIMIT
+        if self.max_memory is not None and stored > self.max_memory:
+            return MEMORY_LIMIT
+        return None
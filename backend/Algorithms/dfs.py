@@ -1,130 +1,262 @@
-import queue
 import time
 
+try:
+    from .budget import MEMORY_LIMIT, SearchBudget
+    from .state import SOLVED, NOT_FOUND, STOPPED, check_puzzle, board_of
+except ImportError:  # Running from inside backend/Algorithms
+    from budget import MEMORY_LIMIT, SearchBudget
+    from state import SOLVED, NOT_FOUND, STOPPED, check_puzzle, board_of
+
 class DFS:
-    def __init__(self, start_state, goal_state='012345678'):
+    def __init__(self, start_state, goal_state='012345678', cycle_check='visited', memory_limit=None,
+                 path_format='states', budget=None, metrics=None):
         """
         Initializes the DFS search algorithm.
 
         Args:
             start_state (str): The initial state of the puzzle.
             goal_state (str): The goal state of the puzzle (default is '012345678').
-            heuristic (str): The heuristic function to use (not used in DFS, included for consistency).
+            cycle_check (str): 'visited' skips every state reached before, which needs a dict of all
+                of them, a predecessor map and a stack of every pushed state; 'path' keeps only the
+                current branch and a set of seen states that fits the memory limit, see path_search()
+                (default is 'visited').
+            memory_limit (int): The most states to keep: with 'path', the branch and the seen set stay
+                within it; with 'visited', the search stops once more are remembered. The budget's
+                max_memory also applies.
+            path_format (str): Return the path as puzzle strings ('states') or as a move string
+                such as 'RDLU' ('moves', see state.format_path()) (default is 'states').
+            budget (SearchBudget): Node, time and frontier limits and a cancel token (see budget.py).
+            metrics (SearchMetrics): Counters to fill in during the search (see instrumentation.py);
+                None collects nothing.
         """
         self.start_state = start_state
         self.goal_state = goal_state
+        self.board = board_of(goal_state)  # Geometry and move tables of the board size
+        if cycle_check not in ('visited', 'path'):
+            raise ValueError(f'Unknown cycle check: {cycle_check}')
+        self.cycle_check = cycle_check
+        self.path_format = path_format  # 'states' or 'moves', see state.format_path()
         self.explored_nodes = 0  # Tracks how many nodes have been explored
         self.search_depth = 0  # Maximum depth reached during the search
         self.total_time = 0  # Total time taken to complete the search
+        self.status = None  # Outcome of the last run (see state.py)
+        self.budget = budget or SearchBudget()  # Limits of every run, unlimited by default
+        self.stop_reason = None  # Limit that stopped the last run (see budget.py)
+        self.metrics = metrics  # Optional counters of the search (see instrumentation.py)
+        self.memory_limit = self.budget.get_memory_limit(memory_limit)  # Most states to keep, None for no limit
+        self.peak_stored = 0  # Most states kept at once
 
     def run(self):
         """
         Executes the DFS algorithm.
 
+        With the 'path' cycle check, the search keeps only the current branch
+        (see path_search()).
+
         Returns:
             A list representing the path to the goal state, or None if no path is found.
         """
-        start_time = time.time()  # Start timing the search
+        self.status = check_puzzle(self.start_state, self.goal_state)
+        if self.status:  # Invalid or unsolvable input, there is nothing to search
+            return None
+
+        metrics = self.metrics
+        if metrics is not None:
+            metrics.start()
+        start = self.board.encode(self.start_state)  # Packed start state
+        goal = self.board.encode(self.goal_state)  # Packed goal state
+        start_time = time.perf_counter_ns()  # Start timing the search
+        exhausted = self.budget.exhausted
+        self.budget.start()
+        self.stop_reason = None
+        if self.cycle_check == 'path':
+            if metrics is not None:
+                metrics.mark('setup')
+            path = self.path_search(start, goal)
+            self.total_time = (time.perf_counter_ns() - start_time) / 1e9  # Calculate total search time
+            if path is not None:
+                self.status = SOLVED
+                return self.get_branch_path(path)  # Return the path to the goal
+            self.status = STOPPED if self.stop_reason else NOT_FOUND
+            return None
+
+        memory_limit = self.memory_limit
         frontier = []  # Stack for DFS exploration
-        frontier.append([self.start_state,0])  # Add the initial state to the stack, path_length
+        frontier.append([start,0])  # Add the initial state to the stack, path_length
         came_from = {}  # Maps each state to its predecessor to reconstruct the path
-        visited = {self.start_state: 0}  # Tracks visited states
+        visited = {start: 0}  # Tracks visited states
+        if metrics is not None:
+            metrics.mark('setup')
 
         while frontier:  # Continue while there are states in the stack
+            self.stop_reason = exhausted(self.explored_nodes, len(frontier))
+            if memory_limit is not None and len(visited) > memory_limit:  # Checked exactly, unlike the budget
+                self.stop_reason = MEMORY_LIMIT
+            if self.stop_reason:  # Out of budget, report what was searched so far
+                self.total_time = (time.perf_counter_ns() - start_time) / 1e9
+                self.peak_stored = len(visited)
+                self.status = STOPPED
+                return None
             current,path_length = frontier.pop()  # Pop the last state added (LIFO)
             self.explored_nodes += 1  # Increment the count of explored nodes
             self.search_depth = max(self.search_depth, path_length)  # Update the maximum search depth
             # self.search_depth = max(self.search_depth, len(self.get_path(came_from,current)))  # Update the maximum search depth
             
 
-            if current == self.goal_state:  # Check if the goal state is reached
-                self.total_time = time.time() - start_time  # Calculate total search time
+            if current == goal:  # Check if the goal state is reached
+                self.total_time = (time.perf_counter_ns() - start_time) / 1e9  # Calculate total search time
+                self.status = SOLVED
+                self.peak_stored = len(visited)
                 return self.get_path(came_from, current)  # Return the path to the goal
 
             # Explore neighbors of the current state
-            for next_state in self.get_neighbors(current):
+            neighbors = self.get_neighbors(current)
+            frontier_size = len(frontier)
+            for next_state in neighbors:
                 if next_state not in visited:  # Only add unvisited states to the stack
                     visited[next_state] = 0  # Mark as visited
                     frontier.append([next_state,path_length+1])  # Add to the stack
                     came_from[next_state] = current  # Track predecessor for path reconstruction
+            if metrics is not None:
+                metrics.expand(len(neighbors), len(frontier) - frontier_size, len(frontier), len(visited))
 
-        self.total_time = time.time() - start_time  # Calculate total time if no solution is found
+        self.total_time = (time.perf_counter_ns() - start_time) / 1e9  # Calculate total time if no solution is found
+        self.peak_stored = len(visited)
+        self.status = NOT_FOUND
         return None  # Return None if no solution exists
 
-    def get_neighbors(self, state):
+    def path_search(self, start, goal):
         """
-        Finds the neighboring states by moving the blank tile ('0') up, down, left, or right.
+        Runs the DFS keeping only the current branch and a bounded set of seen states.
+
+        The stack holds one iterator of unexplored children per state on the
+        branch instead of every state pushed, and the path is the branch
+        itself, so no predecessor map is needed. A state is skipped if it is
+        on the branch or was seen before; without a memory limit every state
+        is remembered, as with the 'visited' check. With a limit, the seen set
+        and the branch together hold at most memory_limit states: once full,
+        an arbitrary seen state is forgotten for each new one, and the branch
+        is not extended past the limit. Forgotten states may be searched again.
+        If the goal was not found and a branch was cut, the run stops with the
+        'memory limit' reason.
 
         Args:
-            state (str): The current state of the puzzle.
+            start (int): The packed start state.
+            goal (int): The packed goal state.
 
         Returns:
-            A list of tuples where each tuple contains the neighbor state and the associated move cost.
+            list: The packed states from start to goal, or None. If the search was cut short,
+            None is returned and self.stop_reason is set.
         """
-        i = state.index('0')  # Find the index of the blank space (0)
-        y, x = divmod(i, 3)
-        # print(i,x,y)
-        neighbors = []
+        self.explored_nodes += 1  # The start state
+        self.peak_stored = 1
+        if start == goal:
+            return [start]
 
-        # Move the blank tile up (if possible)
-        if y > 0:
-            # print("up")
-            up = self.swap(state, i, i - 3)  # Swap the blank tile with the tile above
-            neighbors.append(up)
+        memory_limit = self.memory_limit
+        cut = False  # Whether a branch was cut at the memory limit
+        exhausted = self.budget.exhausted
+        metrics = self.metrics
+        path = [start]  # States on the current branch
+        on_path = {start}  # Same states, for O(1) cycle checks
+        seen = {start}  # States searched before, while there is room for them
+        children = self.get_neighbors(start)
+        stack = [reversed(children)]  # Unexplored children of every state on the path, last neighbour first
+        if metrics is not None:
+            self.record_expansion(children, on_path, seen)
 
-        # Move the blank tile right (if possible)
-        if x < 2:  
-            # print("right")
-            right = self.swap(state, i, i + 1)  # Swap the blank tile with the tile on the right
-            neighbors.append(right)
+        while stack:
+            for next_state in stack[-1]:  # Take the next child not on the path and not seen
+                if next_state not in on_path and next_state not in seen:
+                    break
+            else:  # All children explored, backtrack
+                stack.pop()
+                on_path.discard(path.pop())
+                continue
 
-        # Move the blank tile left (if possible)
-        if x > 0:
-            # print("left")
-            left = self.swap(state, i, i - 1)  # Swap the blank tile with the tile on the left
-            neighbors.append(left)
+            self.stop_reason = exhausted(self.explored_nodes, len(path), len(seen) + len(path))
+            if self.stop_reason:  # Out of budget, run() reports it
+                return None
+            self.explored_nodes += 1  # Increment the count of explored nodes
+            self.search_depth = max(self.search_depth, len(path))  # Update the maximum search depth
+            if next_state == goal:  # Check if the goal state is reached
+                path.append(next_state)
+                return path
 
-        # Move the blank tile down (if possible)
-        if y < 2:
-            # print("down")
-            down = self.swap(state, i, i + 3)  # Swap the blank tile with the tile below
-            neighbors.append(down)
+            if memory_limit is not None and len(path) >= memory_limit:  # No room to go deeper
+                cut = True
+                continue
+            path.append(next_state)
+            on_path.add(next_state)
+            # The branch and the seen set share the limit; the branch comes first
+            if memory_limit is not None and len(seen) + len(path) >= memory_limit and seen:
+                seen.pop()  # Forget an arbitrary state, it may be searched again
+            if memory_limit is None or len(seen) + len(path) < memory_limit:
+                seen.add(next_state)
+            self.peak_stored = max(self.peak_stored, len(seen) + len(path))
+            children = self.get_neighbors(next_state)
+            stack.append(reversed(children))
+            if metrics is not None:
+                self.record_expansion(children, on_path, seen)
 
-        return neighbors
+        if cut:
+            self.stop_reason = MEMORY_LIMIT
+        return None
 
+    def record_expansion(self, children, on_path, seen):
+        """
+        Adds the expansion of one node by path_search() to self.metrics.
+        Children on the branch or seen before count as duplicates, and the
+        branch is the frontier.
+        """
+        repeated = sum(child in on_path or child in seen for child in children)
+        self.metrics.expand(len(children), len(children) - repeated, len(on_path), len(seen))
 
-    def swap(self, state, i, j):
+    def get_neighbors(self, state):
         """
-        Swaps two characters in the puzzle state string.
+        Finds the neighboring states by moving the blank tile ('0') up, down, left, or right.
 
         Args:
-            state (str): The current state of the puzzle.
-            i (int): Index of the first character.
-            j (int): Index of the second character.
+            state (int): The current packed state of the puzzle.
 
         Returns:
-            str: A new state with the characters at indices i and j swapped.
+            list: The neighboring packed states.
         """
-        state = list(state)  # Convert to list for mutability
-        state[i], state[j] = state[j], state[i]  # Swap tiles
-        return ''.join(state)  # Return as a string
+        return self.board.neighbors(state)
 
     def get_path(self, came_from, current):
         """
         Reconstructs the path from the start state to the goal state.
 
         Args:
-            came_from (dict): Maps each state to its predecessor.
-            current (str): The current state (goal state).
+            came_from (dict): Maps each packed state to its predecessor.
+            current (int): The current packed state (goal state).
+
+        Returns:
+            The path from the start to the goal state, in self.path_format.
+        """
+        if self.metrics is not None:
+            self.metrics.mark('search')
+        path = self.board.get_path(came_from, current, self.path_format)
+        if self.metrics is not None:
+            self.metrics.mark('path')
+        return path
+
+    def get_branch_path(self, path):
+        """
+        Converts the branch found by path_search() into the returned path.
+
+        Args:
+            path (list): The packed states from the start state to the goal state.
 
         Returns:
-            list: The path from the start to the goal state.
+            The path from the start to the goal state, in self.path_format.
         """
-        path = []
-        while current in came_from:  # Trace from goal to start
-            path.append(current)  # Add each state to the path
-            current = came_from[current]  # Move to predecessor
-        path.reverse()  # Reverse to get path from start to goal
+        if self.metrics is not None:
+            self.metrics.mark('search')
+        path = self.board.format_path(path, self.path_format)
+        if self.metrics is not None:
+            self.metrics.mark('path')
         return path
 
     def get_info(self):
@@ -135,8 +267,14 @@ class DFS:
             A dictionary containing the number of explored nodes, total execution time, and search depth.
         """
 
-        return {
+        info = {
             'explored nodes': self.explored_nodes,  # Number of nodes explored
-            'total time': round(self.total_time,3),  # Total time taken for the search
+            'total time': round(self.total_time, 6),  # Total time taken for the search
             'max search depth': self.search_depth,  # Maximum search depth reached
+            'peak stored states': self.peak_stored,  # Most states kept at once (visited, or the branch)
         }
+        if self.memory_limit is not None:
+            info['memory limit'] = self.memory_limit
+        if self.metrics is not None:  # Counters of the instrumented search
+            info.update(self.metrics.get_info())
+        return info
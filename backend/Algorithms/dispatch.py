@@ -0,0 +1,147 @@
+try:
+    from .Astar import AStar
+    from .ara_star import DEFAULT_DEADLINE, ARAStar
+    from .auto import AutoSolver
+    from .bfs import BFS
+    from .bidirectional_bfs import BidirectionalBFS
+    from .dfs import DFS
+    from .distance_table import TableSolver
+    from .hda_star import DEFAULT_WORKERS
+    from .ida_star import IDAStar
+    from .it_dfs import IT_DFS
+    from .sma_star import SMAStar
+    from .state import GOAL_STATE, PATH_STATES, PATH_FORMATS, canonicalize, check_puzzle, relabel
+except ImportError:  # Running from inside backend/Algorithms
+    from Astar import AStar
+    from ara_star import DEFAULT_DEADLINE, ARAStar
+    from auto import AutoSolver
+    from bfs import BFS
+    from bidirectional_bfs import BidirectionalBFS
+    from dfs import DFS
+    from distance_table import TableSolver
+    from hda_star import DEFAULT_WORKERS
+    from ida_star import IDAStar
+    from it_dfs import IT_DFS
+    from sma_star import SMAStar
+    from state import GOAL_STATE, PATH_STATES, PATH_FORMATS, canonicalize, check_puzzle, relabel
+
+UNKNOWN_ALGORITHM = 'unknown algorithm'  # Status of a request naming no known solver
+UNKNOWN_PATH_FORMAT = 'unknown path format'  # Status of a request asking for no known path format
+
+# Algorithm names accepted by the API, mapped to the solver class and its extra arguments
+ALGORITHMS = {
+    'bfs': (BFS, {}),
+    'bibfs': (BidirectionalBFS, {}),
+    'a-starm': (AStar, {'heuristic': 'Manhattan'}),
+    'a-stare': (AStar, {'heuristic': 'Euclidean'}),
+    'a-starlc': (AStar, {'heuristic': 'LinearConflict'}),
+    'a-starwd': (AStar, {'heuristic': 'WalkingDistance'}),
+    'a-starpdb': (AStar, {'heuristic': 'PatternDatabase'}),
+    'hda-star': (AStar, {'heuristic': 'Manhattan', 'workers': DEFAULT_WORKERS}),
+    'hda-starlc': (AStar, {'heuristic': 'LinearConflict', 'workers': DEFAULT_WORKERS}),
+    'hda-starpdb': (AStar, {'heuristic': 'PatternDatabase', 'workers': DEFAULT_WORKERS}),
+    'ida-star': (IDAStar, {'heuristic': 'Manhattan'}),
+    'ida-starlc': (IDAStar, {'heuristic': 'LinearConflict'}),
+    'ida-starwd': (IDAStar, {'heuristic': 'WalkingDistance'}),
+    'ida-starpdb': (IDAStar, {'heuristic': 'PatternDatabase'}),
+    'sma-star': (SMAStar, {'heuristic': 'Manhattan'}),
+    'sma-starlc': (SMAStar, {'heuristic': 'LinearConflict'}),
+    'ara-star': (ARAStar, {'heuristic': 'Manhattan', 'deadline': DEFAULT_DEADLINE}),
+    'ara-starlc': (ARAStar, {'heuristic': 'LinearConflict', 'deadline': DEFAULT_DEADLINE}),
+    'table': (TableSolver, {}),
+    'dfs': (DFS, {}),
+    'dfs-path': (DFS, {'cycle_check': 'path'}),
+    'dls': (IT_DFS, {'transpositions': True}),  # Resumes from the last leaves; plain IDDFS takes ~25 s on deep boards
+    'auto': (AutoSolver, {}),  # Picks one of the above for the board, see auto.py
+    'auto-race': (AutoSolver, {'race': True}),
+}
+
+
+def create_solver(algorithm_name, start_state, goal_state=GOAL_STATE, path_format=PATH_STATES, budget=None,
+                  metrics=None):
+    """
+    Builds the solver registered under an algorithm name.
+
+    Args:
+        algorithm_name (str): One of the keys of ALGORITHMS.
+        start_state (str): The initial state of the puzzle.
+        goal_state (str): The goal state of the puzzle.
+        path_format (str): The format the solver returns its path in (see state.format_path()).
+        budget (SearchBudget): Limits of the search (see budget.py), unlimited if None.
+        metrics (SearchMetrics): Counters to collect (see instrumentation.py), none if None.
+
+    Returns:
+        The solver instance, or None if the name is unknown.
+    """
+    if algorithm_name not in ALGORITHMS:
+        return None
+    solver_class, options = ALGORITHMS[algorithm_name]
+    return solver_class(start_state, goal_state, path_format=path_format, budget=budget, metrics=metrics,
+                        **options)
+
+
+def solve(start_state, goal_state=GOAL_STATE, algorithm_name='bfs', path_format=PATH_STATES, budget=None,
+          observer=None, metrics=None):
+    """
+    Validates a puzzle and solves it with the named algorithm.
+
+    The solver runs on the canonical form of the puzzle (see state.canonicalize()),
+    so every goal with the blank on the same cell shares the heuristic tables,
+    pattern databases and distance table of one goal. Moves do not depend on the
+    tile names; a 'states' path is renamed back to the tiles of goal_state.
+
+    Args:
+        start_state (str): The initial state of the puzzle.
+        goal_state (str): The goal state of the puzzle.
+        algorithm_name (str): One of the keys of ALGORITHMS.
+        path_format (str): 'states' or 'moves' (see state.format_path()).
+        budget (SearchBudget): Limits of the search (see budget.py), unlimited if None.
+        observer (callable): Called with the solver just before it runs, e.g. to watch its
+            progress from another thread.
+        metrics (SearchMetrics): Counters to collect (see instrumentation.py); they are
+            added to 'info'.
+
+    Returns:
+        dict: The request ('start_state', 'goal_state', 'algorithm', 'path_format'), the
+        outcome 'status' (see state.py, UNKNOWN_ALGORITHM or UNKNOWN_PATH_FORMAT; UNSUPPORTED if
+        the solver cannot handle the board size), the 'path'
+        (None if there is none) and the solver's 'info'. A 'states' path includes the start
+        state; a 'moves' path is the move string that leads from the start to the goal.
+        If the budget ran out, the status is STOPPED, 'stop_reason' names the limit and
+        'info' holds the statistics of the partial search.
+    """
+    result = {
+        'start_state': start_state,
+        'goal_state': goal_state,
+        'algorithm': algorithm_name,
+        'path_format': path_format,
+        'status': check_puzzle(start_state, goal_state),
+        'path': None,
+        'info': {},
+        'stop_reason': None,
+    }
+    if result['status']:  # Malformed or unsolvable, no need to pick a solver
+        return result
+    if path_format not in PATH_FORMATS:
+        result['status'] = UNKNOWN_PATH_FORMAT
+        return result
+
+    canonical_start, canonical_goal, labels = canonicalize(start_state, goal_state)
+    solver = create_solver(algorithm_name, canonical_start, canonical_goal, path_format, budget, metrics)
+    if solver is None:
+        result['status'] = UNKNOWN_ALGORITHM
+        return result
+
+    if observer is not None:
+        observer(solver)
+    path = solver.run()
+    if isinstance(path, tuple):  # A* style solvers also return the cost
+        path = path[0]
+    result['status'] = solver.status
+    if path is not None and path_format == PATH_STATES:
+        tiles = {label: tile for tile, label in labels.items()}  # Canonical name -> tile of goal_state
+        path = [start_state] + [relabel(state, tiles) for state in path]
+    result['path'] = path
+    result['info'] = solver.get_info()
+    result['stop_reason'] = solver.stop_reason
+    return result
@@ -0,0 +1,232 @@
+import functools
+import math
+import mmap
+import os
+import tempfile
+import time
+
+try:
+    from .budget import SearchBudget
+    from .state import (CELLS, GOAL_STATE, SOLVED, NOT_FOUND, STOPPED, UNSUPPORTED, canonical_goals, check_puzzle,
+                        encode, neighbors, rank, format_path)
+except ImportError:  # Running from inside backend/Algorithms
+    from budget import SearchBudget
+    from state import (CELLS, GOAL_STATE, SOLVED, NOT_FOUND, STOPPED, UNSUPPORTED, canonical_goals, check_puzzle,
+                       encode, neighbors, rank, format_path)
+
+TABLE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tables')  # Where tables are stored
+TABLE_CACHE_SIZE = len(canonical_goals())  # Tables kept open: one per canonical goal (see server.preload()), 3.3 MB
+TABLE_MODE = 0o644  # Permissions of written tables, readable by a server running as another user
+UNREACHABLE = 255  # Table entry for boards in the other parity class
+
+
+def table_path(goal_state=GOAL_STATE, table_dir=TABLE_DIR):
+    """
+    Returns the file used to store the distance table of a goal state.
+    """
+    return os.path.join(table_dir, f'distances_{goal_state}.bin')
+
+
+def table_on_disk(goal_state=GOAL_STATE, table_dir=TABLE_DIR):
+    """
+    Checks that the distance table of a goal state is on disk and complete: one byte per permutation.
+    """
+    path = table_path(goal_state, table_dir)
+    return os.path.exists(path) and os.path.getsize(path) == math.factorial(CELLS)
+
+
+def build_table(goal_state=GOAL_STATE, table_dir=TABLE_DIR):
+    """
+    Computes the exact distance to goal_state of every board and writes it to disk.
+
+    A single breadth-first search from the goal visits the 181,440 boards of
+    its parity class. The distances are stored one byte per board, at the
+    offset given by the board's permutation rank; boards that cannot reach the
+    goal keep the value UNREACHABLE.
+
+    Args:
+        goal_state (str): The goal state of the puzzle.
+        table_dir (str): The directory to write the table to.
+
+    Returns:
+        str: The path of the written table.
+    """
+    table = bytearray([UNREACHABLE]) * math.factorial(CELLS)
+    goal = encode(goal_state)
+    table[rank(goal)] = 0
+    layer = [goal]
+    depth = 0
+    while layer:  # Expand one depth layer at a time
+        depth += 1
+        next_layer = []
+        for state in layer:
+            for next_state in neighbors(state):
+                index = rank(next_state)
+                if table[index] == UNREACHABLE:
+                    table[index] = depth
+                    next_layer.append(next_state)
+        layer = next_layer
+
+    path = table_path(goal_state, table_dir)
+    write_table(path, table, table_dir)
+    return path
+
+
+def write_table(path, data, table_dir=TABLE_DIR):
+    """
+    Writes a table to disk atomically, readable by every user (TABLE_MODE).
+
+    Args:
+        path (str): The file to write.
+        data (bytes): The contents of the table.
+        table_dir (str): The directory of the file, created if needed.
+    """
+    os.makedirs(table_dir, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=table_dir, suffix='.tmp')
+    with os.fdopen(fd, 'wb') as file:
+        file.write(data)
+    os.chmod(temp_path, TABLE_MODE)  # mkstemp creates the file readable by its owner only
+    os.replace(temp_path, path)  # Never leave a half-written table behind
+
+
+@functools.lru_cache(maxsize=TABLE_CACHE_SIZE)
+def load_table(goal_state=GOAL_STATE, table_dir=TABLE_DIR):
+    """
+    Memory-maps the distance table of a goal state, building it first if it
+    is missing or incomplete (a third of a second).
+
+    The most recently used tables stay mapped, so repeated requests for the
+    same goal do not touch the file system. TableSolver only calls it once
+    the table is on disk; the server builds the tables when it starts.
+
+    Args:
+        goal_state (str): The goal state of the puzzle.
+        table_dir (str): The directory tables are stored in.
+
+    Returns:
+        mmap.mmap: A read-only mapping indexed by permutation rank.
+    """
+    path = table_path(goal_state, table_dir)
+    if not table_on_disk(goal_state, table_dir):  # Missing, or truncated by a crash or a full disk
+        build_table(goal_state, table_dir)
+    with open(path, 'rb') as file:
+        return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class TableSolver:
+    def __init__(self, start_state, goal_state='012345678', path_format='states', budget=None, metrics=None):
+        """
+        Initializes the distance-table solver.
+
+        Args:
+            start_state (str): The initial state of the puzzle.
+            goal_state (str): The goal state of the puzzle (default is '012345678').
+            path_format (str): Return the path as puzzle strings ('states') or as a move string
+                such as 'RDLU' ('moves', see state.format_path()) (default is 'states').
+            budget (SearchBudget): Node, time and frontier limits and a cancel token (see budget.py).
+            metrics (SearchMetrics): Counters to fill in during the search (see instrumentation.py);
+                None collects nothing.
+        """
+        self.start_state = start_state
+        self.goal_state = goal_state
+        self.path_format = path_format  # 'states' or 'moves', see state.format_path()
+        self.explored_nodes = 0  # Number of boards looked up in the table
+        self.search_depth = 0  # Length of the returned path
+        self.total_time = 0  # Time taken to walk the table
+        self.status = None  # Outcome of the last run (see state.py)
+        self.budget = budget or SearchBudget()  # Limits of every run, unlimited by default
+        self.stop_reason = None  # Limit that stopped the last run (see budget.py)
+        self.metrics = metrics  # Optional counters of the search (see instrumentation.py)
+
+    def run(self):
+        """
+        Walks the distance table from the start state down to the goal.
+
+        Every step moves to a neighbour whose distance is one less, so the
+        returned path is optimal and no search is needed. Only 3x3 boards have
+        a table, and it is never built here: the status of any other size, or
+        of a goal without a complete table on disk (see table_on_disk()), is
+        UNSUPPORTED.
+
+        Returns:
+            A list representing the path to the goal state, or None if no path is found.
+        """
+        self.status = check_puzzle(self.start_state, self.goal_state)
+        if self.status:  # Invalid or unsolvable input, there is nothing to search
+            return None
+        # A table of every 4x4 board would take 20 terabytes; build 3x3 ones with python distance_table.py
+        if len(self.goal_state) != CELLS or not table_on_disk(self.goal_state):
+            self.status = UNSUPPORTED
+            return None
+
+        metrics = self.metrics
+        if metrics is not None:
+            metrics.start()
+        start_time = time.perf_counter_ns()  # Start timing the walk
+        self.budget.start()
+        self.stop_reason = None
+        table = load_table(self.goal_state)  # Only maps the complete file
+        current = encode(self.start_state)
+        distance = table[rank(current)]
+        self.explored_nodes = 1
+        if metrics is not None:
+            metrics.mark('setup')  # Mostly mapping the table
+        if distance == UNREACHABLE:
+            self.total_time = (time.perf_counter_ns() - start_time) / 1e9
+            self.status = NOT_FOUND
+            return None
+
+        path = [current]
+        while distance:  # Step to any neighbour that is one move closer
+            self.stop_reason = self.budget.exhausted(self.explored_nodes)
+            if self.stop_reason:  # Out of budget, report what was walked so far
+                self.total_time = (time.perf_counter_ns() - start_time) / 1e9
+                self.status = STOPPED
+                return None
+            lookups = 0
+            for next_state in neighbors(current):
+                lookups += 1
+                if table[rank(next_state)] == distance - 1:
+                    break
+            self.explored_nodes += lookups
+            current = next_state
+            distance -= 1
+            path.append(current)
+            if metrics is not None:  # Only the neighbour one move closer is kept
+                metrics.expand(lookups, 1, 1, len(path))
+
+        self.search_depth = len(path) - 1
+        self.total_time = (time.perf_counter_ns() - start_time) / 1e9
+        self.status = SOLVED
+        if metrics is not None:
+            metrics.mark('search')
+        path = format_path(path, self.path_format)
+        if metrics is not None:
+            metrics.mark('path')
+        return path
+
+    def get_info(self):
+        """
+        Returns information about the search process.
+
+        Returns:
+            A dictionary containing the number of table lookups, total execution time, and search depth.
+        """
+
+        info = {
+            'explored nodes': self.explored_nodes,  # Number of table lookups
+            'total time': round(self.total_time, 6),  # Total time taken for the walk
+            'max search depth': self.search_depth,  # Length of the optimal path
+        }
+        if self.metrics is not None:  # Counters of the instrumented search
+            info.update(self.metrics.get_info())
+        return info
+
+
+if __name__ == '__main__':
+    # Build step: python distance_table.py [goal_state ...], by default every canonical goal (see state.py)
+    import sys
+
+    for goal in sys.argv[1:] or canonical_goals():
+        start_time = time.time()
+        print(f'Wrote {build_table(goal)} in {time.time() - start_time:.1f}s')
@@ -0,0 +1,268 @@
+"""
+Hash-distributed A* (HDA*, Kishimoto, Fukunaga and Botea 2009).
+
+Every state is owned by one worker process, chosen by a hash of the packed
+state. Each worker runs A* on its own open list and cost table; successors
+owned by another worker are buffered and sent to it in batches through its
+multiprocessing queue. Workers do not expand in a common f order, so a
+state may be reached again through a cheaper path and is then expanded
+again. To keep that overhead down, each worker publishes the f of the node
+it is about to expand and waits while another busy worker is on a lower f.
+
+When the owner of the goal expands it, its cost becomes the incumbent,
+shared by all workers, and nodes with f at or above it are dropped. The
+search is over when every worker is idle and no batch is in flight: the
+coordinator (the calling process) reads the per-worker sent and received
+counters and idle flags twice in a row and stops once both readings agree
+and sent equals received. The incumbent is then optimal, since every node
+left had f at least its cost. The path is rebuilt by asking the owner of
+each state for its predecessor, from the goal back to the start.
+
+Worker start-up takes a fraction of a second, so this only pays off on
+boards that take A* several seconds, such as hard 15-puzzle boards. Workers
+are started from the forkserver, and only one HDA* search per process runs at
+a time by default; others wait for a slot (see processes.py).
+
+The budget is checked by the coordinator every POLL_INTERVAL, so the workers
+go on expanding until it sees a limit: the node limit may be overshot by what
+they expand in one interval, a few hundred nodes per worker (697 nodes for
+max_nodes=500 with 4 workers on one core), and the memory limit likewise.
+"""
+
+import math
+import os
+import queue
+import time
+
+try:
+    from .processes import get_context, search_slot
+except ImportError:  # Running from inside backend/Algorithms
+    from processes import get_context, search_slot
+
+MAX_WORKERS = 8  # Most worker processes of one search
+DEFAULT_WORKERS = min(os.cpu_count() or 1, MAX_WORKERS)  # One worker process per core, up to MAX_WORKERS
+HASH_MULTIPLIER = 0x9E3779B97F4A7C15  # Fibonacci hashing, spreads neighbouring states over the workers
+EXPANSIONS_PER_ROUND = 32  # Nodes a worker expands between reading its queue and sending its batches
+IDLE_WAIT = 0.01  # Seconds an idle worker waits for a batch before checking the stop flag
+LAYER_WAIT = 0.001  # Seconds a worker ahead of the others waits before looking at their layers again
+POLL_INTERVAL = 0.01  # Seconds between two readings of the counters by the coordinator
+
+# Per-worker counters in the shared array; the coordinator's slot only counts the start batch
+SENT, RECEIVED, IDLE, EXPLORED, STORED, DEPTH = range(6)
+FIELDS = 6
+
+
+def owner_of(state, workers):
+    """
+    Returns the index of the worker that owns a packed state.
+    """
+    return ((state * HASH_MULTIPLIER) >> 64) % workers
+
+
+def run_worker(index, workers, solver, inboxes, replies, counters, layers, incumbent, stop):
+    """
+    Runs one HDA* worker until it is told to stop.
+
+    Args:
+        index (int): The worker's index, states with owner_of() == index are its own.
+        workers (int): The number of workers.
+        solver (AStar): A copy of the solver without budget or metrics, used for its heuristic.
+        inboxes (list): The queue of every worker. Messages are ('nodes', [(state, g, h, parent)]),
+            ('parent', state), answered on replies with (state, parent), or ('stop',).
+        replies (Queue): Answers to 'parent' messages.
+        counters (Array): FIELDS counters per worker, see SENT ... DEPTH.
+        layers (Array): The f of the node each worker expands or waits to expand, inf if idle.
+        incumbent (Value): The cost of the best path to the goal found so far, inf if none.
+        stop (Value): Set by the coordinator when the search is over or out of budget.
+    """
+    solver.load_tables()
+    goal = solver.goal
+    get_neighbors = solver.get_neighbors
+    frontier = solver.get_open_list()  # See open_list.py
+    push, pop = frontier.push, frontier.pop
+    cost_so_far = {}  # Best known cost of each owned state
+    came_from = {}  # Predecessor of each owned state on its best known path
+    inbox = inboxes[index]
+    outboxes = [[] for _ in range(workers)]  # Successors waiting to be sent to their owners
+    base = index * FIELDS
+    sent = received = explored = depth = 0
+    waiting = False  # Whether the last round stopped at a node above another worker's layer
+
+    while not stop.value:
+        # Take in the batches sent by the other workers; wait for one if there is nothing to expand
+        wait = LAYER_WAIT if waiting else IDLE_WAIT if not frontier else None
+        waiting = False
+        while True:
+            try:
+                message = inbox.get_nowait() if wait is None else inbox.get(timeout=wait)
+            except queue.Empty:
+                break
+            wait = None
+            if message[0] == 'nodes':
+                counters[base + IDLE] = 0  # Busy again before the batch is counted as received
+                received += 1
+                counters[base + RECEIVED] = received
+                for state, g, h, parent in message[1]:
+                    if g < cost_so_far.get(state, g + 1):
+                        cost_so_far[state] = g
+                        came_from[state] = parent
+                        push(g + h, g, state, h)
+            elif message[0] == 'parent':
+                replies.put((message[1], came_from.get(message[1])))
+            else:  # 'stop'
+                return
+
+        bound = incumbent.value
+        floor = min(layers[other] for other in range(workers) if other != index)
+        for _ in range(EXPANSIONS_PER_ROUND):
+            try:
+                current, path_length, heuristic = pop()
+            except IndexError:  # Nothing left to expand
+                break
+            if path_length > cost_so_far[current]:  # Stale entry, a cheaper path was found since
+                continue
+            f = path_length + heuristic
+            if f >= bound:  # Cannot lead to a cheaper path than the incumbent
+                continue
+            layers[index] = f
+            if f > floor:  # Another worker is on a lower f layer, let it catch up
+                push(f, path_length, current, heuristic)
+                waiting = True
+                break
+            explored += 1
+            depth = max(depth, path_length)
+            if current == goal:  # Only the goal's owner gets here
+                incumbent.value = bound = path_length
+                continue
+            new_cost = path_length + 1  # Every move costs 1
+            for next_state, cost in get_neighbors(current, heuristic):
+                if new_cost + cost >= bound:
+                    continue
+                owner = ((next_state * HASH_MULTIPLIER) >> 64) % workers
+                if owner != index:
+                    outboxes[owner].append((next_state, new_cost, cost, current))
+                elif new_cost < cost_so_far.get(next_state, new_cost + 1):
+                    cost_so_far[next_state] = new_cost
+                    came_from[next_state] = current
+                    push(new_cost + cost, new_cost, next_state, cost)
+
+        for owner, batch in enumerate(outboxes):
+            if batch:
+                sent += 1
+                counters[base + SENT] = sent  # Counted before it is in flight
+                inboxes[owner].put(('nodes', batch))
+                outboxes[owner] = []
+        counters[base + EXPLORED] = explored
+        counters[base + STORED] = len(cost_so_far)
+        counters[base + DEPTH] = depth
+        if not frontier:  # Every batch is sent, only a new batch can give it work
+            layers[index] = math.inf
+            counters[base + IDLE] = 1
+
+
+def parallel_search(solver, start, goal, progress=None):
+    """
+    Runs HDA* with solver.workers worker processes, once a slot of the
+    parallel searches is free (see processes.py).
+
+    Args:
+        solver (AStar): The solver, with its tables loaded (see AStar.load_tables()).
+        start (int): The packed start state.
+        goal (int): The packed goal state.
+        progress (callable): Called with the explored nodes and the search depth at every poll.
+
+    Returns:
+        tuple: (path, stats, stop_reason): the packed states from start to goal (None if there is
+        no path or the budget ran out), the counters of read_counters(), and the limit that
+        stopped the search, if any.
+
+    Raises:
+        RuntimeError: If a worker process died.
+    """
+    with search_slot(solver.budget) as stop_reason:
+        if stop_reason:  # Cancelled or out of time before a slot was free
+            return None, read_counters([0] * FIELDS, 0), stop_reason
+        return run_search(solver, start, goal, progress)
+
+
+def run_search(solver, start, goal, progress):
+    """
+    Starts the workers of parallel_search() and coordinates them until the search is over.
+    """
+    workers = solver.workers
+    context = get_context()
+    inboxes = [context.Queue() for _ in range(workers)]
+    replies = context.Queue()
+    counters = context.RawArray('q', (workers + 1) * FIELDS)
+    layers = context.RawArray('d', [math.inf] * workers)
+    incumbent = context.RawValue('d', math.inf)
+    stop = context.RawValue('b', 0)
+    template = type(solver)(solver.start_state, solver.goal_state, solver.heuristic, solver.tie_breaking,
+                            solver.open_list)  # Sent to the workers, without the budget and metrics
+    processes = [context.Process(target=run_worker, daemon=True,
+                                 args=(index, workers, template, inboxes, replies, counters, layers, incumbent,
+                                       stop))
+                 for index in range(workers)]
+    for process in processes:
+        process.start()
+
+    heuristic = solver.get_cost(start)
+    counters[workers * FIELDS + SENT] = 1
+    inboxes[owner_of(start, workers)].put(('nodes', [(start, 0, heuristic, None)]))
+    budget = solver.budget
+    stop_reason = None
+    previous = None
+    try:
+        while True:
+            time.sleep(POLL_INTERVAL)
+            for process in processes:
+                if process.exitcode is not None:  # Killed, or failed on an exception
+                    raise RuntimeError(f'HDA* worker exited with code {process.exitcode}')
+            stats = read_counters(counters, workers)
+            if progress is not None:
+                progress(stats['explored'], stats['depth'])
+            stop_reason = budget.exhausted(stats['explored'], 0, stats['stored'])
+            if stop_reason:
+                break
+            # Idle with nothing in flight, twice in a row with no batch sent or received in between
+            reading = (stats['messages'], stats['received'], stats['idle'])
+            if stats['idle'] and stats['messages'] == stats['received'] and reading == previous:
+                break
+            previous = reading
+
+        path = None
+        if not stop_reason and incumbent.value < math.inf:
+            path = [goal]
+            while path[-1] != start:  # Ask the owner of each state for its predecessor
+                inboxes[owner_of(path[-1], workers)].put(('parent', path[-1]))
+                _, parent = replies.get(timeout=10)
+                path.append(parent)
+            path.reverse()
+        return path, read_counters(counters, workers), stop_reason
+    finally:
+        stop.value = 1
+        for inbox in inboxes:
+            inbox.put(('stop',))
+        for process in processes:
+            process.join(timeout=1)
+            if process.is_alive():
+                process.terminate()
+
+
+def read_counters(counters, workers):
+    """
+    Sums the counters of the workers and the coordinator.
+
+    Returns:
+        dict: 'messages' (batches sent), 'received', 'explored', 'stored', the largest 'depth'
+        and whether every worker is 'idle'.
+    """
+    slots = [counters[index * FIELDS:(index + 1) * FIELDS] for index in range(workers + 1)]
+    return {
+        'messages': sum(slot[SENT] for slot in slots),
+        'received': sum(slot[RECEIVED] for slot in slots),
+        'explored': sum(slot[EXPLORED] for slot in slots),
+        'stored': sum(slot[STORED] for slot in slots),
+        'depth': max(slot[DEPTH] for slot in slots),
+        'idle': all(slot[IDLE] for slot in slots[:workers]),
+    }
@@ -0,0 +1,190 @@
+import math
+import time
+from operator import itemgetter
+
+try:
+    from .Astar import AStar
+    from .state import SOLVED, NOT_FOUND, STOPPED, UNSUPPORTED, check_puzzle
+except ImportError:  # Running from inside backend/Algorithms
+    from Astar import AStar
+    from state import SOLVED, NOT_FOUND, STOPPED, UNSUPPORTED, check_puzzle
+
+class IDAStar(AStar):
+    def __init__(self, start_state, goal_state='012345678', heuristic='Manhattan', max_bound=500,
+                 path_format='states', budget=None, metrics=None):
+        """
+        Initializes the IDA* search algorithm.
+
+        Args:
+            start_state (str): The initial state of the puzzle.
+            goal_state (str): The goal state of the puzzle (default is '012345678').
+            heuristic (str): The heuristic function to use, see AStar (default is 'Manhattan').
+            max_bound (int): The largest f bound to try before giving up.
+            path_format (str): Return the path as puzzle strings ('states') or as a move string
+                such as 'RDLU' ('moves', see state.format_path()) (default is 'states').
+            budget (SearchBudget): Node, time and frontier limits and a cancel token (see budget.py).
+            metrics (SearchMetrics): Counters to fill in during the search (see instrumentation.py);
+                None collects nothing.
+        """
+        super().__init__(start_state, goal_state, heuristic, path_format=path_format, budget=budget,
+                         metrics=metrics)
+        self.max_bound = max_bound  # Largest f bound to try
+        self.bound = None  # f bound of the current iteration
+
+    def run(self):
+        """
+        Runs the IDA* search algorithm.
+
+        Each iteration is a depth-first search that prunes nodes whose
+        f = g + h exceeds the current bound; the next bound is the smallest f
+        that was pruned. Only the current path is kept in memory.
+
+        Returns:
+            A tuple containing the path to the goal state and the total cost.
+        """
+        self.status = check_puzzle(self.start_state, self.goal_state)
+        if self.status:  # Invalid or unsolvable input, there is nothing to search
+            return None, float('inf')
+        if not self.supports_board():  # The heuristic has no tables for this board or goal
+            self.status = UNSUPPORTED
+            return None, float('inf')
+
+        if self.metrics is not None:
+            self.metrics.start()
+        start = self.board.encode(self.start_state)  # Packed start state
+        self.load_tables()  # Packed goal state and heuristic tables
+        start_time = time.perf_counter_ns()  # Start timing the algorithm
+        self.budget.start()
+        self.stop_reason = None
+        # Moves cost 1, so the optimal cost is an integer and bounds can be rounded up.
+        # This keeps a fractional heuristic (Euclidean) from adding an iteration per tiny f step.
+        bound = math.ceil(self.get_cost(start))  # The first bound is the heuristic estimate of the start
+        if self.metrics is not None:
+            self.metrics.heuristic_evaluations += 1  # The start state
+            self.metrics.mark('setup')
+
+        while bound <= self.max_bound:
+            self.bound = bound
+            path, next_bound = self.bounded_search(start, bound)
+            if path is not None:  # The goal was found within the bound
+                self.total_time = (time.perf_counter_ns() - start_time) / 1e9  # Calculate total time
+                self.status = SOLVED
+                self.cost = len(path) - 1  # Number of moves
+                return self.get_path(path), self.cost
+            if self.stop_reason:  # Out of budget, report what was searched so far
+                self.total_time = (time.perf_counter_ns() - start_time) / 1e9
+                self.status = STOPPED
+                return None, float('inf')
+            if next_bound == float('inf'):  # Nothing was pruned, the goal is unreachable
+                break
+            bound = math.ceil(next_bound)
+
+        self.total_time = (time.perf_counter_ns() - start_time) / 1e9  # Calculate total time
+        self.status = NOT_FOUND
+        return None, float('inf')
+
+    def bounded_search(self, start, bound):
+        """
+        Runs one depth-first iteration of IDA* with an explicit stack.
+
+        Children are tried in order of increasing heuristic value, so the goal
+        tends to be found early in the final iteration.
+
+        Args:
+            start (int): The packed start state.
+            bound (float): The largest f value to expand.
+
+        Returns:
+            A tuple of the packed path to the goal (or None) and the next bound to try. If the
+            budget runs out, the path is None and self.stop_reason is set.
+        """
+        self.explored_nodes += 1  # The start state is explored in every iteration
+        if start == self.goal:
+            return [start], bound
+
+        next_bound = float('inf')  # Smallest f value that exceeded the bound
+        exhausted = self.budget.exhausted
+        metrics = self.metrics
+        path = [start]  # States on the current branch
+        on_path = {start}  # Same states, for O(1) cycle checks
+        children = self.get_ordered_neighbors(start, self.get_cost(start))
+        stack = [iter(children)]  # Unexplored children of every state on the path
+        if metrics is not None:
+            self.record_expansion(children, on_path, len(path))
+
+        while stack:
+            for next_state, cost in stack[-1]:  # Take the next child not already on the path
+                if next_state not in on_path:
+                    break
+            else:  # All children explored, backtrack
+                stack.pop()
+                on_path.discard(path.pop())
+                continue
+
+            depth = len(path)
+            f = depth + cost
+            if f > bound:  # Prune, but remember the smallest f beyond the bound
+                next_bound = min(next_bound, f)
+                continue
+
+            self.stop_reason = exhausted(self.explored_nodes, len(path), len(path))
+            if self.stop_reason:  # Out of budget, run() reports it
+                return None, next_bound
+            self.explored_nodes += 1  # Increment the number of explored nodes
+            self.search_depth = max(self.search_depth, depth)  # Update the maximum search depth
+            path.append(next_state)
+            if next_state == self.goal:  # If the current node is the goal state
+                return path, bound
+
+            on_path.add(next_state)
+            children = self.get_ordered_neighbors(next_state, cost)
+            stack.append(iter(children))
+            if metrics is not None:
+                self.record_expansion(children, on_path, len(path))
+
+        return None, next_bound
+
+    def record_expansion(self, children, on_path, depth):
+        """
+        Adds the expansion of one node to self.metrics. Children already on the
+        path count as duplicates; only the path is kept, so it is both the
+        frontier and the visited set.
+
+        Args:
+            children (list): The (state, heuristic cost) children of the node.
+            on_path (set): The states on the current path.
+            depth (int): The length of the current path.
+        """
+        repeated = sum(child in on_path for child, _ in children)
+        self.metrics.heuristic_evaluations += len(children)
+        self.metrics.expand(len(children), len(children) - repeated, depth, depth)
+
+    def get_ordered_neighbors(self, state, cost):
+        """
+        Returns the neighbors of a state sorted by their heuristic cost.
+
+        Args:
+            state (int): The current packed state of the puzzle.
+            cost (float): The heuristic cost of state.
+
+        Returns:
+            A list of (neighbor state, heuristic cost) tuples, most promising first.
+        """
+        return sorted(self.get_neighbors(state, cost), key=itemgetter(1))
+
+    def get_path(self, path):
+        """
+        Converts the packed states found by the search into the returned path.
+
+        Args:
+            path (list): The packed states from the start state to the goal state.
+
+        Returns:
+            The path from the start state to the goal state, in self.path_format.
+        """
+        if self.metrics is not None:
+            self.metrics.mark('search')
+        path = self.board.format_path(path, self.path_format)
+        if self.metrics is not None:
+            self.metrics.mark('path')
+        return path
@@ -0,0 +1,82 @@
+"""
+Optional counters and timers collected inside the search loops.
+
+A solver given a SearchMetrics updates it once per expanded node; without one
+(the default) the loops only pay for a single ``is not None`` test per node.
+The counters are added to the solver's get_info().
+
+The phase times cover the whole run, including the table lookups before the
+search and the path reconstruction after it, which 'total time' leaves out.
+"""
+
+import time
+
+PHASES = ('setup', 'search', 'path')  # Parts of a run timed when phase timing is on
+
+
+class SearchMetrics:
+    def __init__(self, phases=False):
+        """
+        Initializes empty counters for one search.
+
+        Args:
+            phases (bool): Also time the setup, search and path reconstruction phases.
+        """
+        self.generated = 0  # Successor states produced
+        self.duplicates = 0  # Successors dropped because they were already visited or on the path
+        self.peak_frontier = 0  # Largest number of states waiting to be expanded
+        self.peak_visited = 0  # Largest number of states remembered as visited
+        self.heuristic_evaluations = 0  # Heuristic values computed, including incremental updates
+        self.phase_times = dict.fromkeys(PHASES, 0) if phases else None  # Nanoseconds per phase
+        self.last_mark = None  # perf_counter_ns() of the last phase boundary
+
+    def start(self):
+        """
+        Starts timing the first phase. Solvers call this at the start of run().
+        """
+        self.last_mark = time.perf_counter_ns()
+
+    def mark(self, phase):
+        """
+        Ends a phase: the time since the previous mark is added to it.
+        """
+        if self.phase_times is not None:
+            now = time.perf_counter_ns()
+            self.phase_times[phase] += now - self.last_mark
+            self.last_mark = now
+
+    def expand(self, generated, added, frontier_size, visited_size):
+        """
+        Records the expansion of one node.
+
+        Args:
+            generated (int): Successors produced.
+            added (int): Successors that were new (the rest are counted as duplicates).
+            frontier_size (int): States waiting to be expanded afterwards.
+            visited_size (int): States remembered as visited afterwards.
+        """
+        self.generated += generated
+        self.duplicates += generated - added
+        if frontier_size > self.peak_frontier:
+            self.peak_frontier = frontier_size
+        if visited_size > self.peak_visited:
+            self.peak_visited = visited_size
+
+    def get_info(self):
+        """
+        Returns the counters in the form used by the solvers' get_info().
+
+        Returns:
+            dict: The counters, and the seconds spent in each phase if they were timed.
+        """
+        info = {
+            'generated nodes': self.generated,
+            'duplicate nodes': self.duplicates,
+            'peak frontier': self.peak_frontier,
+            'peak visited': self.peak_visited,
+            'heuristic evaluations': self.heuristic_evaluations,
+        }
+        if self.phase_times is not None:
+            for phase, nanoseconds in self.phase_times.items():
+                info[f'{phase} time'] = round(nanoseconds / 1e9, 6)
+        return info
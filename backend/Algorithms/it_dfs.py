@@ -1,21 +1,49 @@
 import time
 
+try:
+    from .Astar import heuristic_table
+    from .budget import SearchBudget
+    from .state import SOLVED, NOT_FOUND, STOPPED, check_puzzle, board_of
+except ImportError:  # Running from inside backend/Algorithms
+    from Astar import heuristic_table
+    from budget import SearchBudget
+    from state import SOLVED, NOT_FOUND, STOPPED, check_puzzle, board_of
+
 class IT_DFS:
-    def __init__(self, start_state, goal_state='012345678',max_depth=500):
+    def __init__(self, start_state, goal_state='012345678',max_depth=500, transpositions=False,
+                 path_format='states', budget=None, metrics=None):
         """
         Initializes the IDDFS search algorithm.
 
         Args:
             start_state (str): The initial state of the puzzle.
             goal_state (str): The goal state of the puzzle (default is '012345678').
-            heuristic (str): The heuristic function to use (not used in IDDFS but included for consistency).
+            max_depth (int): The deepest limit to try before giving up.
+            transpositions (bool): Keep every state reached, with its parent, from one iteration to
+                the next, and resume each iteration from the leaves of the previous one (see
+                incremental_search()) (default is False). This removes the duplicate and repeated
+                subtrees that make plain iterative deepening exponential, but keeps every state
+                seen in memory; without it, memory grows only with the depth.
+            path_format (str): Return the path as puzzle strings ('states') or as a move string
+                such as 'RDLU' ('moves', see state.format_path()) (default is 'states').
+            budget (SearchBudget): Node, time and frontier limits and a cancel token (see budget.py).
+            metrics (SearchMetrics): Counters to fill in during the search (see instrumentation.py);
+                None collects nothing.
         """
         self.start_state = start_state
         self.goal_state = goal_state
-        self.max_depth = max_depth  # Maximum depth to explore
+        self.board = board_of(goal_state)  # Geometry and move tables of the board size
+        self.max_depth = max_depth  # Maximum depth limit to try
+        self.transpositions = transpositions  # Keep the states reached and resume from the last leaves
+        self.distances = None  # Manhattan distance table of the goal, used to order the moves; set by run()
+        self.path_format = path_format  # 'states' or 'moves', see state.format_path()
         self.explored_nodes = 0  # Tracks the number of explored nodes
         self.search_depth = 0  # Maximum depth reached during the search
         self.total_time = 0  # Total time taken to complete the search
+        self.status = None  # Outcome of the last run (see state.py)
+        self.budget = budget or SearchBudget()  # Limits of every run, unlimited by default
+        self.stop_reason = None  # Limit that stopped the last run (see budget.py)
+        self.metrics = metrics  # Optional counters of the search (see instrumentation.py)
 
     def run(self):
         """
@@ -24,121 +52,228 @@ class IT_DFS:
         Returns:
             A list representing the path to the goal state, or None if no path is found.
         """
-        start_time = time.time()  # Start timing the search
-        limit = 0  # Initial depth limit
-        self.max_depth = 50000  # Maximum depth to explore
-        self.max_depth = 1000000  # Maximum depth to explore
+        self.status = check_puzzle(self.start_state, self.goal_state)
+        if self.status:  # Invalid or unsolvable input, there is nothing to search
+            return None
 
-        while limit < self.max_depth:  # Iteratively deepen until max_depth is reached
-            frontier = []  # Stack for DFS exploration
-            frontier = [(self.start_state, 0)]  # Stack with initial state and depth 0
+        if self.metrics is not None:
+            self.metrics.start()
+        start = self.board.encode(self.start_state)  # Packed start state
+        goal = self.board.encode(self.goal_state)  # Packed goal state
+        self.distances = heuristic_table(self.goal_state, 'Manhattan')
+        start_time = time.perf_counter_ns()  # Start timing the search
+        self.budget.start()
+        self.stop_reason = None
+        if self.metrics is not None:
+            self.metrics.mark('setup')
 
-            came_from = {}  # Maps each state to its predecessor for path reconstruction
-            visited = {self.start_state: 0}  # Tracks visited states
+        search = self.incremental_search if self.transpositions else self.iterative_search
+        path = search(start, goal)
+        self.total_time = (time.perf_counter_ns() - start_time) / 1e9  # Calculate total search time
+        if path is not None:  # The goal was found
+            self.status = SOLVED
+            return self.get_path(path)  # Return the path to the goal
+        self.status = STOPPED if self.stop_reason else NOT_FOUND  # Out of budget, or no solution exists
+        return None
 
-            while frontier:  # Continue while there are states in the stack
-                current, depth = frontier.pop()  # Pop the last state added (LIFO)
-                self.explored_nodes += 1  # Increment the count of explored nodes
-                self.search_depth = max(self.search_depth, depth)  # Update the maximum search depth
+    def iterative_search(self, start, goal):
+        """
+        Runs depth-limited searches with limits 0, 1, ... up to max_depth, each from the start state.
 
-                if current == self.goal_state:  # Check if the goal state is reached
-                    #print("found the goal")
-                    self.total_time = time.time() - start_time  # Calculate total search time
-                    self.search_depth=depth
-                    return self.get_path(came_from, current)  # Return the path to the goal
+        Args:
+            start (int): The packed start state.
+            goal (int): The packed goal state.
+
+        Returns:
+            list: The packed states from start to goal, or None. If the budget runs out, None is
+            returned and self.stop_reason is set.
+        """
+        for limit in range(self.max_depth + 1):  # Iteratively deepen until max_depth is reached
+            path = self.depth_limited_search(start, goal, limit)
+            if path is not None:  # The goal was found within the current limit
+                self.search_depth = limit
+                return path
+            if self.stop_reason:  # Out of budget, run() reports it
+                return None
+        return None
 
-                    #print(f"visiting node {current} with depth {depth}")
-                if depth < limit:
-                    # visited[current] = depth  # Mark as visited with current depth
-                    # Explore neighbors of the current state
-                    for next_state in self.get_neighbors(current):
-                        #print(f"next state is {next_state}")
-                        if (next_state not in visited) or (depth + 1 < visited.get(next_state)):
-                            frontier = [(state, d) for state, d in frontier if state != next_state]
-                            frontier.append((next_state, depth + 1))  # Add to the stack with incremented depth
-                            visited[next_state] = depth+1  # Mark as visited with current depth
-                            came_from[next_state] = current  # Track predecessor for path reconstruction
-                        
+    def incremental_search(self, start, goal):
+        """
+        Runs the iterations with transpositions, each resuming where the previous one stopped.
 
-            limit += 1  # Increase depth limit for the next iteration
+        Every state reached is kept with its parent across iterations, and the
+        iteration with limit d - 1 saves the states it reached at depth d - 1:
+        its leaves. Everything above them was already searched, so the
+        iteration with limit d only searches from those leaves, one level
+        deeper, instead of walking the whole tree again from the start. A state
+        already kept was reached at no greater depth, so it is pruned. The
+        first time the goal is reached is therefore at its shortest depth, and
+        in total each state is expanded once, as in BFS; the table of states
+        is the memory this costs. Moves are ordered as in depth_limited_search().
 
-        self.total_time = time.time() - start_time  # Calculate total time if no solution is found
-        #print(f"Finished here with limit {limit} and depth {self.search_depth} and explored nodes {self.explored_nodes}")
-        return None  # Return None if no solution exists
+        Args:
+            start (int): The packed start state.
+            goal (int): The packed goal state.
 
-    def get_neighbors(self, state):
+        Returns:
+            list: The packed states from start to goal, or None. If the budget runs out, None is
+            returned and self.stop_reason is set.
         """
-        Finds the neighboring states by moving the blank tile ('0') up, down, left, or right.
+        self.explored_nodes += 1  # The start state
+        if start == goal:
+            return [start]
+
+        parents = {start: None}  # Parent of every state reached, kept across iterations
+        leaves = [start]  # States at the depth limit of the last iteration
+        exhausted = self.budget.exhausted
+        metrics = self.metrics
+        for limit in range(1, self.max_depth + 1):  # Iteratively deepen until max_depth is reached
+            next_leaves = []  # States reached at depth limit, where the next iteration resumes
+            for leaf in leaves:
+                self.stop_reason = exhausted(self.explored_nodes, len(leaves) + len(next_leaves), len(parents))
+                if self.stop_reason:  # Out of budget, run() reports it
+                    return None
+                children = self.get_neighbors(leaf, parents[leaf])
+                generated = 0
+                for next_state in children:
+                    if next_state in parents:  # Already reached at no greater depth
+                        continue
+                    parents[next_state] = leaf
+                    generated += 1
+                    self.explored_nodes += 1  # Increment the count of explored nodes
+                    if next_state == goal:  # Check if the goal state is reached
+                        self.search_depth = limit
+                        path = [next_state]
+                        while parents[path[-1]] is not None:
+                            path.append(parents[path[-1]])
+                        return path[::-1]
+                    next_leaves.append(next_state)
+                if metrics is not None:
+                    metrics.expand(len(children), generated, len(leaves) + len(next_leaves), len(parents))
+            if not next_leaves:  # Every reachable state was searched
+                return None
+            leaves = next_leaves
+            self.search_depth = limit
+        return None
+
+    def depth_limited_search(self, start, goal, limit):
+        """
+        Runs one depth-limited DFS iteration with an explicit stack.
+
+        Moves are ordered (see get_neighbors()): the move that undoes the
+        previous one is never generated, and the others are tried in order of
+        how much they lower the Manhattan distance, so the last iteration finds
+        the goal early. A state is also skipped if it is already on the current
+        path, which prevents longer cycles without a visited dict, so memory
+        grows only with the depth.
 
         Args:
-            state (str): The current state of the puzzle.
+            start (int): The packed start state.
+            goal (int): The packed goal state.
+            limit (int): The maximum depth to explore.
 
         Returns:
-            A list of tuples where each tuple contains the neighbor state and the associated move cost.
+            list: The packed states from start to goal, or None if the goal is deeper than limit.
+            If the budget runs out, None is returned and self.stop_reason is set.
         """
-        i = state.index('0')  # Find the index of the blank space (0)
-        y, x = divmod(i, 3)
-        # #print(i,x,y)
-        neighbors = []
+        self.explored_nodes += 1  # The start state is explored in every iteration
+        if start == goal:
+            return [start]
 
-        # Move the blank tile up (if possible)
-        if y > 0:
-            # #print("up")
-            up = self.swap(state, i, i - 3)  # Swap the blank tile with the tile above
-            neighbors.append(up)
+        path = [start]  # States on the current branch
+        on_path = {start}  # Same states, for O(1) cycle checks
+        exhausted = self.budget.exhausted
+        metrics = self.metrics
+        children = self.get_neighbors(start)
+        stack = [iter(children)]  # Unexplored children of every state on the path
+        if metrics is not None:
+            self.record_expansion(children, on_path)
 
-        # Move the blank tile right (if possible)
-        if x < 2:  
-            # #print("right")
-            right = self.swap(state, i, i + 1)  # Swap the blank tile with the tile on the right
-            neighbors.append(right)
+        while stack:
+            for next_state in stack[-1]:  # Take the next child not already on the path
+                if next_state not in on_path:
+                    break
+            else:  # All children explored, backtrack
+                stack.pop()
+                on_path.discard(path.pop())
+                continue
 
-        # Move the blank tile left (if possible)
-        if x > 0:
-            # #print("left")
-            left = self.swap(state, i, i - 1)  # Swap the blank tile with the tile on the left
-            neighbors.append(left)
+            depth = len(path)
+            self.stop_reason = exhausted(self.explored_nodes, len(path), len(path))
+            if self.stop_reason:  # Out of budget, run() reports it
+                return None
+            self.explored_nodes += 1  # Increment the count of explored nodes
+            self.search_depth = max(self.search_depth, depth)  # Update the maximum search depth
+            if next_state == goal:  # Check if the goal state is reached
+                path.append(next_state)
+                return path
 
-        # Move the blank tile down (if possible)
-        if y < 2:
-            # #print("down")
-            down = self.swap(state, i, i + 3)  # Swap the blank tile with the tile below
-            neighbors.append(down)
+            if depth < limit:  # Descend into the child
+                path.append(next_state)
+                on_path.add(next_state)
+                children = self.get_neighbors(next_state, path[-2])
+                stack.append(iter(children))
+                if metrics is not None:
+                    self.record_expansion(children, on_path)
 
-        return neighbors
+        return None
 
-    def swap(self, state, i, j):
+    def record_expansion(self, children, on_path):
         """
-        Swaps two characters in the puzzle state string.
+        Adds the expansion of one node by depth_limited_search() to self.metrics.
+        Children already on the path count as duplicates.
+
+        Args:
+            children (list): The packed children of the node.
+            on_path (set): The states on the current path, which is also the frontier.
+        """
+        repeated = sum(child in on_path for child in children)
+        self.metrics.expand(len(children), len(children) - repeated, len(on_path), len(on_path))
+
+    def get_neighbors(self, state, parent=None):
+        """
+        Finds the neighboring states by moving the blank tile ('0'), best moves first.
+
+        A move changes the Manhattan distance by the moved tile's change only,
+        so the children are sorted by that change: moves that bring a tile
+        closer to its goal cell come first. Ties keep the board's move order.
 
         Args:
-            state (str): The current state of the puzzle.
-            i (int): Index of the first character.
-            j (int): Index of the second character.
+            state (int): The current packed state of the puzzle.
+            parent (int): The state the search came from; the move back to it is not generated.
 
         Returns:
-            str: A new state with the characters at indices i and j swapped.
+            list: The neighboring packed states.
         """
-        state = list(state)  # Convert to list for mutability
-        state[i], state[j] = state[j], state[i]  # Swap tiles
-        return ''.join(state)  # Return as a string
+        board = self.board
+        distances = self.distances
+        mask = board.tile_mask
+        blank = state >> board.blank_shift
+        children = []
+        for target, shift, factor, delta in board.moves[blank]:
+            tile = (state >> shift) & mask  # The tile that slides into the blank
+            next_state = state + tile * factor + delta
+            if next_state != parent:
+                row = distances[tile]
+                children.append((row[blank] - row[target], next_state))
+        children.sort(key=lambda child: child[0])
+        return [next_state for _, next_state in children]
 
-    def get_path(self, came_from, current):
+    def get_path(self, path):
         """
-        Reconstructs the path from the start state to the goal state.
+        Converts the packed states found by the search into the returned path.
 
         Args:
-            came_from (dict): Maps each state to its predecessor.
-            current (str): The current state (goal state).
+            path (list): The packed states from the start state to the goal state.
 
         Returns:
-            list: The path from the start to the goal state.
+            The path from the start to the goal state, excluding the start state, in self.path_format.
         """
-        path = []
-        while current in came_from:  # Trace from goal to start
-            path.append(current)  # Add each state to the path
-            current = came_from[current]  # Move to predecessor
-        path.reverse()  # Reverse to get path from start to goal
+        if self.metrics is not None:
+            self.metrics.mark('search')
+        path = self.board.format_path(path, self.path_format)
+        if self.metrics is not None:
+            self.metrics.mark('path')
         return path
 
     def get_info(self):
@@ -149,8 +284,11 @@ class IT_DFS:
             A dictionary containing the number of explored nodes, total execution time, and search depth.
         """
 
-        return {
+        info = {
             'explored nodes': self.explored_nodes,  # Number of nodes explored
-            'total time': round(self.total_time,3),  # Total time taken for the search
+            'total time': round(self.total_time, 6),  # Total time taken for the search
             'max search depth': self.search_depth,  # Maximum search depth reached
         }
+        if self.metrics is not None:  # Counters of the instrumented search
+            info.update(self.metrics.get_info())
+        return info
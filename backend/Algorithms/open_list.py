@@ -0,0 +1,122 @@
+"""
+Open lists of A*: the states waiting to be expanded, smallest f first.
+
+Both lists pop, among the entries of the lowest f, the deepest one (highest g)
+when prefer_deep is set, and the most recently pushed one among equals, so
+they expand states in exactly the same order.
+
+HeapQueue works for any f. BucketQueue needs integer f and g, which every
+heuristic but 'Euclidean' gives: f values stay small (31 at most on the
+8-puzzle, 80 on the 15-puzzle), so entries go into a stack per (f, g) and
+push and pop take constant time instead of O(log n) tuple comparisons.
+"""
+
+import heapq
+
+
+class HeapQueue:
+    def __init__(self, prefer_deep=True):
+        """
+        Initializes an empty binary heap.
+
+        Args:
+            prefer_deep (bool): Pop the entry with the highest g first among those with equal f.
+        """
+        self.heap = []  # (f, tie, order, state, g, h) entries
+        self.prefer_deep = prefer_deep
+        self.order = 0  # Decreasing counter, so equal entries pop last-in first-out
+
+    def __len__(self):
+        return len(self.heap)
+
+    def push(self, f, g, state, h):
+        """
+        Adds a state with its f, g and heuristic values.
+        """
+        self.order -= 1
+        heapq.heappush(self.heap, (f, -g if self.prefer_deep else 0, self.order, state, g, h))
+
+    def pop(self):
+        """
+        Removes the entry with the lowest f.
+
+        Returns:
+            tuple: (state, g, h).
+        """
+        _, _, _, state, g, h = heapq.heappop(self.heap)
+        return state, g, h
+
+
+class BucketQueue:
+    def __init__(self, prefer_deep=True):
+        """
+        Initializes an empty bucket queue for integer f and g.
+
+        Args:
+            prefer_deep (bool): Pop the entry with the highest g first among those with equal f.
+        """
+        self.buckets = []  # buckets[f][g] is a stack of (state, g, h); g is always 0 without prefer_deep
+        self.tops = []  # tops[f] is the highest g whose stack in buckets[f] may be non-empty
+        self.prefer_deep = prefer_deep
+        self.min_f = 0  # No entry has a lower f
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def push(self, f, g, state, h):
+        """
+        Adds a state with its f, g and heuristic values.
+        """
+        level = g if self.prefer_deep else 0
+        try:
+            self.buckets[f][level].append((state, g, h))
+        except IndexError:  # First entry this deep or with this f
+            self.grow(f, level)
+            self.buckets[f][level].append((state, g, h))
+        if level > self.tops[f]:
+            self.tops[f] = level
+        if f < self.min_f:
+            self.min_f = f
+        self.size += 1
+
+    def grow(self, f, level):
+        """
+        Adds the buckets up to f, and the stacks of bucket f up to level.
+        """
+        while len(self.buckets) <= f:
+            self.buckets.append([])
+            self.tops.append(-1)
+        bucket = self.buckets[f]
+        while len(bucket) <= level:
+            bucket.append([])
+
+    def pop(self):
+        """
+        Removes the entry with the lowest f.
+
+        The lowest f and, within it, the highest g are kept as pointers that
+        only move past empty stacks, so a pop costs constant amortized time.
+
+        Returns:
+            tuple: (state, g, h).
+
+        Raises:
+            IndexError: If the queue is empty, like heapq.heappop().
+        """
+        if not self.size:
+            raise IndexError('pop from an empty bucket queue')
+        buckets, tops = self.buckets, self.tops
+        f = self.min_f
+        while True:
+            bucket = buckets[f]
+            level = tops[f]
+            while level >= 0 and not bucket[level]:
+                level -= 1
+            tops[f] = level
+            if level >= 0:
+                break
+            f += 1
+        self.min_f = f
+        self.size -= 1
+        return bucket[level].pop()
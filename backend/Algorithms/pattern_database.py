@@ -0,0 +1,275 @@
+"""
+Additive disjoint pattern databases for the 3x3 and 4x4 boards.
+
+The tiles are split into disjoint groups (PATTERNS). For each group, a table
+stores the fewest moves of that group's tiles needed to bring them from any
+placement, with the blank on any cell, to their goal cells, whatever the other
+tiles do. Only the group's moves are counted, so the values of the groups can
+be added and the sum is still admissible.
+
+The blank's cell is part of the index: without it, the value of a placement
+would be the minimum over every blank cell, and one move could lower it by
+more than one (the blank cannot always get past the group's tiles), which
+makes A* return paths that are too long. With it, the sum is consistent: a
+move changes the group of the moved tile by at most one, and for the other
+groups it is a free move of the blank, which changes nothing.
+
+Tables are built once with a breadth-first search and written next to the
+distance tables:
+
+    python pattern_database.py 0123456789ABCDEF
+
+They are indexed by the cells of the group's tiles and then of the blank, 4
+bits per cell, and stored one byte per entry (16 MB per 5-tile group of the
+15-puzzle, 1 MB per 4-tile group of the 8-puzzle). Solvers never build them:
+without the tables of their goal on disk, the PatternDatabase heuristic is
+unsupported (see patterns_on_disk()).
+"""
+
+import functools
+import mmap
+import os
+import time
+
+try:
+    from .distance_table import TABLE_DIR, write_table
+    from .state import board_of, canonical_goals
+except ImportError:  # Running from inside backend/Algorithms
+    from distance_table import TABLE_DIR, write_table
+    from state import board_of, canonical_goals
+
+# Tile groups per board size; tiles are numbered as in the goal state, so the groups are relative to it
+PATTERNS = {
+    3: ((1, 2, 3, 4), (5, 6, 7, 8)),
+    4: ((1, 2, 3, 4, 5), (6, 7, 8, 9, 10), (11, 12, 13, 14, 15)),
+}
+CELL_BITS = 4  # Bits used to store the cell of one tile of a group
+CELL_MASK = (1 << CELL_BITS) - 1
+UNSEEN = 255  # Entry of a placement the search has not reached
+
+
+def pattern_path(goal_state, tiles, table_dir=TABLE_DIR):
+    """
+    Returns the file used to store the table of one group of tiles.
+    """
+    return os.path.join(table_dir, f'pattern_{goal_state}_{"-".join(map(str, tiles))}.bin')
+
+
+def pattern_size(tiles):
+    """
+    Returns the number of entries of the table of a group: one per cell of each tile and of the blank.
+    """
+    return 1 << (CELL_BITS * (len(tiles) + 1))
+
+
+def patterns_on_disk(goal_state, patterns=None, table_dir=TABLE_DIR):
+    """
+    Checks that the table of every group of a goal is on disk and complete.
+
+    Args:
+        goal_state (str): The goal state of the puzzle.
+        patterns (tuple): Groups of tiles (default is PATTERNS for the board size).
+        table_dir (str): The directory tables are stored in.
+
+    Returns:
+        bool: False if a table is missing, truncated or in an older layout, or if the
+        board size has no default groups.
+    """
+    if patterns is None:
+        patterns = PATTERNS.get(board_of(goal_state).size)
+        if patterns is None:
+            return False
+    for tiles in patterns:
+        path = pattern_path(goal_state, tuple(tiles), table_dir)
+        if not os.path.exists(path) or os.path.getsize(path) != pattern_size(tiles):
+            return False
+    return True
+
+
+def build_pattern(goal_state, tiles, table_dir=TABLE_DIR):
+    """
+    Computes the table of one group of tiles and writes it to disk.
+
+    The search runs over the cells of the group's tiles and of the blank.
+    Moving the blank onto a cell of another tile costs nothing, moving one of
+    the group's tiles costs one move, so states are expanded in layers of
+    equal cost and zero-cost moves extend the current layer. The cost of every
+    state is the table entry; cells taken by two of them are never reached
+    and stay UNSEEN.
+
+    Args:
+        goal_state (str): The goal state of the puzzle.
+        tiles (tuple): The tiles of the group.
+        table_dir (str): The directory to write the table to.
+
+    Returns:
+        str: The path of the written table.
+    """
+    board = board_of(goal_state)
+    blank_shift = CELL_BITS * len(tiles)
+    start = goal_state.index('0') << blank_shift
+    for slot, tile in enumerate(tiles):
+        start |= goal_state.index(board.goal_state[tile]) << (CELL_BITS * slot)
+
+    costs = bytearray([UNSEEN]) * pattern_size(tiles)  # Cheapest cost of every state
+    costs[start] = 0
+    layer = [start]
+    cost = 0
+    while layer:
+        next_layer = []
+        for state in layer:  # The layer grows while it is walked, with the zero-cost moves
+            if costs[state] != cost:  # Reached again later at a smaller cost
+                continue
+            cells = {(state >> (CELL_BITS * slot)) & CELL_MASK: slot for slot in range(len(tiles))}
+            blank = state >> blank_shift
+            for target in board.neighbors_of[blank]:
+                slot = cells.get(target)
+                if slot is None:  # Another tile moves, which is free
+                    next_state = state + ((target - blank) << blank_shift)
+                    if costs[next_state] > cost:
+                        costs[next_state] = cost
+                        layer.append(next_state)
+                else:  # A tile of the group moves into the blank
+                    next_state = state + ((blank - target) << (CELL_BITS * slot)) + ((target - blank) << blank_shift)
+                    if costs[next_state] > cost + 1:
+                        costs[next_state] = cost + 1
+                        next_layer.append(next_state)
+        layer = next_layer
+        cost += 1
+
+    path = pattern_path(goal_state, tiles, table_dir)
+    write_table(path, costs, table_dir)
+    return path
+
+
+def build_patterns(goal_state, table_dir=TABLE_DIR):
+    """
+    Builds the tables of the default groups of a goal that are missing or incomplete.
+
+    Building a 5-tile group of the 15-puzzle takes about 20 seconds, an
+    8-puzzle group a few hundredths of a second.
+
+    Returns:
+        list: The paths of the written tables.
+    """
+    written = []
+    for tiles in PATTERNS[board_of(goal_state).size]:
+        if not patterns_on_disk(goal_state, (tiles,), table_dir):
+            written.append(build_pattern(goal_state, tiles, table_dir))
+    return written
+
+
+@functools.lru_cache(maxsize=16)
+def load_pattern(goal_state, tiles, table_dir=TABLE_DIR):
+    """
+    Memory-maps the table of one group of tiles.
+
+    Returns:
+        mmap.mmap: A read-only mapping indexed by the cells of the group's tiles and of the blank.
+
+    Raises:
+        FileNotFoundError: If the table is missing or incomplete (see patterns_on_disk());
+            build it with ``python pattern_database.py <goal>``.
+    """
+    path = pattern_path(goal_state, tiles, table_dir)
+    if not patterns_on_disk(goal_state, (tiles,), table_dir):
+        raise FileNotFoundError(f'No complete pattern database at {path}, run python pattern_database.py {goal_state}')
+    with open(path, 'rb') as file:
+        return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class PatternDatabase:
+    def __init__(self, goal_state, patterns=None, table_dir=TABLE_DIR):
+        """
+        Loads the tables of every group of tiles for a goal state.
+
+        Args:
+            goal_state (str): The goal state of the puzzle.
+            patterns (tuple): Disjoint groups of tiles (default is PATTERNS for the board size).
+            table_dir (str): The directory tables are stored in.
+
+        Raises:
+            ValueError: If there are no default groups for the board size.
+            FileNotFoundError: If a table is not on disk (see patterns_on_disk()).
+        """
+        board = self.board = board_of(goal_state)
+        if patterns is None:
+            if board.size not in PATTERNS:
+                raise ValueError(f'No pattern databases for {board.size}x{board.size} boards')
+            patterns = PATTERNS[board.size]
+        self.tables = [load_pattern(goal_state, tuple(tiles), table_dir) for tiles in patterns]
+        # offsets[cell][tile] is what the tile at cell adds to its group's index; groups[tile] is its group
+        # and blank_offsets[group][cell] what the blank at cell adds to the index of the group
+        self.groups = [None] * board.cells
+        slots = [0] * board.cells
+        for group, tiles in enumerate(patterns):
+            for slot, tile in enumerate(tiles):
+                self.groups[tile] = group
+                slots[tile] = slot
+        self.offsets = tuple(tuple(cell << (CELL_BITS * slots[tile]) for tile in range(board.cells))
+                             for cell in range(board.cells))
+        self.blank_offsets = tuple(tuple(cell << (CELL_BITS * len(tiles)) for cell in range(board.cells))
+                                   for tiles in patterns)
+
+    def get_indices(self, state):
+        """
+        Returns the index of every group's table for a packed state.
+        """
+        board = self.board
+        groups, offsets = self.groups, self.offsets
+        blank = state >> board.blank_shift
+        indices = [offsets[blank] for offsets in self.blank_offsets]
+        for cell in range(board.cells):
+            tile = board.tile_at(state, cell)
+            group = groups[tile]
+            if group is not None:
+                indices[group] += offsets[cell][tile]
+        return indices
+
+    def evaluate(self, state):
+        """
+        Returns the sum of the group tables for a packed state.
+        """
+        return sum(table[index] for table, index in zip(self.tables, self.get_indices(state)))
+
+    def get_neighbors(self, state):
+        """
+        Generates the neighbours of a packed state with their heuristic value.
+
+        A move changes the cell of one tile and of the blank: every group's
+        index moves with the blank, and the moved tile's group also with the tile.
+
+        Args:
+            state (int): The packed state.
+
+        Returns:
+            list: (neighbour state, heuristic value) tuples.
+        """
+        board = self.board
+        tables, groups, offsets, blank_offsets = self.tables, self.groups, self.offsets, self.blank_offsets
+        indices = self.get_indices(state)
+        blank = state >> board.blank_shift
+        neighbors = []
+        for target, shift, factor, delta in board.moves[blank]:
+            tile = (state >> shift) & board.tile_mask  # The tile that slides into the blank
+            next_indices = [index - group_offsets[blank] + group_offsets[target]
+                            for index, group_offsets in zip(indices, blank_offsets)]
+            group = groups[tile]
+            if group is not None:  # The tile's group also sees it move
+                next_indices[group] += offsets[blank][tile] - offsets[target][tile]
+            neighbors.append((state + tile * factor + delta,
+                              sum(table[index] for table, index in zip(tables, next_indices))))
+        return neighbors
+
+
+if __name__ == '__main__':
+    # Build step: python pattern_database.py [goal_state ...], by default every 8-puzzle canonical goal and the
+    # 15-puzzle default goal; complete tables are kept
+    import sys
+
+    for goal in sys.argv[1:] or canonical_goals(3) + ['0123456789ABCDEF']:
+        for tiles in PATTERNS[board_of(goal).size]:
+            if patterns_on_disk(goal, (tiles,)):  # Already built
+                continue
+            start_time = time.time()
+            print(f'Wrote {build_pattern(goal, tiles)} in {time.time() - start_time:.1f}s')
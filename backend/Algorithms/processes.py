@@ -0,0 +1,74 @@
+"""
+Worker processes of the parallel solvers: HDA* (hda_star.py) and the auto-race (auto.py).
+
+The server runs searches in request threads, and forking a process that has
+threads can leave the child holding a lock no thread will ever release.
+Workers are therefore started from the forkserver (spawned where there is
+none), which forks from a clean single-threaded process.
+
+Each parallel search starts several processes, so the number of them that
+run at once in a process is capped by a pool of slots (see limit_searches());
+a search waits for a free slot before it starts its workers.
+"""
+
+import contextlib
+import multiprocessing
+import threading
+import time
+
+try:
+    from .budget import CANCELLED, TIME_LIMIT
+except ImportError:  # Running from inside backend/Algorithms
+    from budget import CANCELLED, TIME_LIMIT
+
+MAX_SEARCHES = 1  # Parallel searches that run at once by default; each already uses every core
+SLOT_WAIT = 0.05  # Seconds between two checks of the budget while waiting for a slot
+
+search_slots = threading.BoundedSemaphore(MAX_SEARCHES)
+
+
+def get_context():
+    """
+    Returns the multiprocessing context worker processes are started from: forkserver, or spawn
+    where it is not available.
+    """
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+
+
+def limit_searches(count):
+    """
+    Sets how many parallel searches may run at once, e.g. from the server's configuration.
+    Only call it while no parallel search runs.
+    """
+    global search_slots
+    if not isinstance(count, int) or count < 1:
+        raise ValueError(f'count must be a positive integer, not {count!r}')
+    search_slots = threading.BoundedSemaphore(count)
+
+
+@contextlib.contextmanager
+def search_slot(budget):
+    """
+    Holds a slot of the parallel searches while the block runs, waiting for one if needed.
+
+    Args:
+        budget (SearchBudget): The budget of the search, already started; waiting stops if its
+            cancel token is set or its time limit passes.
+
+    Yields:
+        str: CANCELLED or TIME_LIMIT if the budget ran out while waiting (no slot is held then),
+        otherwise None.
+    """
+    slots = search_slots
+    while not slots.acquire(timeout=SLOT_WAIT):
+        if budget.cancel_token is not None and budget.cancel_token.is_set():
+            yield CANCELLED
+            return
+        if budget.deadline is not None and time.time() >= budget.deadline:
+            yield TIME_LIMIT
+            return
+    try:
+        yield None
+    finally:
+        slots.release()
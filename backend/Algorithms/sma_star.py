@@ -0,0 +1,311 @@
+"""
+Simplified memory-bounded A* (SMA*, Russell 1992).
+
+A* remembers every state it generates, so a hard board can use hundreds of
+megabytes. SMA* keeps at most memory_limit nodes. When the store is full, the
+leaf with the highest f (the shallowest of equals) is forgotten and its
+parent keeps its f as a bound, so the subtree is only generated again once
+nothing more promising is left.
+
+It is a tree search: a state reached along two paths is stored twice, and
+only the move undoing the previous one is pruned. The returned path is
+optimal when it has at most memory_limit states. Deeper nodes get an infinite
+f; if nothing else is left, the run is stopped with the 'memory limit' reason.
+"""
+
+import heapq
+import time
+
+try:
+    from .Astar import AStar
+    from .budget import MEMORY_LIMIT
+    from .state import SOLVED, NOT_FOUND, STOPPED, UNSUPPORTED, check_puzzle
+except ImportError:  # Running from inside backend/Algorithms
+    from Astar import AStar
+    from budget import MEMORY_LIMIT
+    from state import SOLVED, NOT_FOUND, STOPPED, UNSUPPORTED, check_puzzle
+
+DEFAULT_MEMORY_LIMIT = 100_000  # Nodes kept when neither the solver nor the budget sets a limit
+INFINITY = float('inf')
+
+
+class Node:
+    __slots__ = ('state', 'g', 'h', 'f', 'parent', 'children', 'pending', 'order', 'key', 'alive')
+
+    def __init__(self, state, g, h, f, parent, order):
+        """
+        Initializes one node of the search tree.
+
+        Args:
+            state (int): The packed state.
+            g (int): The number of moves from the start.
+            h (float): The heuristic value of the state.
+            f (float): The lower bound on the cost of a path through the node.
+            parent (Node): The node it was generated from (None for the start).
+            order (int): Creation counter, orders nodes of equal f and depth.
+        """
+        self.state = state
+        self.g = g
+        self.h = h
+        self.f = f  # Backed up from the children once the node is expanded
+        self.parent = parent
+        self.children = []  # Successors kept in memory
+        self.pending = None  # Sorted (f bound, state, h) of successors not in memory, None until expanded
+        self.order = order
+        self.key = None  # Priority of the node in the open queue, None if it has nothing to generate
+        self.alive = True  # False once forgotten
+
+
+class SMAStar(AStar):
+    def __init__(self, start_state, goal_state='012345678', heuristic='Manhattan', memory_limit=None,
+                 path_format='states', budget=None, metrics=None):
+        """
+        Initializes the SMA* search algorithm.
+
+        Args:
+            start_state (str): The initial state of the puzzle.
+            goal_state (str): The goal state of the puzzle (default is '012345678').
+            heuristic (str): The heuristic function to use, see AStar (default is 'Manhattan').
+            memory_limit (int): The most nodes to keep. The budget's max_memory also applies; if
+                neither is set, DEFAULT_MEMORY_LIMIT is used.
+            path_format (str): Return the path as puzzle strings ('states') or as a move string
+                such as 'RDLU' ('moves', see state.format_path()) (default is 'states').
+            budget (SearchBudget): Node, time and memory limits and a cancel token (see budget.py).
+            metrics (SearchMetrics): Counters to fill in during the search (see instrumentation.py);
+                None collects nothing.
+        """
+        super().__init__(start_state, goal_state, heuristic, path_format=path_format, budget=budget,
+                         metrics=metrics)
+        self.memory_limit = self.budget.get_memory_limit(memory_limit) or DEFAULT_MEMORY_LIMIT
+        self.stored_nodes = 0  # Nodes currently in memory
+        self.peak_stored = 0  # Most nodes in memory at once
+        self.forgotten_nodes = 0  # Leaves dropped to make room
+        self.memory_cut = False  # Whether a node was too deep to expand within the limit
+        self.open = []  # Heap of (key, -g, -order, node): nodes that can generate a successor
+        self.leaves = []  # Heap of (-f, g, order, node): nodes without children in memory
+
+    def run(self):
+        """
+        Runs the SMA* search algorithm.
+
+        The node with the lowest f (the deepest of equals) generates its most
+        promising successor not in memory. A node's f is the smallest bound of
+        its successors once it is expanded, and the bounds go up the tree as
+        subtrees turn out worse than estimated. The first time the goal is
+        selected, its path is optimal.
+
+        Returns:
+            A tuple containing the path to the goal state and the total cost.
+        """
+        self.status = check_puzzle(self.start_state, self.goal_state)
+        if self.status:  # Invalid or unsolvable input, there is nothing to search
+            return None, INFINITY
+        if not self.supports_board():  # The heuristic has no tables for this board or goal
+            self.status = UNSUPPORTED
+            return None, INFINITY
+
+        metrics = self.metrics
+        if metrics is not None:
+            metrics.start()
+        start = self.board.encode(self.start_state)  # Packed start state
+        goal = self.load_tables()  # Packed goal state
+        start_time = time.perf_counter_ns()  # Start timing the algorithm
+        exhausted = self.budget.exhausted
+        self.budget.start()
+        self.stop_reason = None
+        self.memory_cut = False
+        heuristic = self.get_cost(start)
+        root = Node(start, 0, heuristic, heuristic, None, 0)
+        order = 0
+        self.open, self.leaves = [], []
+        self.stored_nodes = self.peak_stored = 1
+        self.push_open(root, root.f)
+        if metrics is not None:
+            metrics.heuristic_evaluations += 1  # The start state
+            metrics.mark('setup')
+
+        while self.open:
+            key, _, _, node = heapq.heappop(self.open)
+            if not node.alive or key != node.key:  # Stale entry
+                continue
+            node.key = None  # Out of the queue until it is pushed again
+            if key == INFINITY:  # Every path left is too deep for the memory limit, or there is none
+                break
+            self.stop_reason = exhausted(self.explored_nodes, len(self.open), self.stored_nodes)
+            if self.stop_reason:  # Out of budget, report what was searched so far
+                self.total_time = (time.perf_counter_ns() - start_time) / 1e9
+                self.status = STOPPED
+                return None, INFINITY
+
+            if node.pending is None:  # Selected for the first time
+                self.explored_nodes += 1  # Increment the number of explored nodes
+                self.search_depth = max(self.search_depth, node.g)  # Update the maximum search depth
+                if node.state == goal:  # If the current node is the goal state
+                    self.total_time = (time.perf_counter_ns() - start_time) / 1e9  # Calculate total time
+                    self.status = SOLVED
+                    self.cost = node.g
+                    return self.get_path(node), self.cost
+                self.expand(node)
+                continue
+
+            # Generate the most promising successor that is not in memory
+            bound, state, heuristic = node.pending.pop(0)
+            order += 1
+            child = Node(state, node.g + 1, heuristic, bound, node, order)
+            node.children.append(child)
+            self.stored_nodes += 1
+            self.push_open(child, child.f)
+            self.push_leaf(child)
+            self.push_open(node, node.pending[0][0] if node.pending else None)
+            self.back_up(node)
+            while self.stored_nodes > self.memory_limit:
+                self.forget_worst_leaf()
+            self.peak_stored = max(self.peak_stored, self.stored_nodes)
+            if len(self.open) + len(self.leaves) > 4 * self.memory_limit + 64:  # Too many stale entries
+                self.rebuild_queues(root)
+
+        self.total_time = (time.perf_counter_ns() - start_time) / 1e9  # Calculate total time
+        if self.memory_cut:  # The goal may be deeper than the memory allows
+            self.stop_reason = MEMORY_LIMIT
+            self.status = STOPPED
+        else:
+            self.status = NOT_FOUND
+        return None, INFINITY
+
+    def expand(self, node):
+        """
+        Computes the bounds of a node's successors, which are kept in its
+        pending list until they are generated one at a time.
+
+        A successor's bound is its own f, but never less than its parent's
+        (pathmax), so f never decreases along a path. A successor that would
+        fill the memory with the path alone cannot be expanded, so unless it is
+        the goal its bound is infinite.
+
+        Args:
+            node (Node): A node selected for the first time.
+        """
+        parent_state = None if node.parent is None else node.parent.state
+        neighbors = self.get_neighbors(node.state, node.h)
+        deepest = node.g + 2 >= self.memory_limit  # Successors are at depth g + 1, memory_limit - 1 is full
+        pending = []
+        for next_state, cost in neighbors:
+            if next_state == parent_state:  # Undoing the previous move never helps
+                continue
+            if deepest and next_state != self.goal:
+                self.memory_cut = True
+                pending.append((INFINITY, next_state, cost))
+            else:
+                pending.append((max(node.f, node.g + 1 + cost), next_state, cost))
+        pending.sort()
+        node.pending = pending
+        if self.metrics is not None:
+            self.metrics.heuristic_evaluations += len(neighbors)
+            self.metrics.expand(len(neighbors), len(pending), len(self.open), self.stored_nodes)
+        self.push_open(node, pending[0][0] if pending else None)
+        self.back_up(node)
+
+    def back_up(self, node):
+        """
+        Updates the f of an expanded node, and of its ancestors, to the smallest
+        bound of its successors.
+        """
+        while node is not None and node.pending is not None:
+            f = min((child.f for child in node.children), default=INFINITY)
+            if node.pending:
+                f = min(f, node.pending[0][0])
+            if f == node.f:
+                break
+            node.f = f
+            if not node.children:  # Its place in the leaves heap changed
+                self.push_leaf(node)
+            node = node.parent
+
+    def forget_worst_leaf(self):
+        """
+        Drops the leaf with the highest f (the shallowest of equals) from memory.
+        Its parent keeps its f as the bound of that successor.
+        """
+        while True:
+            negative_f, _, _, leaf = heapq.heappop(self.leaves)
+            if leaf.alive and not leaf.children and leaf.parent is not None and -negative_f == leaf.f:
+                break
+        leaf.alive = False
+        leaf.key = None
+        parent = leaf.parent
+        parent.children.remove(leaf)
+        parent.pending.append((leaf.f, leaf.state, leaf.h))
+        parent.pending.sort()
+        self.push_open(parent, parent.pending[0][0])
+        if not parent.children:
+            self.push_leaf(parent)
+        self.stored_nodes -= 1
+        self.forgotten_nodes += 1
+
+    def push_open(self, node, key):
+        """
+        Sets the priority of a node in the open queue; None takes it out.
+        """
+        if key != node.key:
+            node.key = key
+            if key is not None:
+                heapq.heappush(self.open, (key, -node.g, -node.order, node))
+
+    def push_leaf(self, node):
+        """
+        Adds a node without children in memory to the leaves heap, with its current f.
+        """
+        heapq.heappush(self.leaves, (-node.f, node.g, node.order, node))
+
+    def rebuild_queues(self, root):
+        """
+        Rebuilds both heaps from the nodes in memory, dropping the entries left
+        behind by nodes that were forgotten or changed, so the heaps stay within
+        a few times the memory limit.
+        """
+        self.open, self.leaves = [], []
+        nodes = [root]
+        while nodes:
+            node = nodes.pop()
+            if node.key is not None:
+                self.open.append((node.key, -node.g, -node.order, node))
+            if not node.children:
+                self.leaves.append((-node.f, node.g, node.order, node))
+            nodes.extend(node.children)
+        heapq.heapify(self.open)
+        heapq.heapify(self.leaves)
+
+    def get_path(self, node):
+        """
+        Rebuilds the path to a node from its ancestors.
+
+        Args:
+            node (Node): The goal node.
+
+        Returns:
+            The path from the start state to the goal state, in self.path_format.
+        """
+        if self.metrics is not None:
+            self.metrics.mark('search')
+        path = []
+        while node is not None:
+            path.append(node.state)
+            node = node.parent
+        path = self.board.format_path(path[::-1], self.path_format)
+        if self.metrics is not None:
+            self.metrics.mark('path')
+        return path
+
+    def get_info(self):
+        """
+        Returns information about the search process.
+
+        Returns:
+            A dictionary containing the number of explored nodes, total execution time, search depth,
+            cost and the memory used.
+        """
+        info = super().get_info()
+        info['memory limit'] = self.memory_limit  # Most nodes the search could keep
+        info['peak stored states'] = self.peak_stored  # Most nodes it kept at once
+        info['forgotten nodes'] = self.forgotten_nodes  # Leaves dropped to stay within the limit
+        return info
@@ -0,0 +1,563 @@
+"""
+Compact integer encoding of puzzle states shared by all the solvers.
+
+A board such as '125670834' is packed into a single int: the tile at cell i
+lives in bits 4*i .. 4*i+3 and the position of the blank is stored above the
+tiles. One int is therefore both a cheap dict key and everything needed to
+generate successors, without scanning for '0' or building strings and lists.
+
+Boards of any size from 2x2 to 6x6 are supported. A puzzle string has one
+character per cell and tiles from 10 up are written as letters, so the
+15-puzzle goal is '0123456789ABCDEF'; the size follows from the length of the
+string. Each size has a Board (see get_board()) holding its move tables and
+helpers. The module-level constants and helpers below describe the classic
+3x3 board, the only size small enough for the permutation rank tables.
+"""
+
+import functools
+import itertools
+import math
+
+SIZE = 3  # Width and height of the default board
+CELLS = SIZE * SIZE  # Number of cells on the board
+TILE_BITS = 4  # Bits used to store one tile
+TILE_MASK = (1 << TILE_BITS) - 1
+BLANK_SHIFT = TILE_BITS * CELLS  # The blank position is stored above the tiles
+GOAL_STATE = '012345678'
+
+TILE_CHARS = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ'  # Tile i is written as TILE_CHARS[i]
+MIN_SIZE = 2
+MAX_SIZE = 6  # One character per tile allows up to 36 cells
+
+# Outcomes of a search, stored by the solvers in their ``status`` attribute
+SOLVED = 'solved'
+NOT_FOUND = 'not found'
+INVALID = 'invalid'  # The input is not a permutation of the tiles
+UNSOLVABLE = 'unsolvable'  # The goal is in the other parity class
+STOPPED = 'stopped'  # A search budget ran out or the search was cancelled (see budget.py)
+UNSUPPORTED = 'unsupported'  # The solver cannot handle boards of this size
+
+# Formats a solver can return its path in
+PATH_STATES = 'states'  # One puzzle string per step
+PATH_MOVES = 'moves'  # One letter per step, naming the direction the blank moves
+PATH_FORMATS = (PATH_STATES, PATH_MOVES)
+
+
+def _build_neighbors(size=SIZE):
+    """
+    Builds the table of cells the blank can move to from every position.
+
+    The order (up, right, left, down) matches the order the solvers have
+    always expanded neighbours in, so search results stay the same.
+
+    Args:
+        size (int): The width of the board.
+
+    Returns:
+        tuple: For each blank position, a tuple of the reachable cells.
+    """
+    table = []
+    for i in range(size * size):
+        y, x = divmod(i, size)
+        targets = []
+        if y > 0:
+            targets.append(i - size)  # Up
+        if x < size - 1:
+            targets.append(i + 1)  # Right
+        if x > 0:
+            targets.append(i - 1)  # Left
+        if y < size - 1:
+            targets.append(i + size)  # Down
+        table.append(tuple(targets))
+    return tuple(table)
+
+
+def _build_moves(neighbors=None, tile_bits=TILE_BITS, blank_shift=BLANK_SHIFT):
+    """
+    Precomputes, for every blank position, the arithmetic needed to slide a tile.
+
+    Moving the blank from cell b to cell t takes the tile found at t and puts
+    it at b. With the packed encoding this is
+    ``state + tile * ((1 << 4b) - (1 << 4t)) + ((t - b) << BLANK_SHIFT)``,
+    so each entry stores the target cell, the shift that extracts the tile,
+    the factor and the blank delta.
+
+    Args:
+        neighbors (tuple): The reachable cells of every blank position (default is NEIGHBORS).
+        tile_bits (int): Bits used to store one tile.
+        blank_shift (int): Bit offset of the blank position.
+
+    Returns:
+        tuple: For each blank position, a tuple of (target, shift, factor, delta).
+    """
+    table = []
+    for blank, targets in enumerate(neighbors or NEIGHBORS):
+        moves = []
+        for target in targets:
+            shift = tile_bits * target
+            factor = (1 << (tile_bits * blank)) - (1 << shift)
+            delta = (target - blank) << blank_shift
+            moves.append((target, shift, factor, delta))
+        table.append(tuple(moves))
+    return tuple(table)
+
+
+def _build_rank_tables():
+    """
+    Precomputes lookup tables that rank a packed state three cells at a time.
+
+    The lexicographic rank is the sum over cells of (number of unused tiles
+    smaller than the tile at that cell) * (cells left)!. For a group of three
+    cells this only depends on their 12 bits and on which tiles the earlier
+    cells used, so each group's contribution can be looked up instead of
+    computed tile by tile.
+
+    Returns:
+        list: One dict per group, mapping (used tiles << 12) | group bits to
+        (contribution to the rank, used tiles after the group << 12).
+    """
+    tables = []
+    masks = {0}  # Sets of tiles the earlier groups may have used
+    for group in range(CELLS // 3):
+        table = {}
+        next_masks = set()
+        for used in masks:
+            remaining = [tile for tile in range(CELLS) if not used >> tile & 1]
+            for tiles in itertools.permutations(remaining, 3):
+                result = 0
+                mask = used
+                key = used << 12
+                for offset, tile in enumerate(tiles):
+                    cell = 3 * group + offset
+                    key |= tile << (TILE_BITS * offset)
+                    smaller = tile - (mask & ((1 << tile) - 1)).bit_count()
+                    result += smaller * math.factorial(CELLS - 1 - cell)
+                    mask |= 1 << tile
+                table[key] = (result, mask << 12)
+                next_masks.add(mask)
+        tables.append(table)
+        masks = next_masks
+    return tables
+
+
+NEIGHBORS = _build_neighbors()
+MOVES = _build_moves()
+_RANK_TABLES = _build_rank_tables()
+
+
+class Board:
+    def __init__(self, size=SIZE):
+        """
+        Initializes the geometry and move tables of a size x size board.
+
+        Args:
+            size (int): The width and height of the board, from MIN_SIZE to MAX_SIZE.
+        """
+        if not MIN_SIZE <= size <= MAX_SIZE:
+            raise ValueError(f'Board size must be between {MIN_SIZE} and {MAX_SIZE}, got {size}')
+        self.size = size
+        self.cells = size * size
+        self.tile_bits = (self.cells - 1).bit_length()  # 4 bits up to the 15-puzzle, 5 for the 24-puzzle
+        self.tile_mask = (1 << self.tile_bits) - 1
+        self.blank_shift = self.tile_bits * self.cells
+        self.goal_state = TILE_CHARS[:self.cells]  # The default goal, blank first
+        self.neighbors_of = _build_neighbors(size)
+        self.moves = _build_moves(self.neighbors_of, self.tile_bits, self.blank_shift)
+        self.move_offsets = {'U': -size, 'D': size, 'L': -1, 'R': 1}
+        self.move_names = {offset: name for name, offset in self.move_offsets.items()}
+
+    def encode(self, state):
+        """
+        Packs a puzzle string into an int.
+
+        Args:
+            state (str): The puzzle state (e.g. '125670834').
+
+        Returns:
+            int: The packed state, including the blank position.
+        """
+        packed = 0
+        for i, tile in enumerate(state):
+            packed |= int(tile, 36) << (self.tile_bits * i)
+        return packed | (state.index('0') << self.blank_shift)
+
+    def decode(self, state):
+        """
+        Unpacks an int produced by encode() back into a puzzle string.
+        """
+        return ''.join(TILE_CHARS[(state >> (self.tile_bits * i)) & self.tile_mask] for i in range(self.cells))
+
+    def tile_at(self, state, i):
+        """
+        Returns the tile at cell i of a packed state.
+        """
+        return (state >> (self.tile_bits * i)) & self.tile_mask
+
+    def neighbors(self, state):
+        """
+        Generates the packed states reachable by moving the blank one cell.
+
+        Args:
+            state (int): The packed state.
+
+        Returns:
+            list: The neighbouring packed states, in up, right, left, down order.
+        """
+        mask = self.tile_mask
+        return [state + ((state >> shift) & mask) * factor + delta
+                for _, shift, factor, delta in self.moves[state >> self.blank_shift]]
+
+    def move(self, state, target):
+        """
+        Slides the tile at cell target into the blank.
+
+        Args:
+            state (int): The packed state.
+            target (int): A cell next to the blank.
+
+        Returns:
+            int: The packed state after the move.
+        """
+        blank = state >> self.blank_shift
+        shift = self.tile_bits * target
+        tile = (state >> shift) & self.tile_mask
+        return (state + tile * ((1 << (self.tile_bits * blank)) - (1 << shift))
+                + ((target - blank) << self.blank_shift))
+
+    def get_path(self, came_from, current, path_format=PATH_STATES):
+        """
+        Reconstructs the path from the start state to a given state.
+
+        Args:
+            came_from (dict): Maps each packed state to its packed predecessor.
+            current (int): The packed state to trace back from.
+            path_format (str): PATH_STATES or PATH_MOVES (see format_path()).
+
+        Returns:
+            The path excluding the start state, in the requested format.
+        """
+        path = [current]
+        while current in came_from:  # Trace back to the start state
+            current = came_from[current]
+            path.append(current)
+        path.reverse()  # Reverse the path to get it from start to goal
+        return self.format_path(path, path_format)
+
+    def format_path(self, path, path_format=PATH_STATES):
+        """
+        Converts a path of packed states into the format returned by the solvers.
+
+        Args:
+            path (list): The packed states from the start state to the goal state.
+            path_format (str): PATH_STATES for a list of puzzle strings, PATH_MOVES
+                for a string such as 'RDLU' naming the direction the blank moves.
+
+        Returns:
+            The path excluding the start state: a list of puzzle strings, or a move string.
+        """
+        if path_format == PATH_MOVES:
+            shift = self.blank_shift
+            return ''.join(self.move_names[(current >> shift) - (previous >> shift)]
+                           for previous, current in zip(path, path[1:]))
+        return [self.decode(state) for state in path[1:]]
+
+    def apply_moves(self, state, moves):
+        """
+        Replays a move string, rebuilding the boards of a PATH_MOVES path.
+
+        Args:
+            state (str): The puzzle state the moves start from.
+            moves (str): The moves, e.g. 'RDLU'.
+
+        Returns:
+            list: The puzzle string after each move.
+
+        Raises:
+            ValueError: If a move is unknown or would take the blank off the board.
+        """
+        board = list(state)
+        blank = board.index('0')
+        boards = []
+        for name in moves:
+            target = blank + self.move_offsets.get(name, self.cells)
+            if target not in self.neighbors_of[blank]:
+                raise ValueError(f'Illegal move {name!r} with the blank at cell {blank}')
+            board[blank], board[target] = board[target], '0'
+            blank = target
+            boards.append(''.join(board))
+        return boards
+
+
+@functools.lru_cache(maxsize=None)
+def get_board(size=SIZE):
+    """
+    Returns the (shared) Board of a size.
+
+    Raises:
+        ValueError: If the size is not between MIN_SIZE and MAX_SIZE.
+    """
+    return Board(size)
+
+
+def board_size(state):
+    """
+    Returns the width of the board a puzzle string describes.
+
+    Args:
+        state (str): The puzzle state.
+
+    Returns:
+        int: The size, or None if the length of state is not the number of cells of a supported board.
+    """
+    if not isinstance(state, str):
+        return None
+    size = math.isqrt(len(state))
+    return size if size * size == len(state) and MIN_SIZE <= size <= MAX_SIZE else None
+
+
+def board_of(state):
+    """
+    Returns the Board of a puzzle string, the 3x3 board if its length fits no board.
+    """
+    return get_board(board_size(state) or SIZE)
+
+
+def default_goal(size=SIZE):
+    """
+    Returns the default goal state of a board size: the blank followed by the tiles in order.
+    """
+    return get_board(size).goal_state
+
+
+BOARD = get_board(SIZE)  # The 3x3 board the module-level helpers below work on
+
+
+def encode(state):
+    """
+    Packs a puzzle string of any supported size into an int (see Board.encode()).
+    """
+    return board_of(state).encode(state)
+
+
+def decode(state):
+    """
+    Unpacks a packed 3x3 state back into a puzzle string (see Board.decode()).
+    """
+    return BOARD.decode(state)
+
+
+def neighbors(state):
+    """
+    Generates the packed 3x3 states reachable by moving the blank one cell (see Board.neighbors()).
+    """
+    return BOARD.neighbors(state)
+
+
+def get_path(came_from, current, path_format=PATH_STATES):
+    """
+    Reconstructs the path to a packed 3x3 state (see Board.get_path()).
+    """
+    return BOARD.get_path(came_from, current, path_format)
+
+
+def format_path(path, path_format=PATH_STATES):
+    """
+    Converts a path of packed 3x3 states into the format returned by the solvers (see Board.format_path()).
+    """
+    return BOARD.format_path(path, path_format)
+
+
+def apply_moves(state, moves):
+    """
+    Replays a move string on a puzzle string of any supported size (see Board.apply_moves()).
+
+    Raises:
+        ValueError: If a move is unknown or would take the blank off the board.
+    """
+    return board_of(state).apply_moves(state, moves)
+
+
+def rank(state):
+    """
+    Computes the lexicographic rank of a packed state among all permutations.
+
+    Ranks run from 0 to CELLS! - 1, which makes them usable as offsets into a
+    flat table with one entry per board. The rank is assembled from three
+    precomputed lookups (see _build_rank_tables()).
+
+    Args:
+        state (int): The packed state.
+
+    Returns:
+        int: The permutation rank of the board.
+    """
+    first, used = _RANK_TABLES[0][state & 0xFFF]
+    second, used = _RANK_TABLES[1][((state >> 12) & 0xFFF) | used]
+    return first + second + _RANK_TABLES[2][((state >> 24) & 0xFFF) | used][0]
+
+
+def move(state, target):
+    """
+    Slides the tile at cell target into the blank.
+
+    Args:
+        state (int): The packed state.
+        target (int): A cell next to the blank.
+
+    Returns:
+        int: The packed state after the move.
+    """
+    blank = state >> BLANK_SHIFT
+    shift = TILE_BITS * target
+    tile = (state >> shift) & TILE_MASK
+    return state + tile * ((1 << (TILE_BITS * blank)) - (1 << shift)) + ((target - blank) << BLANK_SHIFT)
+
+
+def unrank(index):
+    """
+    Builds the packed state with a given permutation rank (inverse of rank()).
+
+    Args:
+        index (int): The permutation rank.
+
+    Returns:
+        int: The packed state.
+    """
+    digits = []
+    for base in range(1, CELLS + 1):  # Recover the mixed-radix digits, last cell first
+        index, digit = divmod(index, base)
+        digits.append(digit)
+    digits.reverse()
+    remaining = list(range(CELLS))
+    state = 0
+    for i, digit in enumerate(digits):
+        tile = remaining.pop(digit)
+        state |= tile << (TILE_BITS * i)
+        if tile == 0:
+            state |= i << BLANK_SHIFT
+    return state
+
+
+def is_valid(state):
+    """
+    Checks that a puzzle string is a permutation of the tiles of a supported board.
+
+    Args:
+        state (str): The puzzle state.
+
+    Returns:
+        bool: True if every tile appears exactly once.
+    """
+    size = board_size(state)
+    return size is not None and set(state) == set(TILE_CHARS[:size * size])
+
+
+def permutation_parity(permutation):
+    """
+    Computes the parity of a permutation in O(n) by counting its cycles.
+
+    Args:
+        permutation (list): permutation[i] is the position element i moves to.
+
+    Returns:
+        int: 0 for an even permutation, 1 for an odd one.
+    """
+    seen = [False] * len(permutation)
+    cycles = 0
+    for i in range(len(permutation)):
+        if not seen[i]:
+            cycles += 1
+            while not seen[i]:
+                seen[i] = True
+                i = permutation[i]
+    return (len(permutation) - cycles) & 1
+
+
+def is_solvable(start_state, goal_state=GOAL_STATE):
+    """
+    Checks whether goal_state can be reached from start_state.
+
+    Every move swaps the blank with a neighbour, which flips the parity of the
+    permutation and moves the blank by one cell. The two parities therefore
+    change together, and a goal is reachable exactly when the permutation
+    taking start to goal has the same parity as the blank's Manhattan distance.
+
+    Args:
+        start_state (str): The initial state of the puzzle.
+        goal_state (str): The goal state of the puzzle.
+
+    Returns:
+        bool: True if the puzzle is solvable.
+    """
+    size = math.isqrt(len(goal_state))
+    position = {tile: i for i, tile in enumerate(goal_state)}  # Goal cell of every tile
+    permutation = [position[tile] for tile in start_state]
+    start_y, start_x = divmod(start_state.index('0'), size)
+    goal_y, goal_x = divmod(goal_state.index('0'), size)
+    blank_distance = abs(start_y - goal_y) + abs(start_x - goal_x)
+    return permutation_parity(permutation) == blank_distance & 1
+
+
+def check_puzzle(start_state, goal_state=GOAL_STATE):
+    """
+    Validates a puzzle before any search is run.
+
+    Args:
+        start_state (str): The initial state of the puzzle.
+        goal_state (str): The goal state of the puzzle.
+
+    Returns:
+        str: INVALID or UNSOLVABLE if the puzzle cannot be solved, otherwise None.
+    """
+    if not is_valid(start_state) or not is_valid(goal_state) or len(start_state) != len(goal_state):
+        return INVALID
+    if not is_solvable(start_state, goal_state):
+        return UNSOLVABLE
+    return None
+
+
+def canonical_goal(blank, size=SIZE):
+    """
+    Returns the canonical goal with the blank on a cell: the tiles in reading order around it.
+
+    With the blank on cell 0 this is the default goal.
+    """
+    tiles = TILE_CHARS[1:size * size]
+    return tiles[:blank] + '0' + tiles[blank:]
+
+
+def canonical_goals(size=SIZE):
+    """
+    Returns the canonical goal of every blank cell of a board size.
+    """
+    return [canonical_goal(blank, size) for blank in range(size * size)]
+
+
+def canonicalize(start_state, goal_state):
+    """
+    Renames the tiles of a puzzle so that its goal becomes a canonical goal.
+
+    A move slides the blank whatever the tiles are called, so renaming them
+    the same way in start and goal changes no path: the moves that solve the
+    renamed puzzle solve the original one. Only the blank keeps its name and
+    cell, so there is one canonical goal per blank cell (see canonical_goal());
+    every goal with the blank first maps to the default goal.
+
+    Args:
+        start_state (str): The initial state of the puzzle.
+        goal_state (str): The goal state of the puzzle.
+
+    Returns:
+        tuple: (start, goal, labels): the renamed start and goal, and the canonical name of every
+        tile of goal_state. Inverted, labels maps a canonical path back (see relabel()).
+    """
+    goal = canonical_goal(goal_state.index('0'), math.isqrt(len(goal_state)))
+    labels = dict(zip(goal_state, goal))
+    return relabel(start_state, labels), goal, labels
+
+
+def relabel(state, labels):
+    """
+    Renames the tiles of a puzzle string with a dict from old to new tile characters.
+    """
+    return ''.join(labels[tile] for tile in state)
@@ -0,0 +1,156 @@
+"""
+Walking distance heuristic (Takahashi) for boards up to 4x4.
+
+For the vertical part, only the rows matter: a count matrix says how many
+tiles of each goal row are in each row, and a move takes one tile from the
+blank's neighbouring row into the blank's row. The exact number of such moves
+needed to sort every tile into its goal row is precomputed for every count
+matrix with a breadth-first search. The horizontal part is the same with
+columns. Their sum is admissible, since each move is counted by exactly one
+of them, and it includes the Manhattan distance plus the row and column
+conflicts.
+"""
+
+import collections
+import functools
+
+try:
+    from .state import board_of
+except ImportError:  # Running from inside backend/Algorithms
+    from state import board_of
+
+MAX_SIZE = 4  # The 5x5 tables have millions of entries, too many to build in Python
+COUNT_BITS = 3  # Bits used to store one count of the matrix (counts go up to the board size)
+
+
+@functools.lru_cache(maxsize=None)
+def walking_table(size, blank_line):
+    """
+    Computes the walking distance of every count matrix of one direction.
+
+    Keys pack the count matrix, count[line][goal line] at bit offset
+    COUNT_BITS * (line * size + goal line), and the blank's line above it.
+
+    Args:
+        size (int): The width of the board.
+        blank_line (int): The row (or column) of the blank in the goal.
+
+    Returns:
+        dict: Maps each key to the moves needed to reach the goal matrix.
+    """
+    blank_shift = COUNT_BITS * size * size
+    goal = blank_line << blank_shift
+    for line in range(size):
+        goal += (size - (line == blank_line)) << (COUNT_BITS * (line * size + line))
+    table = {goal: 0}
+    queue = collections.deque([goal])
+    while queue:
+        key = queue.popleft()
+        distance = table[key] + 1
+        blank = key >> blank_shift
+        for line in (blank - 1, blank + 1):  # A tile moves from the next line into the blank's
+            if not 0 <= line < size:
+                continue
+            for goal_line in range(size):
+                source = COUNT_BITS * (line * size + goal_line)
+                if not (key >> source) & ((1 << COUNT_BITS) - 1):
+                    continue
+                next_key = (key - (1 << source) + (1 << (COUNT_BITS * (blank * size + goal_line)))
+                            + ((line - blank) << blank_shift))
+                if next_key not in table:
+                    table[next_key] = distance
+                    queue.append(next_key)
+    return table
+
+
+class WalkingDistance:
+    def __init__(self, goal_state):
+        """
+        Prepares the walking distance tables of a goal state.
+
+        Args:
+            goal_state (str): The goal state of the puzzle.
+
+        Raises:
+            ValueError: If the board is larger than MAX_SIZE.
+        """
+        board = self.board = board_of(goal_state)
+        size = board.size
+        if size > MAX_SIZE:
+            raise ValueError(f'Walking distance supports boards up to {MAX_SIZE}x{MAX_SIZE}')
+        goal_cells = {int(tile, 36): i for i, tile in enumerate(goal_state)}
+        blank_row, blank_column = divmod(goal_cells[0], size)
+        self.rows = walking_table(size, blank_row)  # Vertical walking distances
+        self.columns = walking_table(size, blank_column)  # Horizontal walking distances
+        self.blank_shift = COUNT_BITS * size * size
+
+        # weights[cell][tile] is what the tile at cell adds to the row (or column) key
+        self.row_weights = []
+        self.column_weights = []
+        for cell in range(board.cells):
+            row, column = divmod(cell, size)
+            row_weights, column_weights = [0], [0]  # The blank is not counted
+            for tile in range(1, board.cells):
+                goal_row, goal_column = divmod(goal_cells[tile], size)
+                row_weights.append(1 << (COUNT_BITS * (row * size + goal_row)))
+                column_weights.append(1 << (COUNT_BITS * (column * size + goal_column)))
+            self.row_weights.append(tuple(row_weights))
+            self.column_weights.append(tuple(column_weights))
+
+    def get_keys(self, state):
+        """
+        Builds the row and column keys of a packed state.
+
+        Returns:
+            tuple: (row key, column key), see walking_table().
+        """
+        board = self.board
+        row_key = column_key = 0
+        for cell in range(board.cells):
+            tile = board.tile_at(state, cell)
+            row_key += self.row_weights[cell][tile]
+            column_key += self.column_weights[cell][tile]
+        row, column = divmod(state >> board.blank_shift, board.size)
+        return row_key + (row << self.blank_shift), column_key + (column << self.blank_shift)
+
+    def evaluate(self, state):
+        """
+        Returns the walking distance of a packed state.
+        """
+        row_key, column_key = self.get_keys(state)
+        return self.rows[row_key] + self.columns[column_key]
+
+    def get_neighbors(self, state):
+        """
+        Generates the neighbours of a packed state with their walking distance.
+
+        A vertical move only changes the row key and a horizontal one the
+        column key, by the weights of the moved tile, so the keys of the
+        state are built once and updated per neighbour.
+
+        Args:
+            state (int): The packed state.
+
+        Returns:
+            list: (neighbour state, walking distance) tuples.
+        """
+        board = self.board
+        rows, columns = self.rows, self.columns
+        row_key, column_key = self.get_keys(state)
+        row_distance, column_distance = rows[row_key], columns[column_key]
+        blank = state >> board.blank_shift
+        neighbors = []
+        for target, shift, factor, delta in board.moves[blank]:
+            tile = (state >> shift) & board.tile_mask  # The tile that slides into the blank
+            if target - blank in (1, -1):  # Horizontal move, the tile changes column
+                weights = self.column_weights
+                key = (column_key + weights[blank][tile] - weights[target][tile]
+                       + ((target - blank) << self.blank_shift))
+                cost = row_distance + columns[key]
+            else:
+                weights = self.row_weights
+                step = 1 if target > blank else -1
+                key = row_key + weights[blank][tile] - weights[target][tile] + (step << self.blank_shift)
+                cost = rows[key] + column_distance
+            neighbors.append((state + tile * factor + delta, cost))
+        return neighbors
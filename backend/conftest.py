@@ -0,0 +1,8 @@
+"""
+Makes backend/ importable by the tests wherever pytest is started from.
+
+The tests import the solvers as the server does (``from Algorithms.state import ...``),
+which needs backend/ on sys.path. pytest puts the directory of this file there before
+collecting, so ``python -m pytest backend/tests`` from the checkout root works as well
+as ``python -m pytest tests`` from backend/.
+"""
@@ -0,0 +1,165 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+# Lifecycle of a job
+QUEUED = 'queued'
+RUNNING = 'running'
+FINISHED = 'finished'
+CANCELLED = 'cancelled'
+
+
+class Job:
+    def __init__(self):
+        """
+        Initializes a job waiting for a worker.
+        """
+        self.id = uuid.uuid4().hex
+        self.state = QUEUED
+        self.cancel_token = threading.Event()  # Set to stop the search (see Algorithms/budget.py)
+        self.solver = None  # The running solver, set through attach()
+        self.result = None  # JSON body of the outcome, set when the job finishes
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.future = None  # Future of the worker pool, used to cancel queued jobs
+
+    def attach(self, solver):
+        """
+        Remembers the solver of the job so its progress can be read while it runs.
+        Passed to dispatch.solve() as the observer.
+        """
+        self.solver = solver
+
+    def get_progress(self):
+        """
+        Reads the counters of the running solver. Solvers only ever increase
+        them, so reading them from another thread is safe.
+
+        Returns:
+            dict: Explored nodes, search depth, the IDA* bound if any, and elapsed seconds.
+        """
+        progress = {}
+        solver = self.solver
+        if solver is not None:
+            progress['explored nodes'] = solver.explored_nodes
+            progress['max search depth'] = solver.search_depth
+            if getattr(solver, 'bound', None) is not None:
+                progress['bound'] = solver.bound
+        if self.started is not None:
+            progress['elapsed'] = round((self.finished or time.time()) - self.started, 3)
+        return progress
+
+    def to_dict(self):
+        """
+        Returns the JSON body describing the job.
+        """
+        return {
+            'id': self.id,
+            'state': self.state,
+            'progress': self.get_progress(),
+            'result': self.result,
+        }
+
+
+class JobManager:
+    def __init__(self, max_workers=2, max_jobs=1000):
+        """
+        Initializes a pool of worker threads that run solver jobs.
+
+        Threads share the solver objects with the request threads, so progress
+        can be read and searches cancelled directly. Python switches between
+        threads every few milliseconds, so short requests are still answered
+        while long searches run.
+
+        Args:
+            max_workers (int): Number of searches that run at once; later jobs queue.
+            max_jobs (int): Number of jobs remembered; the oldest finished ones are forgotten first.
+        """
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='job')
+        self.max_jobs = max_jobs
+        self.jobs = OrderedDict()  # id -> Job, oldest first
+        self.lock = threading.Lock()
+
+    def submit(self, task):
+        """
+        Queues a job.
+
+        Args:
+            task (callable): Called with the Job in a worker thread. It should pass
+                job.cancel_token to the search budget and job.attach to dispatch.solve(),
+                and return the JSON body of the result.
+
+        Returns:
+            Job: The queued job.
+        """
+        job = Job()
+        with self.lock:
+            self.jobs[job.id] = job
+            self.forget_finished()
+        job.future = self.executor.submit(self.run, job, task)
+        return job
+
+    def run(self, job, task):
+        """
+        Runs one job in a worker thread.
+        """
+        if job.cancel_token.is_set():  # Cancelled while it was queued
+            job.state = CANCELLED
+            job.finished = time.time()
+            return
+        job.state = RUNNING
+        job.started = time.time()
+        try:
+            job.result = task(job)
+        except Exception as error:  # Report the failure instead of losing it in the pool
+            job.result = {'message': f'Job failed: {error}', 'status': 'failed'}
+        job.finished = time.time()
+        job.state = CANCELLED if job.cancel_token.is_set() else FINISHED
+
+    def get(self, job_id):
+        """
+        Returns the job with an id, or None if it is unknown or was forgotten.
+        """
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def cancel(self, job_id):
+        """
+        Cancels a job. A queued job never starts; a running search stops at its
+        next budget check and the job keeps the partial result.
+
+        Returns:
+            Job: The job, or None if it is unknown.
+        """
+        job = self.get(job_id)
+        if job is None:
+            return None
+        job.cancel_token.set()
+        if job.state == QUEUED and job.future.cancel():
+            job.state = CANCELLED
+            job.finished = time.time()
+        return job
+
+    def get_counts(self):
+        """
+        Returns the number of remembered jobs in each state.
+        """
+        with self.lock:
+            counts = dict.fromkeys((QUEUED, RUNNING, FINISHED, CANCELLED), 0)
+            for job in self.jobs.values():
+                counts[job.state] += 1
+            return counts
+
+    def forget_finished(self):
+        """
+        Drops the oldest finished jobs beyond max_jobs. The caller holds the lock.
+        """
+        excess = len(self.jobs) - self.max_jobs
+        for job_id in [job_id for job_id, job in self.jobs.items() if job.state in (FINISHED, CANCELLED)]:
+            if excess <= 0:
+                break
+            del self.jobs[job_id]
+            excess -= 1
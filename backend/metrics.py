@@ -0,0 +1,82 @@
+import threading
+
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 60)  # Upper bounds in seconds
+
+
+class MetricsRegistry:
+    def __init__(self):
+        """
+        Initializes an empty set of counters, gauges and histograms rendered in
+        the Prometheus text format (no client library needed).
+        """
+        self.lock = threading.Lock()  # Flask serves requests from several threads
+        self.kinds = {}  # name -> (type, help text), in the order they were described
+        self.values = {}  # (name, labels) -> value; histograms keep [bucket counts, sum, count]
+
+    def describe(self, name, kind, help_text):
+        """
+        Declares a metric. kind is 'counter', 'gauge' or 'histogram'.
+        """
+        self.kinds[name] = (kind, help_text)
+
+    def inc(self, name, amount=1, **labels):
+        """
+        Adds to a counter.
+        """
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def set(self, name, value, **labels):
+        """
+        Sets a gauge.
+        """
+        with self.lock:
+            self.values[(name, tuple(sorted(labels.items())))] = value
+
+    def observe(self, name, value, **labels):
+        """
+        Records one observation in a histogram with LATENCY_BUCKETS.
+        """
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            histogram = self.values.setdefault(key, [[0] * len(LATENCY_BUCKETS), 0, 0])
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if value <= bound:
+                    histogram[0][i] += 1
+            histogram[1] += value
+            histogram[2] += 1
+
+    def render(self):
+        """
+        Returns every metric in the Prometheus text exposition format.
+        """
+        lines = []
+        with self.lock:
+            values = sorted(self.values.items())
+        for name, (kind, help_text) in self.kinds.items():
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            for (metric, labels), value in values:
+                if metric != name:
+                    continue
+                if kind != 'histogram':
+                    lines.append(f'{name}{format_labels(labels)} {value}')
+                    continue
+                buckets, total, count = value
+                for bound, bucket_count in zip(LATENCY_BUCKETS, buckets):
+                    lines.append(f'{name}_bucket{format_labels(labels + (("le", str(bound)),))} {bucket_count}')
+                lines.append(f'{name}_bucket{format_labels(labels + (("le", "+Inf"),))} {count}')
+                lines.append(f'{name}_sum{format_labels(labels)} {total}')
+                lines.append(f'{name}_count{format_labels(labels)} {count}')
+        return '\n'.join(lines) + '\n'
+
+
+def format_labels(labels):
+    """
+    Formats (name, value) pairs as a Prometheus label set.
+    """
+    if not labels:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"') for _, value in labels)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(labels, escaped)) + '}'
@@ -1,80 +1,550 @@
-from flask import Flask, jsonify, request
+import argparse
+import functools
+import json
+import logging
+import os
+import random
+import time
+
+from flask import Flask, Response, jsonify, request, stream_with_context
 from flask_cors import CORS
-from Algorithms.Astar import AStar
-from Algorithms.bfs import BFS
-from Algorithms.dfs import DFS
-from Algorithms.it_dfs import IT_DFS
+from Algorithms.batch import solve_batch
+from Algorithms.Astar import heuristic_table
+from Algorithms.budget import SearchBudget
+from Algorithms.dispatch import ALGORITHMS, UNKNOWN_ALGORITHM, solve
+from Algorithms.distance_table import load_table
+from Algorithms.instrumentation import PHASES, SearchMetrics
+from Algorithms.pattern_database import PatternDatabase, build_patterns
+from Algorithms.processes import limit_searches
+from Algorithms.state import (GOAL_STATE, INVALID, SOLVED, NOT_FOUND, UNSOLVABLE, STOPPED, UNSUPPORTED, PATH_STATES,
+                              PATH_MOVES, PATH_FORMATS, SIZE, MIN_SIZE, MAX_SIZE, apply_moves, board_size,
+                              canonical_goals, canonicalize, check_puzzle, default_goal)
+from Algorithms.walking_distance import WalkingDistance
+from jobs import FINISHED, CANCELLED, JobManager
+from metrics import MetricsRegistry
+from solution_cache import SolutionCache
+
 
- 
 app = Flask(__name__)
 CORS(app)
+started = time.time()  # For the uptime reported by /health
 
-@app.route('/start', methods=['POST'])  # New endpoint for starting the algorithm
-def start_algorithm():
-    info = [
-    ]
-    path = [
-        '125670834',  # Initial State
-        '125607834',  # Step 1
-        '125683074',  # Step 2
-        '120683754',  # Step 3
-        '123456780'   # Final State
-    ]
-    data = request.json  # Get JSON data from the request
+logger = logging.getLogger('puzzle')
+LOG_SAMPLE_RATE = float(os.environ.get('PUZZLE_LOG_SAMPLE', 1))  # Fraction of solved requests that are logged
+
+# Repeated boards (UI presets, retries) are answered from this cache instead of searching again
+cache = SolutionCache(
+    max_size=int(os.environ.get('PUZZLE_CACHE_SIZE', 1024)),
+    ttl=float(os.environ['PUZZLE_CACHE_TTL']) if os.environ.get('PUZZLE_CACHE_TTL') else None,
+    path=os.environ.get('PUZZLE_CACHE_PATH'),  # SQLite file, keeps solutions across restarts
+    max_disk_size=int(os.environ.get('PUZZLE_CACHE_DISK_SIZE', 100000)),
+)
+
+# Long searches submitted to /jobs run here, without holding a request thread
+job_manager = JobManager(max_workers=int(os.environ.get('PUZZLE_JOB_WORKERS', 2)))
+# Jobs live in the memory of the process that created them, so /jobs is only served by a single worker process
+# (run_production() turns it off for more); with several, a poll could land on a worker that never saw the job
+jobs_enabled = True
+JOB_EVENT_INTERVAL = 0.5  # Seconds between progress events of /jobs/<id>/events
+# HDA* and auto-race searches that may run at once in this process; each starts a worker process per core
+limit_searches(int(os.environ.get('PUZZLE_PARALLEL_SEARCHES', 1)))
+
+# Server-wide caps on every search, so one pathological request cannot pin a worker.
+# Requests may ask for tighter limits (maxNodes, timeLimit, maxFrontier, maxMemory) but not looser ones.
+# maxMemory is the most states a search may keep: the memory-bounded solvers stay within it, the others stop.
+LIMITS = {
+    'maxNodes': ('max_nodes', int,
+                 int(os.environ['PUZZLE_MAX_NODES']) if os.environ.get('PUZZLE_MAX_NODES') else None),
+    'timeLimit': ('time_limit', float, float(os.environ.get('PUZZLE_TIME_LIMIT') or 60)),
+    'maxFrontier': ('max_frontier', int,
+                    int(os.environ['PUZZLE_MAX_FRONTIER']) if os.environ.get('PUZZLE_MAX_FRONTIER') else None),
+    'maxMemory': ('max_memory', int,
+                  int(os.environ['PUZZLE_MAX_MEMORY']) if os.environ.get('PUZZLE_MAX_MEMORY') else None),
+}
+
+# Collect the search counters of every solve, not only of requests that ask with "instrument": true
+INSTRUMENT = os.environ.get('PUZZLE_INSTRUMENT', '').lower() in ('1', 'true', 'yes')
+
+# Served by /metrics in the Prometheus text format. Each worker process keeps its own.
+registry = MetricsRegistry()
+registry.describe('puzzle_requests_total', 'counter', 'Solve requests by algorithm and status.')
+registry.describe('puzzle_cache_hits_total', 'counter', 'Solve requests answered from the cache.')
+registry.describe('puzzle_solve_seconds', 'histogram', 'Time spent searching, cache hits excluded.')
+registry.describe('puzzle_explored_nodes_total', 'counter', 'Nodes expanded by the solvers.')
+registry.describe('puzzle_generated_nodes_total', 'counter', 'Successors generated by instrumented searches.')
+registry.describe('puzzle_duplicate_nodes_total', 'counter', 'Successors of instrumented searches dropped as already seen.')
+registry.describe('puzzle_heuristic_evaluations_total', 'counter', 'Heuristic values computed by instrumented searches.')
+registry.describe('puzzle_phase_seconds_total', 'counter', 'Time instrumented searches spent in each phase.')
+registry.describe('puzzle_cache_size', 'gauge', 'Solutions held by the cache.')
+registry.describe('puzzle_jobs', 'gauge', 'Remembered background jobs by state.')
+
+
+def log_event(event, level=logging.INFO, sampled=False, **fields):
+    """
+    Logs one event as a JSON line.
+
+    Args:
+        event (str): What happened.
+        level (int): The logging level.
+        sampled (bool): Keep only a PUZZLE_LOG_SAMPLE fraction of these events.
+        **fields: Details of the event; they must be JSON-serializable.
+    """
+    if sampled and random.random() >= LOG_SAMPLE_RATE:
+        return
+    if logger.isEnabledFor(level):
+        logger.log(level, json.dumps({'event': event, **fields}))
+
+
+def preload():
+    """
+    Loads the tables of the default goal so the first requests don't pay for
+    them. Solvers never build the distance tables or the pattern databases,
+    so the 8-puzzle ones of every canonical goal (see state.canonicalize())
+    are built here if they are missing or incomplete; the 15-puzzle pattern
+    databases come from pattern_database.py. In production mode this runs
+    before the workers are forked, so they share the loaded tables.
+    """
+    for goal in canonical_goals(3):  # About a third of a second per goal for the tables that are missing
+        load_table(goal)
+        build_patterns(goal)
+    for heuristic in ('Manhattan', 'Euclidean'):
+        heuristic_table(GOAL_STATE, heuristic)
+    load_table(GOAL_STATE)  # Keep the default goal's table mapped
+    PatternDatabase(GOAL_STATE)
+    WalkingDistance(GOAL_STATE)
+
+
+def get_budget(data):
+    """
+    Builds the search budget of a request: its own limits, capped by the server's.
+
+    Args:
+        data (dict): The request body.
+
+    Returns:
+        SearchBudget: The limits to search with.
+
+    Raises:
+        ValueError: If a limit in the request is not a positive number.
+    """
+    limits = {}
+    for field, (name, kind, cap) in LIMITS.items():
+        value = data.get(field)
+        if value is None:
+            limits[name] = cap
+            continue
+        value = kind(value)
+        if value <= 0:
+            raise ValueError(f'{field} must be positive')
+        limits[name] = value if cap is None else min(value, cap)
+    return SearchBudget(**limits)
+
+
+def format_result(result, path_format=PATH_STATES):
+    """
+    Turns the result of dispatch.solve() into the JSON body sent to the client.
+
+    The server always solves in the compact 'moves' format (it is also what the
+    cache and the batch workers hold). Clients get the move string as "moves",
+    or by default the replayed boards as "path".
+    """
+    initial_input = result['start_state']
+    goal = result['goal_state']
+    algorithm_name = result['algorithm']
+    status = result['status']
+
+    # Malformed and unsolvable puzzles are rejected before any search is run
+    if status in (INVALID, UNSOLVABLE):
+        if status == UNSOLVABLE:
+            message = f'Puzzle {initial_input} cannot reach goal {goal}'
+        else:
+            message = f'Invalid puzzle: input {initial_input!r}, goal {goal!r}'
+        return {
+            'message': message,
+            'status': 'failed',
+            'reason': status
+        }
+
+    if status == UNKNOWN_ALGORITHM:
+        return {
+            'message': f'Invalid algorithm name: {algorithm_name}',
+            'status': 'failed'
+        }
+
+    if status == UNSUPPORTED:
+        size = board_size(initial_input)
+        return {
+            'message': f'Algorithm {algorithm_name} cannot solve {size}x{size} boards',
+            'status': 'failed',
+            'reason': status
+        }
+
+    # Append analysis information to info
+    info = [{"title": key, "value": value} for key, value in result['info'].items()]
+
+    # The search ran out of budget; the info shows how far it got
+    if status == STOPPED:
+        return {
+            'message': f'Search stopped ({result["stop_reason"]}) with input {initial_input} using {algorithm_name}',
+            'status': 'failed',
+            'reason': status,
+            'limit': result['stop_reason'],
+            'info': info
+        }
+
+    moves = result['path']
+    if moves is None:
+        return {
+            'message': f'No solution found with input {initial_input} using {algorithm_name}',
+            'status': 'failed'
+        }
+
+    info.append({"title": "path length", "value": len(moves)})
+
+    response = {
+        'message': f'Started solving with input {initial_input} using {algorithm_name}',
+        'status': 'success',
+        'info': info
+    }
+    if path_format == PATH_MOVES:
+        response['moves'] = moves
+    else:
+        response['path'] = [initial_input] + apply_moves(initial_input, moves)
+    return response
+
+
+def parse_options(data):
+    """
+    Reads the options shared by /start and /solve/batch.
+
+    Args:
+        data (dict): The request body.
+
+    Returns:
+        tuple: (path format, search budget, failure body). The failure body is None
+        unless an option is invalid.
+    """
+    path_format = data.get('pathFormat') or PATH_STATES  # 'moves' asks for the compact move string
+    if path_format not in PATH_FORMATS:
+        return None, None, {
+            'message': f'Invalid path format: {path_format}',
+            'status': 'failed'
+        }
+    size = data.get('size')
+    if size is not None and (not isinstance(size, int) or not MIN_SIZE <= size <= MAX_SIZE):
+        return None, None, {
+            'message': f'Invalid board size: {size!r}, expected {MIN_SIZE} to {MAX_SIZE}',
+            'status': 'failed'
+        }
+    try:
+        budget = get_budget(data)
+    except (TypeError, ValueError) as error:
+        return None, None, {
+            'message': f'Invalid search limit: {error}',
+            'status': 'failed'
+        }
+    return path_format, budget, None
+
+
+def record_metrics(result, cached):
+    """
+    Adds one solve to the /metrics registry.
+
+    Args:
+        result (dict): The result of dispatch.solve().
+        cached (bool): Whether it was answered from the cache.
+    """
+    # Labels only take known names, so arbitrary request values cannot grow the registry
+    algorithm = result['algorithm'] if result['algorithm'] in ALGORITHMS else 'unknown'
+    registry.inc('puzzle_requests_total', algorithm=algorithm, status=result['status'])
+    if cached:
+        registry.inc('puzzle_cache_hits_total', algorithm=algorithm)
+        return
+
+    info = result['info']
+    if 'total time' in info:
+        registry.observe('puzzle_solve_seconds', info['total time'], algorithm=algorithm)
+    registry.inc('puzzle_explored_nodes_total', info.get('explored nodes', 0), algorithm=algorithm)
+    if 'generated nodes' in info:  # The search was instrumented
+        registry.inc('puzzle_generated_nodes_total', info['generated nodes'], algorithm=algorithm)
+        registry.inc('puzzle_duplicate_nodes_total', info['duplicate nodes'], algorithm=algorithm)
+        registry.inc('puzzle_heuristic_evaluations_total', info['heuristic evaluations'], algorithm=algorithm)
+        for phase in PHASES:
+            registry.inc('puzzle_phase_seconds_total', info[f'{phase} time'], algorithm=algorithm, phase=phase)
+
+
+def get_goal(start_state, goal_state=None, size=None):
+    """
+    Returns the goal of a request: its own goal, or the default goal of the board size.
+
+    Args:
+        start_state (str): The board to solve.
+        goal_state (str): The goal the request asked for, if any.
+        size (int): The board size the request asked for; by default the size of start_state.
+
+    Returns:
+        str: The goal state.
+    """
+    return goal_state or default_goal(size or board_size(start_state) or SIZE)
+
+
+def cache_key(start_state, goal_state, algorithm_name, instrumented):
+    """
+    Returns the cache key of a request.
+
+    Valid puzzles are keyed by their canonical form (see state.canonicalize()),
+    so a board solved for one goal also answers every relabeling of it for the
+    other goals with the blank on the same cell: the moves are the same.
+    Instrumented results carry more info, so they are kept apart.
+    """
+    if not check_puzzle(start_state, goal_state):  # Invalid or unsolvable results are never cached
+        start_state, goal_state, _ = canonicalize(start_state, goal_state)
+    return (start_state, goal_state, algorithm_name, PATH_MOVES, bool(instrumented))
+
+
+def is_cacheable(result):
+    """
+    Checks whether a result can answer later requests, whatever their budget.
+
+    Args:
+        result (dict): The result of dispatch.solve().
+
+    Returns:
+        bool: True for the results of a search that do not depend on the time it had: not for
+        rejected or stopped requests, nor for the paths of anytime solvers (ARA*, auto on large
+        boards) that are above the optimum, which a longer deadline would improve.
+    """
+    if result['status'] not in (SOLVED, NOT_FOUND) or result['stop_reason']:
+        return False
+    bound = result['info'].get('suboptimality bound')
+    return bound is None or bound <= 1
+
+
+def solve_request(data, path_format, budget, observer=None):
+    """
+    Solves the board of a /start or /jobs request, using the cache.
+
+    Args:
+        data (dict): The request body.
+        path_format (str): The format of the returned path.
+        budget (SearchBudget): Limits of the search.
+        observer (callable): Passed on to dispatch.solve().
+
+    Returns:
+        dict: The response body, see format_result().
+    """
     initial_input = data.get('inputString')
-    goal = data.get('goalString')
+    goal = get_goal(initial_input, data.get('goalString'), data.get('size'))
     algorithm_name = data.get('algorithmName')
 
-    if algorithm_name == "bfs":
-        solver = BFS(initial_input, goal)
-        path = solver.run()
-    elif algorithm_name == "a-starm":
-        solver = AStar(initial_input, goal, heuristic='Manhattan')
-        path = solver.run()[0]
-    elif algorithm_name == "a-stare":
-        solver = AStar(initial_input, goal, heuristic='euclidean')
-        path = solver.run()[0]
-    elif algorithm_name == "dfs":
-        solver = DFS(initial_input, goal)
-        path = solver.run()
-    elif algorithm_name == "dls":
-        print(f"it-dfs with input {initial_input} and goal {goal}")
-        solver = IT_DFS(initial_input, goal)
-        path = solver.run()
+    instrumented = INSTRUMENT or bool(data.get('instrument'))
+    key = cache_key(initial_input, goal, algorithm_name, instrumented)
+    result = cache.get(key)
+    cached = result is not None
+    if cached:  # Possibly stored for another goal, the moves are the same but the boards are not
+        result = dict(result, start_state=initial_input, goal_state=goal)
     else:
-        print(f"Invalid algorithm name: {algorithm_name}")
-        return jsonify({
-            'message': f'Invalid algorithm name: {algorithm_name}',
-            'status': 'failed'
-        })
+        metrics = SearchMetrics(phases=True) if instrumented else None
+        result = solve(initial_input, goal, algorithm_name, PATH_MOVES, budget, observer, metrics)
+        if is_cacheable(result):
+            cache.put(key, result)
+    record_metrics(result, cached)
+
+    response = format_result(result, path_format)
+    if response['status'] == 'failed':
+        log_event('solve failed', logging.WARNING, message=response['message'])
+    else:
+        # The path itself is not logged, it can be tens of thousands of moves long
+        log_event('solved', sampled=True, start=initial_input, goal=goal, algorithm=algorithm_name,
+                  cached=cached, info=result['info'], path_length=len(result['path']))
+    return response
+
+
+@app.route('/start', methods=['POST'])  # New endpoint for starting the algorithm
+def start_algorithm():
+    data = request.json  # Get JSON data from the request
+    path_format, budget, failure = parse_options(data)
+    if failure:
+        log_event('invalid request', logging.WARNING, message=failure['message'])
+        return jsonify(failure)
+    return jsonify(solve_request(data, path_format, budget))
+
 
-    if path is None:
-        print("no solution found")
+def run_job(data, path_format, budget, job):
+    """
+    Solves a /jobs request in a worker thread of the job pool.
+    """
+    budget.cancel_token = job.cancel_token
+    return solve_request(data, path_format, budget, observer=job.attach)
+
+
+@app.route('/jobs', methods=['POST'])  # Endpoint for starting a search in the background
+def create_job():
+    """
+    Queues a search and returns its id right away.
+
+    The body is the same as for /start. Poll GET /jobs/<id> or follow
+    GET /jobs/<id>/events for progress; the result has the shape of a
+    /start response.
+    """
+    if not jobs_enabled:
         return jsonify({
-            'message': f'No solution found with input {initial_input} using {algorithm_name}',
+            'message': 'Background jobs need a single worker process (--workers 1), use /start instead',
             'status': 'failed'
-        })
-    
-    analysis = solver.get_info()
+        }), 501
+    data = request.json  # Get JSON data from the request
+    path_format, budget, failure = parse_options(data)
+    if failure:
+        return jsonify(failure)
+    job = job_manager.submit(functools.partial(run_job, data, path_format, budget))
+    return jsonify(job.to_dict()), 202
 
-    # Append analysis information to info
-    for key, value in analysis.items():
-        info.append({"title": key, "value": value})
 
-    if path is not None:
-        path.insert(0,initial_input)
-        info.append({"title": "path length", "value": len(path) - 1})
+@app.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({'message': f'Unknown job: {job_id}', 'status': 'failed'}), 404
+    return jsonify(job.to_dict())
+
 
-    print(info)
-    print(path)
+@app.route('/jobs/<job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    """
+    Cancels a job. A running search stops soon after and keeps its partial info.
+    """
+    job = job_manager.cancel(job_id)
+    if job is None:
+        return jsonify({'message': f'Unknown job: {job_id}', 'status': 'failed'}), 404
+    return jsonify(job.to_dict())
+
+
+@app.route('/jobs/<job_id>/events', methods=['GET'])
+def job_events(job_id):
+    """
+    Streams the progress of a job as server-sent events: a "progress" event
+    every JOB_EVENT_INTERVAL seconds, then one "result" event when it ends.
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({'message': f'Unknown job: {job_id}', 'status': 'failed'}), 404
+
+    def events():
+        while job.state not in (FINISHED, CANCELLED):
+            yield f'event: progress\ndata: {json.dumps(job.get_progress())}\n\n'
+            time.sleep(JOB_EVENT_INTERVAL)
+        yield f'event: result\ndata: {json.dumps(job.to_dict())}\n\n'
+
+    return Response(stream_with_context(events()), mimetype='text/event-stream')
+
+
+@app.route('/solve/batch', methods=['POST'])  # Endpoint for solving many boards at once
+def solve_batch_endpoint():
+    """
+    Solves a list of boards in the worker process pool.
+
+    The body is {"jobs": [{"inputString", "goalString", "algorithmName"}, ...]}.
+    Results come back in job order unless "ordered" is false. With "stream":
+    true they are sent as newline-delimited JSON as soon as they are ready.
+    Every result has the same shape as a /start response, plus the job's "index";
+    "pathFormat" and the search limits apply to each job.
+    """
+    data = request.json  # Get JSON data from the request
+    path_format, budget, failure = parse_options(data)
+    if failure:
+        return jsonify(failure)
+    jobs = [(job.get('inputString'), get_goal(job.get('inputString'), job.get('goalString'), data.get('size')),
+             job.get('algorithmName'))
+            for job in data.get('jobs', [])]
+    ordered = data.get('ordered', True)
+
+    def results():
+        for result in solve_batch(jobs, ordered=ordered, path_format=PATH_MOVES, budget=budget):
+            record_metrics(result, cached=False)
+            yield dict(format_result(result, path_format), index=result['index'])
+
+    if data.get('stream'):
+        lines = (json.dumps(result) + '\n' for result in results())
+        return Response(stream_with_context(lines), mimetype='application/x-ndjson')
     return jsonify({
-        'message': f'Started solving with input {initial_input} using {algorithm_name}',
         'status': 'success',
-        'path': path,
-        'info': info
+        'results': list(results())
+    })
+
+
+@app.route('/cache/stats', methods=['GET'])
+def cache_stats():
+    return jsonify(cache.get_stats())
+
+
+@app.route('/metrics', methods=['GET'])  # Prometheus scrape target
+def metrics_endpoint():
+    registry.set('puzzle_cache_size', cache.get_stats()['size'])
+    for state, count in job_manager.get_counts().items():
+        registry.set('puzzle_jobs', count, state=state)
+    return Response(registry.render(), mimetype='text/plain; version=0.0.4')
+
+
+@app.route('/health', methods=['GET'])  # Liveness check for load balancers and the launcher
+def health():
+    return jsonify({
+        'status': 'ok',
+        'pid': os.getpid(),
+        'uptime': round(time.time() - started, 3),
+        'jobs': job_manager.get_counts(),
+        'cache size': cache.get_stats()['size'],
     })
 
 
+def run_production(bind, workers, threads):
+    """
+    Serves the app with gunicorn: worker processes, each answering requests
+    from a few threads. The app and its tables are loaded once in the master
+    process and shared with the forked workers. /jobs needs a single worker
+    process, so it is turned off when there are more.
+
+    gunicorn is an optional dependency; without it the Flask server is used
+    with threads and without the debug reloader.
+    """
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        log_event('gunicorn not installed, using the Flask server', logging.WARNING)
+        host, _, port = bind.rpartition(':')
+        app.run(host=host or '127.0.0.1', port=int(port), threaded=True)
+        return
+    if workers > 1:
+        global jobs_enabled
+        jobs_enabled = False  # Set before the workers are forked, so every one of them sees it
+        log_event('/jobs disabled, it needs a single worker process', logging.WARNING, workers=workers)
+
+    class PuzzleApplication(BaseApplication):
+        def load_config(self):
+            for key, value in {'bind': bind, 'workers': workers, 'threads': threads, 'preload_app': True}.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return app
+
+    PuzzleApplication().run()
+
+
 if __name__ == '__main__':
-    print("Server is running...")
-    app.run(debug=True)
+    parser = argparse.ArgumentParser(description='Serves the 8-puzzle solvers.')
+    parser.add_argument('--production', action='store_true', help='serve with gunicorn worker processes')
+    parser.add_argument('--debug', action='store_true', help='use the Flask debug server with the reloader')
+    parser.add_argument('--bind', default=os.environ.get('PUZZLE_BIND', '127.0.0.1:5000'))
+    parser.add_argument('--workers', type=int, default=int(os.environ.get('PUZZLE_WORKERS', 1)),
+                        help='worker processes in production mode; /jobs is only served with one')
+    parser.add_argument('--threads', type=int, default=int(os.environ.get('PUZZLE_THREADS', 8)))
+    args = parser.parse_args()
+
+    logging.basicConfig(level=os.environ.get('PUZZLE_LOG_LEVEL', 'INFO'), format='%(asctime)s %(message)s')
+    preload()
+    log_event('server starting', bind=args.bind, production=args.production,
+              workers=args.workers if args.production else 1)
+    if args.production:
+        run_production(args.bind, args.workers, args.threads)
+    else:
+        host, _, port = args.bind.rpartition(':')
+        app.run(host=host or '127.0.0.1', port=int(port), debug=args.debug, threaded=True)
@@ -0,0 +1,171 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+PRUNE_INTERVAL = 64  # Writes to the SQLite file between two prunings of it
+
+
+class SolutionCache:
+    def __init__(self, max_size=1024, ttl=None, path=None, max_disk_size=100000):
+        """
+        Initializes a bounded LRU cache of solver results.
+
+        Args:
+            max_size (int): Maximum number of results kept in memory.
+            ttl (float): Seconds a result stays valid (default is None, no expiry).
+            path (str): Optional SQLite file that keeps results across restarts.
+            max_disk_size (int): Maximum number of results kept in the SQLite file; the oldest
+                are deleted first, and expired ones as soon as they are found (default is 100000).
+        """
+        self.max_size = max_size
+        self.max_disk_size = max_disk_size
+        self.ttl = ttl
+        self.entries = OrderedDict()  # key -> (time stored, result), least recently used first
+        self.lock = threading.Lock()  # Flask serves requests from several threads
+        self.hits = 0  # Lookups answered from memory or disk
+        self.misses = 0  # Lookups that had to run a solver
+        self.evictions = 0  # Entries dropped to respect max_size
+        self.expirations = 0  # Entries dropped because they outlived ttl
+        self.disk_hits = 0  # Hits that were loaded from the SQLite file
+        self.disk_evictions = 0  # Rows deleted from the SQLite file to respect max_disk_size or ttl
+        self.writes = 0  # Rows written by this process, to prune the file every PRUNE_INTERVAL writes
+        self.path = path
+        self.db = None  # SQLite connection of this process, opened by connect()
+        self.pid = None  # Process that opened self.db
+        if path:
+            self.connect()
+
+    def connect(self):
+        """
+        Returns the SQLite connection, opening a new one in a forked worker
+        process (connections must not be shared across a fork). The caller
+        holds the lock, except in __init__.
+        """
+        if self.pid != os.getpid():
+            self.db = sqlite3.connect(self.path, check_same_thread=False, timeout=10)
+            self.db.execute('CREATE TABLE IF NOT EXISTS solutions '
+                            '(key TEXT PRIMARY KEY, stored REAL, result TEXT)')
+            self.db.execute('CREATE INDEX IF NOT EXISTS solutions_stored ON solutions (stored)')
+            self.db.commit()
+            self.pid = os.getpid()
+        return self.db
+
+    def get(self, key):
+        """
+        Looks up a result and marks it as recently used.
+
+        Args:
+            key (tuple): A hashable, JSON-serializable key, see server.cache_key().
+
+        Returns:
+            dict: The cached result, or None on a miss.
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            from_disk = False
+            if entry is None and self.path:
+                entry = self.load(key)
+                from_disk = entry is not None
+
+            if entry is not None and self.ttl is not None and time.time() - entry[0] > self.ttl:
+                self.expirations += 1
+                self.entries.pop(key, None)
+                if self.path:  # Otherwise it would be read and dropped again on every lookup
+                    self.delete(key)
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                return None
+            if from_disk:
+                self.disk_hits += 1
+                self.store(key, entry)
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, result):
+        """
+        Stores a result, evicting the least recently used ones if the cache is full.
+
+        Args:
+            key (tuple): A hashable, JSON-serializable key, see server.cache_key().
+            result (dict): A JSON-serializable result of dispatch.solve().
+        """
+        entry = (time.time(), result)
+        with self.lock:
+            self.store(key, entry)
+            if self.path:
+                db = self.connect()
+                db.execute('INSERT OR REPLACE INTO solutions VALUES (?, ?, ?)',
+                           (json.dumps(key), entry[0], json.dumps(result)))
+                self.writes += 1
+                if self.writes % PRUNE_INTERVAL == 0:
+                    self.prune()
+                db.commit()
+
+    def store(self, key, entry):
+        """
+        Puts an entry in memory and enforces max_size. The caller holds the lock.
+        """
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def load(self, key):
+        """
+        Reads an entry from the SQLite file. The caller holds the lock.
+
+        Returns:
+            tuple: (time stored, result), or None if the key is not on disk.
+        """
+        row = self.connect().execute('SELECT stored, result FROM solutions WHERE key = ?',
+                              (json.dumps(key),)).fetchone()
+        if row is None:
+            return None
+        return row[0], json.loads(row[1])
+
+    def delete(self, key):
+        """
+        Deletes an entry from the SQLite file. The caller holds the lock.
+        """
+        db = self.connect()
+        self.disk_evictions += db.execute('DELETE FROM solutions WHERE key = ?', (json.dumps(key),)).rowcount
+        db.commit()
+
+    def prune(self):
+        """
+        Deletes the expired rows of the SQLite file, then the oldest ones beyond
+        max_disk_size. The caller holds the lock and commits.
+        """
+        db = self.connect()
+        if self.ttl is not None:
+            self.disk_evictions += db.execute('DELETE FROM solutions WHERE stored < ?',
+                                              (time.time() - self.ttl,)).rowcount
+        self.disk_evictions += db.execute('DELETE FROM solutions WHERE key IN (SELECT key FROM solutions '
+                                          'ORDER BY stored DESC LIMIT -1 OFFSET ?)',
+                                          (self.max_disk_size,)).rowcount
+
+    def get_stats(self):
+        """
+        Returns the cache counters.
+
+        Returns:
+            dict: Sizes and hit, miss, eviction and expiration counts.
+        """
+        with self.lock:
+            return {
+                'size': len(self.entries),
+                'max size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'disk hits': self.disk_hits,
+                'disk evictions': self.disk_evictions,
+            }
@@ -0,0 +1,76 @@
+"""
+Tests of ARA*'s anytime contract: the bound of the returned path, and optimality without a deadline.
+
+Run from the checkout root (python -m pytest -q backend/tests) or from backend/ (python -m pytest -q tests).
+"""
+
+import random
+
+import pytest
+
+from Algorithms.ara_star import ARAStar
+from Algorithms.budget import NODE_LIMIT, SearchBudget
+from Algorithms.distance_table import UNREACHABLE, load_table
+from Algorithms.state import SOLVED, STOPPED, encode, rank
+
+GOAL = '012345678'
+
+
+@pytest.fixture(scope='module')
+def distances():
+    return load_table(GOAL)
+
+
+def solvable_boards(distances, count, seed):
+    rng = random.Random(seed)
+    boards = []
+    while len(boards) < count:
+        board = ''.join(rng.sample(GOAL, len(GOAL)))
+        if distances[rank(encode(board))] not in (0, UNREACHABLE):
+            boards.append(board)
+    return boards
+
+
+@pytest.mark.parametrize('heuristic', ['Manhattan', 'LinearConflict'])
+def test_without_deadline_paths_are_optimal(distances, heuristic):
+    repaired = 0  # Runs that searched again from the states left by a previous search (INCONS)
+    for board in solvable_boards(distances, 100, seed=1):
+        solver = ARAStar(board, GOAL, heuristic, deadline=None)
+        path, cost = solver.run()
+        info = solver.get_info()
+        assert solver.status == SOLVED
+        assert cost == len(path) == distances[rank(encode(board))], board  # The path leaves out the start
+        assert info['optimal'] and info['suboptimality bound'] == 1
+        repaired += info['solutions'] > 1
+    assert repaired
+
+
+def test_bound_holds_when_a_node_budget_stops_the_search(distances):
+    suboptimal = 0  # Runs stopped with a path above the optimum
+    for board in solvable_boards(distances, 100, seed=2):
+        distance = distances[rank(encode(board))]
+        for max_nodes in (20, 100, 400):
+            solver = ARAStar(board, GOAL, weight=3, budget=SearchBudget(max_nodes=max_nodes))
+            path, cost = solver.run()
+            info = solver.get_info()
+            if path is None:  # Stopped before the first search ended
+                assert solver.status == STOPPED and solver.stop_reason == NODE_LIMIT
+                assert not info['optimal']
+                continue
+            assert solver.status == SOLVED
+            assert cost <= solver.bound * distance + 1e-9  # get_info() rounds the bound
+            assert info['optimal'] == (info['suboptimality bound'] == 1)
+            if cost > distance:
+                assert solver.stop_reason == NODE_LIMIT and not info['optimal']
+                suboptimal += 1
+    assert suboptimal  # The budget did stop some runs between two searches
+
+
+def test_fifteen_puzzle_path_stopped_early_reports_its_bound():
+    solver = ARAStar('5B68247091D3FCEA', '0123456789ABCDEF', 'LinearConflict', budget=SearchBudget(max_nodes=2000))
+    path, cost = solver.run()
+    info = solver.get_info()
+    assert solver.status == SOLVED and solver.stop_reason == NODE_LIMIT
+    assert cost == len(path) > 46  # 46 moves is the optimum
+    assert not info['optimal'] and 1 < info['suboptimality bound'] <= 2.5
+    assert cost <= solver.bound * 46 + 1e-9
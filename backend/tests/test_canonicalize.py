@@ -0,0 +1,88 @@
+"""
+Tests of the tile renaming dispatch.solve() applies to every request (see state.canonicalize()).
+
+Run from the checkout root (python -m pytest -q backend/tests) or from backend/ (python -m pytest -q tests).
+"""
+
+import random
+
+import pytest
+
+from Algorithms.bfs import BFS
+from Algorithms.dispatch import solve
+from Algorithms.distance_table import load_table
+from Algorithms.state import (PATH_MOVES, SOLVED, apply_moves, board_of, canonical_goal, canonical_goals,
+                              canonicalize, encode, rank, relabel)
+
+
+@pytest.fixture(scope='module')
+def tables():
+    return {goal: load_table(goal) for goal in canonical_goals(3)}  # Solvers never build them, see server.preload()
+
+
+def custom_goal(blank, rng, size=3):
+    """
+    Returns a goal with the blank on a cell and the other tiles in random order.
+    """
+    tiles = list(canonical_goal(0, size)[1:])
+    rng.shuffle(tiles)
+    tiles.insert(blank, '0')
+    return ''.join(tiles)
+
+
+def scramble(goal_state, moves, rng):
+    """
+    Returns a board reached from goal_state by random moves, so that it can reach the goal.
+    """
+    board = board_of(goal_state)
+    state = board.encode(goal_state)
+    for _ in range(moves):
+        state = rng.choice(board.neighbors(state))
+    return board.decode(state)
+
+
+def test_canonicalize_keeps_the_blank_and_relabel_inverts_it():
+    rng = random.Random(1)
+    for blank in range(9):
+        goal = custom_goal(blank, rng)
+        start = scramble(goal, 40, rng)
+        canonical_start, canonical, labels = canonicalize(start, goal)
+        assert canonical == canonical_goal(blank)
+        assert relabel(goal, labels) == canonical
+        assert canonical_start.index('0') == start.index('0')
+        tiles = {label: tile for tile, label in labels.items()}
+        assert relabel(canonical_start, tiles) == start
+
+
+@pytest.mark.parametrize('algorithm', ['table', 'a-starlc', 'bfs'])
+def test_custom_goal_path_ends_on_the_requested_goal(tables, algorithm):
+    rng = random.Random(2)
+    for blank in range(9):
+        goal = custom_goal(blank, rng)
+        start = scramble(goal, 60, rng)
+        result = solve(start, goal, algorithm)
+        assert result['status'] == SOLVED
+        path = result['path']
+        assert path[0] == start and path[-1] == goal
+        board = board_of(goal)
+        for state, next_state in zip(path, path[1:]):  # Every step is one move of the blank
+            assert board.encode(next_state) in board.neighbors(board.encode(state))
+
+        moves = solve(start, goal, algorithm, PATH_MOVES)['path']
+        assert len(moves) == len(path) - 1
+        assert apply_moves(start, moves)[-1] == goal
+
+
+@pytest.mark.parametrize('blank', range(9))
+def test_custom_goal_paths_are_optimal(tables, blank):
+    rng = random.Random(3 + blank)
+    for _ in range(5):
+        goal = custom_goal(blank, rng)
+        start = scramble(goal, 80, rng)
+        canonical_start, canonical, _ = canonicalize(start, goal)
+        distance = tables[canonical][rank(encode(canonical_start))]
+        assert len(BFS(start, goal).run()) == distance  # Searched on the request's own tiles
+        for algorithm in ('table', 'a-starlc'):
+            result = solve(start, goal, algorithm)
+            assert result['status'] == SOLVED
+            assert len(result['path']) - 1 == distance, (start, goal, algorithm)  # The path includes the start
@@ -0,0 +1,43 @@
+"""
+Tests that BucketQueue pops in exactly the order of HeapQueue, which A* relies on for identical runs.
+
+Run from the checkout root (python -m pytest -q backend/tests) or from backend/ (python -m pytest -q tests).
+"""
+
+import random
+
+import pytest
+
+from Algorithms.open_list import BucketQueue, HeapQueue
+
+
+@pytest.mark.parametrize('prefer_deep', [True, False])
+@pytest.mark.parametrize('seed', range(20))
+def test_bucket_queue_pops_like_heap_queue(prefer_deep, seed):
+    rng = random.Random(seed)
+    heap, buckets = HeapQueue(prefer_deep), BucketQueue(prefer_deep)
+    state = 0
+    for _ in range(2000):
+        if len(heap) and rng.random() < 0.45:
+            assert buckets.pop() == heap.pop()
+        else:  # Small ranges, so that many entries share f and g
+            g = rng.randrange(12)
+            f = g + rng.randrange(6)
+            state += 1
+            heap.push(f, g, state, f - g)
+            buckets.push(f, g, state, f - g)
+        assert len(buckets) == len(heap)
+    while len(heap):
+        assert buckets.pop() == heap.pop()
+
+
+def test_bucket_queue_accepts_a_lower_f_after_a_pop():
+    queue = BucketQueue()
+    queue.push(5, 2, 'a', 3)
+    queue.push(7, 3, 'b', 4)
+    assert queue.pop() == ('a', 2, 3)
+    queue.push(4, 1, 'c', 3)  # Below the f of the last pop, e.g. with an inconsistent heuristic
+    assert queue.pop() == ('c', 1, 3)
+    assert queue.pop() == ('b', 3, 4)
+    with pytest.raises(IndexError):
+        queue.pop()
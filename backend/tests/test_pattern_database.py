@@ -0,0 +1,58 @@
+"""
+Regression tests of the pattern database heuristic against the exact 8-puzzle distances.
+
+Run from the checkout root (python -m pytest -q backend/tests) or from backend/ (python -m pytest -q tests).
+"""
+
+import random
+
+import pytest
+
+from Algorithms.Astar import AStar
+from Algorithms.distance_table import UNREACHABLE, load_table
+from Algorithms.pattern_database import PatternDatabase, build_patterns
+from Algorithms.state import SOLVED, UNSUPPORTED, encode, rank
+
+GOAL = '012345678'
+
+
+@pytest.fixture(scope='module')
+def distances():
+    build_patterns(GOAL)  # Solvers never build them, see pattern_database.py
+    return load_table(GOAL)
+
+
+def random_boards(count, seed):
+    rng = random.Random(seed)
+    return [''.join(rng.sample(GOAL, len(GOAL))) for _ in range(count)]
+
+
+def test_pattern_database_is_consistent(distances):
+    database = PatternDatabase(GOAL)
+    for board in random_boards(2000, seed=1):
+        state = encode(board)
+        value = database.evaluate(state)
+        if distances[rank(state)] != UNREACHABLE:
+            assert value <= distances[rank(state)]
+        for next_state, next_value in database.get_neighbors(state):
+            assert next_value == database.evaluate(next_state)
+            assert abs(next_value - value) <= 1
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_a_star_pattern_database_paths_are_optimal(distances, workers):
+    boards = ['752130864'] + random_boards(300 if workers == 1 else 10, seed=2)
+    for board in boards:
+        distance = distances[rank(encode(board))]
+        if distance == UNREACHABLE:
+            continue
+        solver = AStar(board, GOAL, 'PatternDatabase', workers=workers)
+        path, cost = solver.run()
+        assert solver.status == SOLVED
+        assert cost == distance == len(path), board  # The path leaves out the start
+
+
+def test_pattern_database_without_groups_is_unsupported():
+    solver = AStar('0123', '0123', 'PatternDatabase')
+    solver.run()
+    assert solver.status == UNSUPPORTED
@@ -0,0 +1,124 @@
+"""
+Tests of the solution cache: LRU eviction, expiry, the SQLite size bound and the server's cache keys.
+
+Run from the checkout root (python -m pytest -q backend/tests) or from backend/ (python -m pytest -q tests).
+"""
+
+import sqlite3
+
+import pytest
+
+import solution_cache
+from solution_cache import PRUNE_INTERVAL, SolutionCache
+
+
+class Clock:
+    """
+    Stands in for the time module of solution_cache, so expiry does not need sleeping.
+    """
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(solution_cache, 'time', clock)
+    return clock
+
+
+def key(i):
+    return (f'board{i}', '012345678', 'bfs', 'moves', False)
+
+
+def disk_keys(path):
+    with sqlite3.connect(path) as db:
+        return {row[0] for row in db.execute('SELECT key FROM solutions')}
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = SolutionCache(max_size=2)
+    cache.put(key(1), {'path': 'L'})
+    cache.put(key(2), {'path': 'R'})
+    assert cache.get(key(1)) == {'path': 'L'}  # key(2) is now the least recently used
+    cache.put(key(3), {'path': 'U'})
+    assert cache.get(key(2)) is None
+    assert cache.get(key(1)) == {'path': 'L'} and cache.get(key(3)) == {'path': 'U'}
+    stats = cache.get_stats()
+    assert stats['size'] == 2 and stats['evictions'] == 1
+    assert stats['hits'] == 3 and stats['misses'] == 1
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = SolutionCache(ttl=60)
+    cache.put(key(1), {'path': 'L'})
+    clock.now += 59
+    assert cache.get(key(1)) == {'path': 'L'}
+    clock.now += 2
+    assert cache.get(key(1)) is None
+    assert cache.get_stats()['expirations'] == 1 and cache.get_stats()['size'] == 0
+
+
+def test_results_are_reloaded_from_disk(tmp_path):
+    path = str(tmp_path / 'cache.sqlite')
+    SolutionCache(path=path).put(key(1), {'path': 'L'})
+    restarted = SolutionCache(path=path)  # A new process, with an empty memory cache
+    assert restarted.get(key(1)) == {'path': 'L'}
+    assert restarted.get_stats()['disk hits'] == 1
+
+
+def test_expired_rows_are_deleted_from_disk(tmp_path, clock):
+    path = str(tmp_path / 'cache.sqlite')
+    SolutionCache(ttl=60, path=path).put(key(1), {'path': 'L'})
+    clock.now += 61
+    restarted = SolutionCache(ttl=60, path=path)
+    assert restarted.get(key(1)) is None
+    assert disk_keys(path) == set()  # Not read and dropped again on every lookup
+    assert restarted.get_stats()['disk evictions'] == 1
+
+
+def test_disk_keeps_the_newest_rows_within_max_disk_size(tmp_path, clock):
+    path = str(tmp_path / 'cache.sqlite')
+    cache = SolutionCache(max_size=4, path=path, max_disk_size=10)
+    for i in range(PRUNE_INTERVAL):  # The file is pruned every PRUNE_INTERVAL writes
+        clock.now += 1
+        cache.put(key(i), {'path': 'L'})
+    stored = disk_keys(path)
+    assert len(stored) == 10
+    assert stored == {solution_cache.json.dumps(key(i)) for i in range(PRUNE_INTERVAL - 10, PRUNE_INTERVAL)}
+    assert cache.get_stats()['disk evictions'] == PRUNE_INTERVAL - 10
+
+
+def test_instrumented_results_have_their_own_key():
+    pytest.importorskip('flask')
+    pytest.importorskip('flask_cors')
+    from server import cache_key
+
+    plain = cache_key('125340678', '012345678', 'a-starm', False)
+    instrumented = cache_key('125340678', '012345678', 'a-starm', True)
+    assert plain != instrumented
+    assert cache_key('125340678', '012345678', 'a-starm', 1) == instrumented
+    cache = SolutionCache()
+    cache.put(plain, {'info': {}})
+    assert cache.get(instrumented) is None  # An instrumented request never gets counters-free info
+
+
+def test_only_results_independent_of_the_budget_are_cacheable():
+    pytest.importorskip('flask')
+    pytest.importorskip('flask_cors')
+    from server import is_cacheable
+
+    def result(status='solved', stop_reason=None, **info):
+        return {'status': status, 'stop_reason': stop_reason, 'info': info}
+
+    assert is_cacheable(result())
+    assert is_cacheable(result('not found'))
+    assert is_cacheable(result(**{'suboptimality bound': 1.0}))
+    assert not is_cacheable(result(**{'suboptimality bound': 1.3}))  # An ARA* path cut short by its deadline
+    assert not is_cacheable(result(stop_reason='node limit'))
+    assert not is_cacheable(result('stopped', 'time limit'))
+    assert not is_cacheable(result('invalid'))
@@ -7,9 +7,9 @@ import time
 # List to hold the subprocesses
 processes = []
 
-def run_script(script_name):
+def run_script(script_name, *args):
     """Run a Python script in a subprocess."""
-    process = subprocess.Popen([sys.executable, script_name])
+    process = subprocess.Popen([sys.executable, script_name, *args])
     processes.append(process)
 
 def terminate_processes():
@@ -23,7 +23,8 @@ if __name__ == "__main__":
     try:
         # Run both scripts
         run_script("./frontend/puzzle-8-game/server.py")
-        run_script("./backend/server.py")
+        # python launcher.py --production serves the backend with worker processes (see README.md)
+        run_script("./backend/server.py", *sys.argv[1:])
 
         print("Both scripts are running in the background.")
 